@@ -0,0 +1,142 @@
+"""Exact and near-duplicate cache for lane classifications"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Set
+
+from config.llm_config import llm_config
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_transcript(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace so re-sent phrasings share a key"""
+    text = _PUNCTUATION.sub(" ", text.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+def shingles(normalized: str, size: int = 2) -> FrozenSet[str]:
+    """Word n-grams of a normalized transcript (single words for very short inputs)"""
+    words = normalized.split()
+    if len(words) < size:
+        return frozenset(words)
+    return frozenset(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+class ClassificationCache:
+    """LRU/TTL cache of classification results keyed on normalized transcript text"""
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 3600, similarity_threshold: float = 0.9):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # Jaccard similarity over word shingles needed for a near-duplicate hit; 0 disables it
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._index: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "near_hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, transcript: str) -> Optional[Dict[str, Any]]:
+        """Get a cached result for the transcript or a near-duplicate of it"""
+        key = normalize_transcript(transcript)
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is not None:
+                self._stats["hits"] += 1
+                return dict(entry["result"])
+
+            if self.similarity_threshold > 0:
+                match = self._find_similar(key)
+                if match is not None:
+                    self._stats["near_hits"] += 1
+                    return dict(self._entries[match]["result"])
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, transcript: str, result: Dict[str, Any]):
+        """Cache a classification result"""
+        key = normalize_transcript(transcript)
+        with self._lock:
+            self._remove(key)
+            entry = {
+                "result": dict(result),
+                "shingles": shingles(key),
+                "expires_at": time.monotonic() + self.ttl_seconds
+            }
+            self._entries[key] = entry
+            for shingle in entry["shingles"]:
+                self._index.setdefault(shingle, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def invalidate_lane(self, lane: str) -> int:
+        """Drop every cached result for a lane and return how many were removed"""
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if e["result"].get("lane") == lane]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["near_hits"] + self._stats["misses"]
+            hits = self._stats["hits"] + self._stats["near_hits"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
+
+    def _live_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires_at"] < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _find_similar(self, key: str) -> Optional[str]:
+        query = shingles(key)
+        if not query:
+            return None
+        candidates: Set[str] = set()
+        for shingle in query:
+            candidates.update(self._index.get(shingle, ()))
+
+        best_key, best_score = None, self.similarity_threshold
+        for candidate in candidates:
+            other = self._entries[candidate]["shingles"]
+            score = len(query & other) / len(query | other)
+            if score >= best_score:
+                best_key, best_score = candidate, score
+        if best_key is None:
+            return None
+        return best_key if self._live_entry(best_key) is not None else None
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for shingle in entry["shingles"]:
+            keys = self._index.get(shingle)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[shingle]
+
+# Global cache instance
+classification_cache = ClassificationCache(
+    max_size=llm_config.classify_cache_size,
+    ttl_seconds=llm_config.classify_cache_ttl,
+    similarity_threshold=llm_config.classify_cache_similarity
+)
@@ -0,0 +1,63 @@
+"""Pools of prebuilt crews so requests only pay for prompt rendering and the LLM call"""
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .token_usage import token_usage, usage_snapshot
+
+logger = logging.getLogger(__name__)
+
+class CrewPool:
+    """Idle crews for one workflow, checked out for the duration of a single kickoff.
+
+    A crew interpolates inputs into its tasks in place, so an instance must not
+    run two kickoffs at once; the pool hands each concurrent run its own crew
+    and keeps them around for reuse instead of rebuilding them per request.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any], max_idle: int = 4,
+                 prepare_inputs: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        self.name = name
+        self.factory = factory
+        self.max_idle = max_idle
+        # Turns kickoff inputs into the inputs the crew's tasks expect, e.g. a rendered prompt
+        self.prepare_inputs = prepare_inputs
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def _acquire(self) -> Any:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+        logger.debug(f"Building new crew for workflow '{self.name}'")
+        return self.factory()
+
+    def _release(self, crew: Any):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(crew)
+
+    def kickoff(self, inputs: Dict[str, Any]) -> Any:
+        """Run one kickoff on a pooled crew; blocking, so call it from the crew executor"""
+        if self.prepare_inputs is not None:
+            inputs = self.prepare_inputs(inputs)
+        crew = self._acquire()
+        # The crew's agents count tokens cumulatively across kickoffs, so record the difference
+        before = usage_snapshot(crew)
+        try:
+            return crew.kickoff(inputs=inputs)
+        finally:
+            token_usage.record(self.name, before, usage_snapshot(crew))
+            self._release(crew)
+
+    def warm(self, count: int = 1):
+        """Prebuild idle crews ahead of the first request"""
+        for _ in range(count):
+            self._release(self._acquire())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get how many crews were built and how many are idle"""
+        with self._lock:
+            return {"created": self.created, "idle": len(self._idle)}
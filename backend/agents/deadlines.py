@@ -0,0 +1,107 @@
+"""Per-request deadlines and cancellation carried from the HTTP layer into crew runs"""
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Optional
+
+from config.llm_config import llm_config
+
+logger = logging.getLogger(__name__)
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when work runs past its deadline or its client has gone away"""
+
+class Deadline:
+    """Absolute expiry plus a cancel flag that crew threads can check between steps"""
+
+    def __init__(self, seconds: float, parent: Optional["Deadline"] = None):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        if parent is not None:
+            # A nested scope can only shorten the time its caller allowed
+            self.expires_at = min(self.expires_at, parent.expires_at)
+        self.parent = parent
+        self.reason: Optional[str] = None
+        self._cancelled = threading.Event()
+
+    def cancel(self, reason: str = "cancelled"):
+        """Ask everything running under this deadline to stop at its next checkpoint"""
+        if not self._cancelled.is_set():
+            self.reason = reason
+            self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self):
+        """Raise DeadlineExceededError if the deadline passed or was cancelled; safe from any thread"""
+        if self.cancelled:
+            reason = self.reason or (self.parent.reason if self.parent else None) or "cancelled"
+            raise DeadlineExceededError(f"Request {reason}")
+        if self.remaining() <= 0:
+            raise DeadlineExceededError(f"Request timed out after {self.seconds:g}s")
+
+current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("current_deadline", default=None)
+
+@contextmanager
+def deadline_scope(seconds: Optional[float] = None):
+    """Run the enclosed work under a deadline, defaulting to AGENT_TIMEOUT"""
+    deadline = Deadline(seconds or llm_config.agent_timeout, parent=current_deadline.get())
+    token = current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        current_deadline.reset(token)
+
+def check_deadline(*_):
+    """Checkpoint for crew callbacks; extra arguments are ignored so it can wrap any callback"""
+    deadline = current_deadline.get()
+    if deadline is not None:
+        deadline.check()
+
+async def run_with_deadline(awaitable: Awaitable[Any]) -> Any:
+    """Await work, cancelling it once the current deadline passes"""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return await awaitable
+    deadline.check()
+    try:
+        return await asyncio.wait_for(awaitable, deadline.remaining())
+    except asyncio.TimeoutError:
+        # Tell crew threads that are still running to stop at their next step
+        deadline.cancel(f"timed out after {deadline.seconds:g}s")
+        deadline.check()
+        raise
+
+def request_timeout(request: Any) -> float:
+    """Timeout asked for in the X-Request-Timeout header, capped at AGENT_TIMEOUT"""
+    try:
+        asked = float(request.headers.get("x-request-timeout", 0))
+    except ValueError:
+        asked = 0
+    return min(asked, llm_config.agent_timeout) if asked > 0 else llm_config.agent_timeout
+
+async def run_request(request: Any, awaitable: Awaitable[Any], poll_interval: float = 0.5) -> Any:
+    """Run a handler's work under the request deadline, cancelling it if the client disconnects"""
+    with deadline_scope(request_timeout(request)) as deadline:
+        work = asyncio.ensure_future(run_with_deadline(awaitable))
+        try:
+            while True:
+                done, _ = await asyncio.wait({work}, timeout=poll_interval)
+                if done:
+                    return work.result()
+                if await request.is_disconnected():
+                    logger.info(f"Client disconnected from {request.url.path}, cancelling its crew runs")
+                    deadline.cancel("cancelled: client disconnected")
+                    work.cancel()
+                    deadline.check()
+        finally:
+            if not work.done():
+                work.cancel()
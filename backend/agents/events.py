@@ -0,0 +1,156 @@
+"""Task progress events pushed from crew callbacks to streaming clients"""
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set
+
+from config.llm_config import llm_config
+
+logger = logging.getLogger(__name__)
+
+# Task id of the crew run executing in the current context, used to route LLM token events
+current_task_id: ContextVar[Optional[str]] = ContextVar("current_task_id", default=None)
+
+TERMINAL_EVENTS = {"completed", "failed"}
+
+# Queued in place of a slow subscriber's backlog to end its stream; it reconnects and replays history
+_OVERFLOWED = {"type": "overflowed"}
+
+class TaskEventBus:
+    """Fan-out of task progress events with a short replay buffer per task"""
+
+    def __init__(self, history_limit: int = 200, max_tracked_tasks: int = 500, queue_size: int = 1000):
+        self.history_limit = history_limit
+        self.max_tracked_tasks = max_tracked_tasks
+        # Room for the replayed history on top of live events
+        self.queue_size = max(queue_size, history_limit + 1)
+        self._history: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def publish(self, task_id: str, event_type: str, data: Any = None):
+        """Publish an event; safe to call from crew worker threads"""
+        event = {
+            "task_id": task_id,
+            "type": event_type,
+            "data": data,
+            "timestamp": datetime.now().isoformat()
+        }
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if self._loop is None or self._loop.is_closed():
+                return
+            self._loop.call_soon_threadsafe(self._dispatch, event)
+            return
+        self._dispatch(event)
+
+    def _dispatch(self, event: Dict[str, Any]):
+        task_id = event["task_id"]
+        history = self._history.get(task_id)
+        if history is None:
+            history = self._history[task_id] = deque(maxlen=self.history_limit)
+            while len(self._history) > self.max_tracked_tasks:
+                self._history.popitem(last=False)
+        history.append(event)
+        for queue in list(self._subscribers.get(task_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._overflow(task_id, queue, event)
+
+    def _overflow(self, task_id: str, queue: asyncio.Queue, event: Dict[str, Any]):
+        """Drop tokens for a subscriber that is behind, or disconnect it if a progress event would be lost"""
+        if event["type"] == "token":
+            return
+        backlog = []
+        while not queue.empty():
+            backlog.append(queue.get_nowait())
+        kept = [queued for queued in backlog if queued["type"] != "token"]
+        if len(kept) < queue.maxsize:
+            for queued in kept + [event]:
+                queue.put_nowait(queued)
+            return
+        logger.warning(f"Stream client for task {task_id} fell {len(kept)} events behind, disconnecting")
+        self._subscribers[task_id].discard(queue)
+        queue.put_nowait(_OVERFLOWED)
+
+    async def subscribe(self, task_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield buffered and live events for a task until it reaches a terminal event"""
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        for event in self._history.get(task_id, ()):
+            queue.put_nowait(event)
+        self._subscribers.setdefault(task_id, set()).add(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if event is _OVERFLOWED:
+                    return
+                yield event
+                if event["type"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            subscribers = self._subscribers.get(task_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[task_id]
+
+    def discard(self, task_id: str):
+        """Drop the replay buffer of a short-lived stream once its reader is done"""
+        self._history.pop(task_id, None)
+
+    def subscriber_count(self) -> int:
+        """Get the number of connected stream clients"""
+        return sum(len(queues) for queues in self._subscribers.values())
+
+# Global event bus instance
+task_events = TaskEventBus(queue_size=llm_config.task_event_queue_size)
+
+def _describe_step(step: Any) -> Dict[str, Any]:
+    """Convert a crewai step object (AgentAction, AgentFinish, ToolResult) into plain data"""
+    details = {"kind": type(step).__name__}
+    for field in ("thought", "tool", "tool_input", "result", "output", "text"):
+        value = getattr(step, field, None)
+        if value:
+            details[field] = str(value)
+    return details
+
+def publish_step(step: Any):
+    """Crew step_callback that publishes agent actions for the task running in this context"""
+    task_id = current_task_id.get()
+    if task_id:
+        task_events.publish(task_id, "agent_action", _describe_step(step))
+
+def publish_task_output(output: Any):
+    """Crew task_callback that publishes each finished crew task for the task running in this context"""
+    task_id = current_task_id.get()
+    if task_id:
+        task_events.publish(task_id, "step_completed", {
+            "agent": getattr(output, "agent", None),
+            "summary": getattr(output, "summary", None) or str(output)[:200]
+        })
+
+_token_listener_registered = False
+
+def register_token_listener():
+    """Forward LLM stream chunks for the active task, when this crewai version emits them"""
+    global _token_listener_registered
+    if _token_listener_registered:
+        return
+    _token_listener_registered = True
+    try:
+        from crewai.utilities.events import crewai_event_bus
+        from crewai.utilities.events.llm_events import LLMStreamChunkEvent
+    except ImportError:
+        logger.info("crewai event bus not available, token streaming disabled")
+        return
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def on_stream_chunk(source, event):
+        task_id = current_task_id.get()
+        if task_id:
+            task_events.publish(task_id, "token", event.chunk)
@@ -0,0 +1,98 @@
+"""Bounded worker pool for running blocking crew kickoffs off the event loop"""
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config.llm_config import llm_config
+from .deadlines import check_deadline
+
+logger = logging.getLogger(__name__)
+
+# Set for background work such as queued tasks, which waits for a slot within its deadline instead of being rejected
+wait_for_capacity: contextvars.ContextVar[bool] = contextvars.ContextVar("wait_for_capacity", default=False)
+
+class ExecutorSaturatedError(Exception):
+    """Raised when the crew executor has no room left for another kickoff"""
+
+    def __init__(self, provider: str, pending: int):
+        self.provider = provider
+        self.pending = pending
+        super().__init__(f"Crew executor saturated for provider '{provider}' ({pending} pending)")
+
+class CrewExecutor:
+    """Runs blocking crew work in a thread pool with per-provider limits and backpressure"""
+
+    def __init__(self, max_workers: int, max_queue_depth: int):
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crew-worker")
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._pending: Dict[str, int] = {}
+
+    def _get_semaphore(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(llm_config.get_provider_concurrency(provider))
+        return self._semaphores[provider]
+
+    def _capacity(self, provider: str) -> int:
+        return min(llm_config.get_provider_concurrency(provider), self.max_workers) + self.max_queue_depth
+
+    async def run(self, fn: Callable[..., Any], *args, provider: Optional[str] = None, **kwargs) -> Any:
+        """Run a blocking callable on the worker pool, rejecting it if the provider queue is full.
+
+        Callers that set wait_for_capacity queue for a slot instead, bounded by their deadline.
+        """
+        provider = provider or llm_config.default_provider
+        pending = self._pending.get(provider, 0)
+        if pending >= self._capacity(provider) and not wait_for_capacity.get():
+            raise ExecutorSaturatedError(provider, pending)
+
+        semaphore = self._get_semaphore(provider)
+        self._pending[provider] = pending + 1
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            self._pending[provider] -= 1
+            raise
+
+        def release(future: asyncio.Future):
+            semaphore.release()
+            self._pending[provider] -= 1
+            if not future.cancelled():
+                # Mark the error as seen in case the caller was cancelled and never awaits it
+                future.exception()
+
+        loop = asyncio.get_running_loop()
+        # Carry context variables such as the current task id and deadline into the worker thread
+        ctx = contextvars.copy_context()
+        future = loop.run_in_executor(self._pool, functools.partial(ctx.run, self._call, fn, *args, **kwargs))
+        # A cancelled caller cannot stop the thread, so the slot is only freed once the thread finishes
+        future.add_done_callback(release)
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _call(fn: Callable[..., Any], *args, **kwargs) -> Any:
+        # Skip work whose caller gave up while it sat in the pool queue
+        check_deadline()
+        return fn(*args, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current pool usage per provider"""
+        return {
+            "max_workers": self.max_workers,
+            "max_queue_depth": self.max_queue_depth,
+            "pending": dict(self._pending)
+        }
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work and release the worker threads"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+# Global executor instance
+crew_executor = CrewExecutor(
+    max_workers=llm_config.crew_workers,
+    max_queue_depth=llm_config.crew_queue_limit
+)
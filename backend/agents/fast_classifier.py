@@ -0,0 +1,192 @@
+"""Local TF-IDF lane classifier that answers confident cases without an LLM call"""
+import logging
+import math
+import threading
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from config.lanes import LANE_CONFIGS, LANE_DESCRIPTIONS
+from config.llm_config import llm_config
+from .classification_cache import normalize_transcript
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = frozenset("""
+    a an and are as at be but by for from have i in is it me my of on or our so that the
+    this to up we with about want need should will can get do just
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Unigram and bigram features of a transcript"""
+    words = [w for w in normalize_transcript(text).split() if w not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+def _seed_documents() -> List[Tuple[str, str]]:
+    """Training text for each lane taken from the lane definitions"""
+    docs = []
+    for lane, config in LANE_CONFIGS.items():
+        docs.append((lane, LANE_DESCRIPTIONS.get(lane, "")))
+        docs.append((lane, config["description"]))
+        docs.extend((lane, keyword) for keyword in config.get("keywords", []))
+        docs.extend((lane, action) for action in config.get("default_actions", []))
+    return docs
+
+class FastClassifier:
+    """Nearest-centroid classifier over sparse TF-IDF vectors, updated from confirmed LLM classifications.
+
+    Each lane keeps the sum of its documents' length-normalized term counts, and
+    IDF weights are applied when scoring, so learning an example only touches
+    that example's terms instead of refitting the whole model.
+    """
+
+    min_learn_confidence = 0.8
+
+    def __init__(self, threshold: float = 0.85, temperature: float = 0.1, refit_every: int = 20,
+                 max_examples: int = 5000):
+        self.threshold = threshold
+        # Softmax temperature applied to cosine similarities to turn them into a confidence
+        self.temperature = temperature
+        # Learned examples between refreshes of the lane norms, which drift as IDF changes
+        self.refit_every = refit_every
+        self.max_examples = max_examples
+        self.lanes = list(LANE_CONFIGS.keys())
+        # Learned examples, stored as (lane, text) like the seed documents
+        self._examples: Deque[Tuple[str, str]] = deque()
+        self._unfitted = 0
+        self._lock = threading.Lock()
+        self._doc_freq: Counter = Counter()
+        self._n_docs = 0
+        self._lane_terms: Dict[str, Dict[str, float]] = {}
+        self._lane_norms: Dict[str, float] = {}
+        self._refreshing = False
+        self.stats = {"answered": 0, "deferred": 0}
+        self.fit()
+
+    def fit(self, examples: Optional[Iterable[Tuple[str, str]]] = None):
+        """Rebuild the lane centroids from seeds plus learned (text, lane) examples"""
+        with self._lock:
+            learned = list(self._examples)
+            if examples is not None:
+                learned.extend((lane, text) for text, lane in examples if lane in self.lanes)
+            self._examples = deque()
+            self._doc_freq = Counter()
+            self._n_docs = 0
+            self._lane_terms = {lane: {} for lane in self.lanes}
+            for lane, text in _seed_documents():
+                self._add(lane, text, 1)
+            for lane, text in learned[-self.max_examples:]:
+                self._add(lane, text, 1)
+                self._examples.append((lane, text))
+            self._refresh_norms()
+
+    def _add(self, lane: str, text: str, sign: int):
+        """Add (sign=1) or remove (sign=-1) one document's terms; caller holds the lock"""
+        counts = Counter(tokenize(text))
+        if not counts:
+            return
+        norm = math.sqrt(sum(c * c for c in counts.values()))
+        terms = self._lane_terms[lane]
+        for token, count in counts.items():
+            self._doc_freq[token] += sign
+            value = terms.get(token, 0.0) + sign * count / norm
+            if self._doc_freq[token] <= 0:
+                del self._doc_freq[token]
+            if abs(value) < 1e-12:
+                terms.pop(token, None)
+            else:
+                terms[token] = value
+        self._n_docs += sign
+
+    def _idf(self, token: str) -> float:
+        return math.log((1 + self._n_docs) / (1 + self._doc_freq.get(token, 0))) + 1
+
+    @staticmethod
+    def _norms(lane_terms: Dict[str, Any], doc_freq: Dict[str, int], n_docs: int) -> Dict[str, float]:
+        return {
+            lane: math.sqrt(sum(
+                (value * (math.log((1 + n_docs) / (1 + doc_freq.get(token, 0))) + 1)) ** 2
+                for token, value in terms
+            ))
+            for lane, terms in lane_terms.items()
+        }
+
+    def _refresh_norms(self):
+        """Recompute lane norms in place; caller holds the lock"""
+        self._unfitted = 0
+        self._lane_norms = self._norms(
+            {lane: terms.items() for lane, terms in self._lane_terms.items()}, self._doc_freq, self._n_docs
+        )
+
+    def _refresh_norms_in_background(self):
+        # Copy under the lock (fast, C-level), then do the O(vocabulary) sums without holding it
+        with self._lock:
+            lane_terms = {lane: list(terms.items()) for lane, terms in self._lane_terms.items()}
+            doc_freq, n_docs = dict(self._doc_freq), self._n_docs
+        try:
+            norms = self._norms(lane_terms, doc_freq, n_docs)
+            with self._lock:
+                self._lane_norms = norms
+        finally:
+            self._refreshing = False
+
+    def predict(self, transcript: str) -> Dict[str, Any]:
+        """Score every lane and return the best one with its confidence"""
+        with self._lock:
+            query = {token: count * self._idf(token) for token, count in Counter(tokenize(transcript)).items()
+                     if token in self._doc_freq}
+            query_norm = math.sqrt(sum(v * v for v in query.values()))
+            similarities = []
+            for lane in self.lanes:
+                terms, norm = self._lane_terms[lane], self._lane_norms.get(lane, 0.0)
+                if not query_norm or not norm:
+                    similarities.append(0.0)
+                    continue
+                dot = sum(weight * terms.get(token, 0.0) * self._idf(token) for token, weight in query.items())
+                similarities.append(dot / (query_norm * norm))
+        top = max(similarities)
+        scaled = [math.exp((s - top) / self.temperature) for s in similarities]
+        best = similarities.index(top)
+        return {
+            "lane": self.lanes[best],
+            "confidence": scaled[best] / sum(scaled),
+            "similarity": top
+        }
+
+    def classify(self, transcript: str) -> Optional[Dict[str, Any]]:
+        """Return a classification if the local model is confident enough, else None"""
+        prediction = self.predict(transcript)
+        if prediction["similarity"] <= 0 or prediction["confidence"] < self.threshold:
+            self.stats["deferred"] += 1
+            return None
+        self.stats["answered"] += 1
+        return {
+            "lane": prediction["lane"],
+            "confidence": round(prediction["confidence"], 3),
+            "reasoning": f"Matched {prediction['lane']} vocabulary locally (similarity {prediction['similarity']:.2f})",
+            "tier": "local"
+        }
+
+    def learn(self, transcript: str, lane: str, confidence: float = 1.0):
+        """Add a confident LLM classification to its lane's centroid; cheap enough for the event loop"""
+        if lane not in self.lanes or confidence < self.min_learn_confidence:
+            return
+        with self._lock:
+            self._add(lane, transcript, 1)
+            self._examples.append((lane, transcript))
+            if len(self._examples) > self.max_examples:
+                self._add(*self._examples.popleft(), -1)
+            self._unfitted += 1
+            refresh = self._unfitted >= self.refit_every and not self._refreshing
+            if refresh:
+                self._unfitted = 0
+                self._refreshing = True
+        if refresh:
+            # IDF shifts with every example; refresh the norms off the calling (event loop) thread
+            threading.Thread(target=self._refresh_norms_in_background, daemon=True).start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get answer/defer counters and training size"""
+        return {**self.stats, "examples": len(self._examples), "threshold": self.threshold}
+
+# Global fast classifier instance
+fast_classifier = FastClassifier(threshold=llm_config.fast_classifier_threshold)
@@ -0,0 +1,110 @@
+"""Idempotency-Key handling so retried POST requests replay the original result"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config.llm_config import llm_config
+
+logger = logging.getLogger(__name__)
+
+# Route and Idempotency-Key of the request being handled, so side-effecting tools dedupe within it
+current_idempotency_key: ContextVar[Optional[str]] = ContextVar("current_idempotency_key", default=None)
+
+class IdempotencyConflictError(ValueError):
+    """Raised when an Idempotency-Key is reused with a different request body"""
+
+def fingerprint(payload: Any) -> str:
+    """Stable hash of a request body"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+class IdempotencyStore:
+    """Results of completed requests per (route, key), with in-flight duplicates sharing one run"""
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 86400):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._stats = {"replayed": 0, "coalesced": 0, "stored": 0, "conflicts": 0}
+
+    async def run(self, scope: str, key: str, payload: Any, handler: Callable[[], Awaitable[Any]]) -> Any:
+        """Run handler once per key; later calls with the same key and payload get its result.
+
+        Failed runs are not remembered, so a retry after an error runs again. The run is
+        cancelled once every caller waiting on it has gone, e.g. after client disconnects.
+        """
+        entry_key = (scope, key)
+        digest = fingerprint(payload)
+        entry = self._entries.get(entry_key)
+        if entry is not None and entry["expires_at"] < time.monotonic():
+            del self._entries[entry_key]
+            entry = None
+
+        if entry is not None:
+            if entry["fingerprint"] != digest:
+                self._stats["conflicts"] += 1
+                raise IdempotencyConflictError(f"Idempotency-Key '{key}' was already used with a different request")
+            if entry["future"].done():
+                self._stats["replayed"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        else:
+            future = asyncio.ensure_future(handler())
+            entry = self._entries[entry_key] = {
+                "fingerprint": digest,
+                "future": future,
+                "waiters": 0,
+                "expires_at": time.monotonic() + self.ttl_seconds
+            }
+            future.add_done_callback(lambda f: self._finish(entry_key, f))
+            self._evict()
+
+        entry["waiters"] += 1
+        try:
+            # Shielded so a disconnecting first caller does not fail duplicates already waiting on it
+            return await asyncio.shield(entry["future"])
+        finally:
+            entry["waiters"] -= 1
+            if entry["waiters"] == 0 and not entry["future"].done():
+                # Every caller gave up: stop the work instead of finishing it for nobody
+                entry["future"].cancel()
+
+    def _evict(self):
+        # Oldest finished runs first; dropping a running one would let a retry start a second run
+        if len(self._entries) <= self.max_size:
+            return
+        for entry_key in [k for k, e in self._entries.items() if e["future"].done()]:
+            del self._entries[entry_key]
+            if len(self._entries) <= self.max_size:
+                break
+
+    def _finish(self, entry_key: Tuple[str, str], future: asyncio.Future):
+        if not future.cancelled() and future.exception() is None:
+            self._stats["stored"] += 1
+            return
+        entry = self._entries.get(entry_key)
+        if entry is not None and entry["future"] is future:
+            del self._entries[entry_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get replay and conflict counts"""
+        return {**self._stats, "size": len(self._entries)}
+
+# Global idempotency store instance
+idempotency_store = IdempotencyStore(ttl_seconds=llm_config.idempotency_ttl)
+
+async def idempotent(request: Any, payload: Any, handler: Callable[[], Awaitable[Any]]) -> Any:
+    """Run a route's work under the request's Idempotency-Key header, if it sent one"""
+    key: Optional[str] = request.headers.get("idempotency-key")
+    if not key:
+        return await handler()
+    # Set before the run starts so the work, and the crew threads it spawns, inherit it
+    token = current_idempotency_key.set(f"{request.url.path}:{key}")
+    try:
+        return await idempotency_store.run(request.url.path, key, payload, handler)
+    finally:
+        current_idempotency_key.reset(token)
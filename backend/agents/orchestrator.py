@@ -1,51 +1,314 @@
-from crewai import Agent, Task, Crew, Process, LLM
-from crewai.tools import BaseTool
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Optional, Tuple, TYPE_CHECKING
+from functools import cached_property
 import os
 import json
+import asyncio
+import socket
+import threading
+import time
 import uuid
 from datetime import datetime
 import logging
-from ..config.llm_config import llm_config
+from config.llm_config import llm_config
+from config.llm_router import llm_router, provider_errors, CircuitOpenError
+from .executor import crew_executor, wait_for_capacity, ExecutorSaturatedError
+from .deadlines import DeadlineExceededError, deadline_scope, run_with_deadline, check_deadline
+from .scheduler import task_scheduler
+from .task_store import create_task_store, FINISHED_STATUSES
+from .classification_cache import classification_cache, normalize_transcript
+from .fast_classifier import fast_classifier
+from .research_cache import research_cache
+from .plan_cache import plan_cache
+from .events import task_events, current_task_id, publish_step, publish_task_output, register_token_listener
+from .crew_pool import CrewPool
+from .prompts import (
+    CLASSIFIER_LANES, CLASSIFY_TEMPLATE, CLASSIFY_BATCH_TEMPLATE, PLAN_TEMPLATE, STEP_TEMPLATE, RESEARCH_TEMPLATE, REPAIR_TEMPLATE,
+    PROMPT_INPUT, render
+)
+from .output_parser import (
+    OutputParseError, output_parser, output_text, parse_classification, parse_classification_batch, parse_plan
+)
+from models.schemas import TaskStatus, AgentType
+
+if TYPE_CHECKING:
+    from crewai import Agent, Crew
 
 logger = logging.getLogger(__name__)
 
+# Errors marking steps the user turned down, and steps not run because a dependency failed
+REJECTED_ERROR = "Rejected by user"
+SKIPPED_ERROR = "Skipped:"
+
+# Owner of the task leases taken by this process; unique per boot even where pids repeat across containers
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
 class AgentOrchestrator:
     """Main orchestrator for CrewAI agents"""
     
-    def __init__(self):
+    def __init__(self, crew_factory: Optional[Callable[[str, str], Any]] = None):
         # Check if we have valid API keys
         if not llm_config.has_valid_api_keys():
             logger.warning("No valid LLM API keys found. Agents will use default configuration.")
         
-        # Get LLM configuration
-        self.llm_config = llm_config.get_llm_config()
-        self.llm = None
-        if self.llm_config and "llm" in self.llm_config:
-            try:
-                llm_params = self.llm_config["llm"]
-                self.llm = LLM(
-                    model=llm_params["model"],
-                    api_key=llm_params["api_key"],
-                    temperature=llm_params.get("temperature", 0.7),
-                    max_tokens=llm_params.get("max_tokens", 2000)
-                )
-                logger.info(f"Initialized LLM with model: {llm_params['model']}")
-            except Exception as e:
-                logger.error(f"Failed to initialize LLM: {e}")
-                self.llm = None
+        # Default provider for the standalone agents; crew runs are routed across providers by llm_router.
+        # The crewai LLMs, agents and crews are all built on first use.
+        self.provider = llm_config.default_provider
+        self.warm_state = "cold"
+        self._llms: Dict[Tuple[str, Optional[str]], Any] = {}
+        self._lock = threading.Lock()
+        
+        self.task_store = create_task_store()
+        # Leases on this worker's queued and running tasks are renewed until it exits
+        self._closed = threading.Event()
+        threading.Thread(target=self._renew_leases, name="task-lease-heartbeat", daemon=True).start()
+        # Past tasks feed the local classifier and the plan cache; reading them can take a while
+        # on a large store, so it happens off the event loop and requests don't wait for it
+        threading.Thread(target=self._load_history, name="task-history-loader", daemon=True).start()
+        
+        # Workflow definitions: agent factory, task template, expected output and LLM profile
+        self.workflows = {
+            "classify": (
+                self._create_classifier_agent, CLASSIFY_TEMPLATE,
+                "JSON object with lane classification, confidence, and reasoning",
+                AgentType.CLASSIFIER.value
+            ),
+            "classify_batch": (
+                self._create_classifier_agent, CLASSIFY_BATCH_TEMPLATE,
+                "JSON array of lane classifications with id, lane, confidence, and reasoning",
+                "classifier_batch"
+            ),
+            "plan": (
+                self._create_coordinator_agent, PLAN_TEMPLATE,
+                "JSON execution plan with steps and agent assignments",
+                AgentType.TASK_COORDINATOR.value
+            ),
+            "research": (
+                self._create_researcher_agent, RESEARCH_TEMPLATE,
+                "Comprehensive research report with facts, developments, and recommendations",
+                AgentType.RESEARCHER.value
+            ),
+            "repair_json": (
+                self._create_classifier_agent, REPAIR_TEMPLATE,
+                "Valid JSON only",
+                "classifier_batch"
+            )
+        }
+        # Plan steps are carried out by the specialist agent they are assigned to
+        step_agents = {
+            AgentType.RESEARCHER.value: self._create_researcher_agent,
+            AgentType.CALENDAR_MANAGER.value: self._create_calendar_agent,
+            AgentType.CONTENT_CREATOR.value: self._create_content_agent,
+            AgentType.TASK_COORDINATOR.value: self._create_coordinator_agent
+        }
+        for agent_type, create_agent in step_agents.items():
+            self.workflows[f"step:{agent_type}"] = (create_agent, STEP_TEMPLATE, "Result of the step", agent_type)
+        # Cap on plan steps running at once across all tasks
+        self._step_slots = asyncio.Semaphore(llm_config.step_concurrency)
+        # Prebuilt crews per (workflow, provider); each pooled crew gets its own agent instance
+        self.crew_pools: Dict[Tuple[str, str], CrewPool] = {}
+        # Builds crews as crew_factory(workflow, provider) in place of crewai, e.g. fakes for tests and benchmarks
+        self.crew_factory = crew_factory
+    
+    def get_llm(self, provider: Optional[str] = None, profile: Optional[str] = None):
+        """crewai LLM for a provider and agent profile, or None to use crewai's default"""
+        key = (provider or self.provider, profile)
+        with self._lock:
+            if key not in self._llms:
+                self._llms[key] = self._create_llm(*key)
+            return self._llms[key]
+    
+    def _create_llm(self, provider: str, profile: Optional[str] = None):
+        config = llm_config.get_llm_config(provider, profile)
+        if not config or "llm" not in config:
+            return None
+        from crewai import LLM
+        register_token_listener()
+        try:
+            llm_params = config["llm"]
+            llm = LLM(
+                model=llm_params["model"],
+                api_key=llm_params["api_key"],
+                temperature=llm_params.get("temperature", 0.7),
+                max_tokens=llm_params.get("max_tokens", 2000),
+                timeout=llm_params.get("timeout"),
+                stream=llm_params.get("stream", False),
+                cache_control_injection_points=llm_params.get("cache_control_injection_points")
+            )
+            logger.info(f"Initialized LLM with model: {llm_params['model']} for {profile or 'default'} profile")
+            return llm
+        except Exception as e:
+            logger.error(f"Failed to initialize LLM: {e}")
+            return None
+    
+    @cached_property
+    def classifier_agent(self) -> "Agent":
+        return self._create_classifier_agent()
+    
+    @cached_property
+    def researcher_agent(self) -> "Agent":
+        return self._create_researcher_agent()
+    
+    @cached_property
+    def calendar_agent(self) -> "Agent":
+        return self._create_calendar_agent()
+    
+    @cached_property
+    def content_agent(self) -> "Agent":
+        return self._create_content_agent()
+    
+    @cached_property
+    def coordinator_agent(self) -> "Agent":
+        return self._create_coordinator_agent()
+    
+    def warm_up(self):
+        """Import crewai and prebuild the LLM, agents and one crew per workflow; blocking"""
+        self.warm_state = "warming"
+        try:
+            # Injected crews don't use the crewai agents
+            if self.crew_factory is None:
+                for agent in ("classifier_agent", "researcher_agent", "calendar_agent",
+                              "content_agent", "coordinator_agent"):
+                    getattr(self, agent)
+            for provider in llm_router.providers():
+                for workflow in self.workflows:
+                    self.get_crew_pool(workflow, provider).warm()
+            self.warm_state = "ready"
+            logger.info("Agents warmed up")
+        except Exception as e:
+            self.warm_state = "failed"
+            logger.error(f"Agent warm-up failed: {e}")
+    
+    def _build_agent(self, agent_config: Dict[str, Any], provider: Optional[str] = None,
+                     profile: Optional[str] = None) -> "Agent":
+        from crewai import Agent
         
-        # We'll add search tools later when we have API keys
-        self.task_history: Dict[str, Dict] = {}
+        # Add LLM if available
+        llm = self.get_llm(provider, profile)
+        if llm:
+            agent_config['llm'] = llm
+        agent_config.setdefault('max_iter', llm_config.max_iterations)
+        # crewai re-runs a failed task itself, which would retry past an expired deadline raised from
+        # step_callback; provider errors are retried by llm_router's failover instead
+        agent_config.setdefault('max_retry_limit', 0)
+
+        return Agent(**agent_config)
+    
+    def get_crew_pool(self, workflow: str, provider: str) -> CrewPool:
+        """Pool of single-task crews for a workflow on one provider, created on first use"""
+        key = (workflow, provider)
+        with self._lock:
+            if key not in self.crew_pools:
+                if self.crew_factory is not None:
+                    self.crew_pools[key] = CrewPool(
+                        f"{workflow}:{provider}", lambda: self.crew_factory(workflow, provider),
+                        max_idle=llm_config.get_provider_concurrency(provider)
+                    )
+                else:
+                    create_agent, template, expected_output, profile = self.workflows[workflow]
+                    self.crew_pools[key] = self._create_crew_pool(
+                        f"{workflow}:{provider}", lambda: create_agent(provider, profile), template, expected_output, provider
+                    )
+            return self.crew_pools[key]
+    
+    def set_crew_factory(self, crew_factory: Optional[Callable[[str, str], Any]]):
+        """Build crews with crew_factory(workflow, provider) from now on, dropping pooled crews"""
+        with self._lock:
+            self.crew_factory = crew_factory
+            self.crew_pools.clear()
+    
+    async def _kickoff(self, workflow: str, inputs: Dict[str, Any], hedge: bool = True,
+                       failover_exceptions: Optional[Tuple[type, ...]] = None) -> Any:
+        """Run a workflow crew on the best available provider with failover, within the current deadline"""
+        return await run_with_deadline(llm_router.run(
+            workflow,
+            lambda provider: crew_executor.run(
+                self.get_crew_pool(workflow, provider).kickoff, inputs, provider=provider
+            ),
+            neutral_exceptions=(ExecutorSaturatedError,),
+            abort_exceptions=(DeadlineExceededError,),
+            hedge=hedge,
+            failover_exceptions=failover_exceptions
+        ))
+    
+    def _create_crew_pool(self, name: str, create_agent, template: str, expected_output: str,
+                          provider: str) -> CrewPool:
+        """Pool of single-task crews whose task description is the template rendered from kickoff inputs"""
+        def build_crew() -> "Crew":
+            from crewai import Task, Crew, Process
+            
+            agent = create_agent()
+            task = Task(description=PROMPT_INPUT, agent=agent, expected_output=expected_output)
+            return Crew(
+                agents=[agent],
+                tasks=[task],
+                verbose=llm_config.agent_verbose,
+                process=Process.sequential,
+                step_callback=self._on_step,
+                task_callback=publish_task_output
+            )
         
-        # Initialize agents
-        self.classifier_agent = self._create_classifier_agent()
-        self.researcher_agent = self._create_researcher_agent()
-        self.calendar_agent = self._create_calendar_agent()
-        self.content_agent = self._create_content_agent()
-        self.coordinator_agent = self._create_coordinator_agent()
-    
-    def _create_classifier_agent(self) -> Agent:
+        # Rendered here in one pass rather than by crewai, which would substitute into inputs already filled in
+        return CrewPool(
+            name, build_crew, max_idle=llm_config.get_provider_concurrency(provider),
+            prepare_inputs=lambda inputs: {"prompt": render(template, inputs)}
+        )
+    
+    @staticmethod
+    def _on_step(step: Any):
+        # Runs in the crew thread after every agent step: stop there once the request deadline has passed
+        publish_step(step)
+        check_deadline()
+    
+    @staticmethod
+    def _lease() -> Dict[str, Any]:
+        """Ownership fields claiming a task for this worker"""
+        return {"worker_id": WORKER_ID, "lease_expires": time.time() + llm_config.task_lease}
+    
+    def _renew_leases(self):
+        while not self._closed.wait(llm_config.task_lease / 3):
+            try:
+                self.task_store.renew_leases(WORKER_ID, time.time() + llm_config.task_lease)
+            except Exception as e:
+                logger.error(f"Renewing task leases failed: {e}")
+    
+    def close(self):
+        """Stop renewing leases and close the task store"""
+        self._closed.set()
+        self.task_store.close()
+    
+    def _load_history(self):
+        """Train the local classifier and seed the plan cache from recent tasks; blocking"""
+        try:
+            self._train_fast_classifier()
+            self._warm_plan_cache()
+        except Exception as e:
+            logger.error(f"Loading task history failed: {e}")
+    
+    def _train_fast_classifier(self):
+        """Fit the local classifier on the most recent past tasks that were filed under a lane"""
+        records, _ = self.task_store.list(fields=["user_input", "lane"], limit=fast_classifier.max_examples)
+        examples = [(r["user_input"], r["lane"]) for r in records if r.get("lane") and r.get("user_input")]
+        if examples:
+            fast_classifier.fit(examples)
+            logger.info(f"Trained fast classifier on {len(examples)} past tasks")
+    
+    def _warm_plan_cache(self):
+        """Seed the plan cache from the most recent completed tasks, newest plans winning"""
+        if plan_cache.max_size <= 0:
+            return
+        records, _ = self.task_store.list(
+            status=TaskStatus.COMPLETED.value, fields=["user_input", "lane", "plan", "steps"],
+            limit=plan_cache.max_size
+        )
+        cached = sum(
+            plan_cache.put(r["user_input"], r.get("lane"), r.get("plan") or "", r.get("steps") or [])
+            for r in reversed(records) if r.get("user_input")
+        )
+        if cached:
+            logger.info(f"Cached {cached} plans from past tasks")
+    
+    def _create_classifier_agent(self, provider: Optional[str] = None,
+                                 profile: str = AgentType.CLASSIFIER.value) -> "Agent":
         """Agent responsible for classifying user inputs into lanes"""
         agent_config = {
             'role': 'Content Classifier',
@@ -53,57 +316,52 @@ class AgentOrchestrator:
             'backstory': """You are an expert at understanding context and categorizing 
                         content based on Rajeev's projects and interests. You understand 
                         the nuances between podcasting content, AI startup work, 
-                        accelerator activities, and general tasks.""",
+                        accelerator activities, and general tasks.""" + CLASSIFIER_LANES,
             'tools': [],
-            'verbose': True,
+            'verbose': llm_config.agent_verbose,
             'allow_delegation': False
         }
         
-        # Add LLM if available
-        if self.llm:
-            agent_config['llm'] = self.llm
-            
-        return Agent(**agent_config)
+        return self._build_agent(agent_config, provider, profile)
     
-    def _create_researcher_agent(self) -> Agent:
+    def _create_researcher_agent(self, provider: Optional[str] = None,
+                                 profile: str = AgentType.RESEARCHER.value) -> "Agent":
         """Agent for web research and information gathering"""
+        from tools.basic_tools import RESEARCH_TOOLS
+        
         agent_config = {
             'role': 'Research Specialist',
             'goal': 'Conduct thorough research and gather relevant information',
             'backstory': """You are a skilled researcher who can find accurate, 
                         up-to-date information on any topic. You know how to validate 
                         sources and provide comprehensive insights.""",
-            'tools': [],  # We'll add search tools when we have API keys
-            'verbose': True,
+            'tools': RESEARCH_TOOLS,
+            'verbose': llm_config.agent_verbose,
             'allow_delegation': False
         }
         
-        # Add LLM if available
-        if self.llm:
-            agent_config['llm'] = self.llm
-            
-        return Agent(**agent_config)
+        return self._build_agent(agent_config, provider, profile)
     
-    def _create_calendar_agent(self) -> Agent:
+    def _create_calendar_agent(self, provider: Optional[str] = None,
+                               profile: str = AgentType.CALENDAR_MANAGER.value) -> "Agent":
         """Agent for calendar and scheduling tasks"""
+        from tools.basic_tools import CALENDAR_TOOLS
+        
         agent_config = {
             'role': 'Calendar Manager',
             'goal': 'Handle all calendar-related tasks efficiently',
             'backstory': """You are an expert at managing schedules, finding optimal 
                         meeting times, and organizing calendar events. You understand 
                         time zones and scheduling best practices.""",
-            'tools': [],  # We'll add calendar tools later
-            'verbose': True,
+            'tools': CALENDAR_TOOLS,
+            'verbose': llm_config.agent_verbose,
             'allow_delegation': False
         }
         
-        # Add LLM if available
-        if self.llm:
-            agent_config['llm'] = self.llm
-            
-        return Agent(**agent_config)
+        return self._build_agent(agent_config, provider, profile)
     
-    def _create_content_agent(self) -> Agent:
+    def _create_content_agent(self, provider: Optional[str] = None,
+                              profile: str = AgentType.CONTENT_CREATOR.value) -> "Agent":
         """Agent for content creation and editing"""
         agent_config = {
             'role': 'Content Creator',
@@ -112,17 +370,14 @@ class AgentOrchestrator:
                         different platforms, writing styles, and audience engagement. 
                         You can adapt tone and format for various needs.""",
             'tools': [],
-            'verbose': True,
+            'verbose': llm_config.agent_verbose,
             'allow_delegation': False
         }
         
-        # Add LLM if available
-        if self.llm:
-            agent_config['llm'] = self.llm
-            
-        return Agent(**agent_config)
+        return self._build_agent(agent_config, provider, profile)
     
-    def _create_coordinator_agent(self) -> Agent:
+    def _create_coordinator_agent(self, provider: Optional[str] = None,
+                                  profile: str = AgentType.TASK_COORDINATOR.value) -> "Agent":
         """Agent that coordinates between other agents and manages workflow"""
         agent_config = {
             'role': 'Task Coordinator',
@@ -131,142 +386,568 @@ class AgentOrchestrator:
                         complex requests into manageable steps, coordinate between 
                         different specialists, and ensure tasks are completed efficiently.""",
             'tools': [],
-            'verbose': True,
+            'verbose': llm_config.agent_verbose,
             'allow_delegation': True
         }
         
-        # Add LLM if available
-        if self.llm:
-            agent_config['llm'] = self.llm
-            
-        return Agent(**agent_config)
+        return self._build_agent(agent_config, provider, profile)
     
     async def classify_update(self, transcript: str) -> Dict[str, Any]:
         """Classify a voice/text update into the appropriate lane"""
-        task = Task(
-            description=f"""
-            Classify the following user input into one of these lanes:
-            - podcasting: Podcast content, interviews, episode ideas, guest research
-            - podcast-bots-ai: AI startup work, product development, technical discussions
-            - accelerator-work: Business activities, networking, accelerator program tasks
-            - miscellaneous: General tasks, personal items, other activities
-            
-            User input: "{transcript}"
-            
-            Provide your classification with confidence level (0-1) and reasoning.
-            Return as JSON: {{"lane": "lane_name", "confidence": 0.95, "reasoning": "explanation"}}
-            """,
-            agent=self.classifier_agent,
-            expected_output="JSON object with lane classification, confidence, and reasoning"
-        )
-        
-        crew = Crew(
-            agents=[self.classifier_agent],
-            tasks=[task],
-            verbose=True,
-            process=Process.sequential
-        )
+        quick = self._classify_without_llm(transcript)
+        if quick is not None:
+            return quick
         
         try:
-            result = crew.kickoff()
-            # Parse the result (CrewAI returns string, we need to parse JSON)
-            if isinstance(result, str):
-                import json
-                return json.loads(result)
-            return result
+            output = await self._kickoff("classify", {"transcript": transcript})
+            result = await output_parser.parse(
+                output, parse_classification,
+                lambda raw: self._repair_output(raw, "a JSON object with lane, confidence and reasoning")
+            )
+            return self._record_llm_classification(transcript, result)
+        except (ExecutorSaturatedError, CircuitOpenError, DeadlineExceededError):
+            raise
         except Exception as e:
             logger.error(f"Classification error: {e}")
-            # Fallback classification
-            return {
-                "lane": "miscellaneous",
-                "confidence": 0.5,
-                "reasoning": "Classification failed, defaulting to miscellaneous"
-            }
+            return self._fallback_classification()
     
-    async def process_task(self, user_input: str, lane: str = None) -> str:
-        """Process a complex task using multiple agents"""
-        task_id = str(uuid.uuid4())
+    async def classify_batch(self, transcripts: List[str]) -> List[Dict[str, Any]]:
+        """Classify many updates, packing the ones that need the LLM into as few prompts as possible.
+
+        Items in a chunk the LLM could not take (executor saturated, providers down or deadline passed) get the
+        fallback classification flagged retryable; the error is raised only if no item was classified.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(transcripts)
+        pending: Dict[str, List[int]] = {}
+        for i, transcript in enumerate(transcripts):
+            results[i] = self._classify_without_llm(transcript)
+            if results[i] is None:
+                # Identical transcripts in one batch share a single prompt slot
+                pending.setdefault(normalize_transcript(transcript), []).append(i)
         
-        # Create coordination task
-        coordination_task = Task(
-            description=f"""
-            Plan and coordinate the execution of this user request:
-            "{user_input}"
-            
-            Lane context: {lane or "Not specified"}
-            
-            Break this down into steps and determine which agents need to be involved.
-            Consider if any actions require user confirmation before proceeding.
-            
-            Provide a detailed execution plan.
-            """,
-            agent=self.coordinator_agent,
-            expected_output="Detailed execution plan with steps and agent assignments"
+        chunks = self._pack_batches([indexes[0] for indexes in pending.values()], transcripts)
+        chunk_results = await asyncio.gather(
+            *(self._classify_chunk([transcripts[i] for i in chunk]) for chunk in chunks),
+            return_exceptions=True
         )
         
-        crew = Crew(
-            agents=[self.coordinator_agent],
-            tasks=[coordination_task],
-            verbose=True,
-            process=Process.sequential
+        unavailable: Optional[Exception] = None
+        for chunk, outcome in zip(chunks, chunk_results):
+            retryable = isinstance(outcome, (ExecutorSaturatedError, CircuitOpenError, DeadlineExceededError))
+            if retryable:
+                # Only this chunk missed the LLM; the others keep their results
+                logger.warning(f"Batch chunk of {len(chunk)} transcripts not classified: {outcome}")
+                unavailable = outcome
+                outcome = [None] * len(chunk)
+            elif isinstance(outcome, Exception):
+                logger.error(f"Batch classification error: {outcome}")
+                outcome = [None] * len(chunk)
+            for first, result in zip(chunk, outcome):
+                result = result or self._fallback_classification(retryable=retryable)
+                for i in pending[normalize_transcript(transcripts[first])]:
+                    results[i] = result
+        if unavailable is not None and all(result.get("retryable") for result in results):
+            # Nothing was classified: let the caller back off and send the whole batch again
+            raise unavailable
+        return results
+    
+    def _pack_batches(self, indexes: List[int], transcripts: List[str]) -> List[List[int]]:
+        """Group transcripts into chunks that fit the batch token budget"""
+        chunks, current, used = [], [], 0
+        for i in indexes:
+            # Rough token estimate: ~4 characters per token plus per-item JSON overhead
+            cost = len(transcripts[i]) // 4 + 40
+            if current and (used + cost > llm_config.classify_batch_token_budget
+                            or len(current) >= llm_config.classify_batch_max_items):
+                chunks.append(current)
+                current, used = [], 0
+            current.append(i)
+            used += cost
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    async def _classify_chunk(self, transcripts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Classify one packed chunk with a single crew run; unparseable items come back as None"""
+        numbered = "\n".join(f'            {i}. "{transcript}"' for i, transcript in enumerate(transcripts))
+        output = await self._kickoff("classify_batch", {"transcripts": numbered})
+        items = await output_parser.parse(
+            output, parse_classification_batch,
+            lambda raw: self._repair_output(raw, "a JSON array of objects with id, lane, confidence and reasoning")
+        )
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(transcripts)
+        for index, item in items.items():
+            if 0 <= index < len(transcripts):
+                results[index] = self._record_llm_classification(transcripts[index], item)
+        return results
+    
+    async def _repair_output(self, raw_output: str, expected: str) -> Any:
+        """Ask the small model once to turn malformed output into valid JSON"""
+        return await self._kickoff("repair_json", {"raw_output": raw_output[:4000], "expected": expected})
+    
+    def _classify_without_llm(self, transcript: str) -> Optional[Dict[str, Any]]:
+        """Answer from the classification cache or the local model when possible"""
+        cached = classification_cache.get(transcript)
+        if cached is not None:
+            return dict(cached, tier="cache")
+        return fast_classifier.classify(transcript)
+    
+    def _record_llm_classification(self, transcript: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Tag an LLM classification, cache it and feed it to the local model"""
+        result["tier"] = "llm"
+        classification_cache.put(transcript, result)
+        fast_classifier.learn(transcript, result["lane"], result.get("confidence", 0))
+        return result
+    
+    def _fallback_classification(self, retryable: bool = False) -> Dict[str, Any]:
+        return {
+            "lane": "miscellaneous",
+            "confidence": 0.5,
+            "reasoning": "Classification failed, defaulting to miscellaneous",
+            "tier": "fallback",
+            "retryable": retryable
+        }
+    
+    async def process_task(self, user_input: str, lane: str = None, priority: int = 0,
+                           timeout: Optional[float] = None, regenerate_plan: bool = False) -> str:
+        """Queue a complex task for background processing and return its id.
+
+        Unless regenerate_plan is set, a task matching an earlier completed one (same lane,
+        same request apart from names and dates) reuses that task's plan instead of planning.
+        """
+        task_id = str(uuid.uuid4())
+        self.task_store.put(task_id, {
+            "user_input": user_input,
+            "lane": lane,
+            "plan": None,
+            "status": TaskStatus.PENDING.value,
+            "priority": priority,
+            "timeout": min(timeout or llm_config.agent_timeout, llm_config.agent_timeout),
+            "regenerate_plan": regenerate_plan,
+            **self._lease(),
+            "created_at": datetime.now().isoformat()
+        })
+        
+        try:
+            task_scheduler.submit(task_id, lambda: self._run_task(task_id), priority=priority)
+        except asyncio.QueueFull:
+            self.task_store.delete(task_id)
+            raise
+        return task_id
+    
+    def _find_interrupted_tasks(self) -> List[Dict[str, Any]]:
+        """Queued or running tasks whose lease has lapsed because their worker stopped, e.g. across a restart"""
+        interrupted = []
+        now = time.time()
+        for status in (TaskStatus.PENDING.value, TaskStatus.PROCESSING.value):
+            cursor = None
+            while True:
+                records, cursor = self.task_store.list(
+                    status=status, fields=["worker_id", "lease_expires", "priority"], limit=500, cursor=cursor
+                )
+                interrupted.extend(r for r in records if (r.get("lease_expires") or 0) < now)
+                if cursor is None:
+                    break
+        return interrupted
+    
+    async def resume_interrupted_tasks(self) -> int:
+        """Claim tasks whose worker stopped and queue them again, resuming from their checkpoints.
+
+        Each task is claimed with a conditional write, so when several workers start together
+        every task is resumed by exactly one of them. Claimed tasks that cannot be queued are
+        marked failed with failure_reason "interrupted". Returns the number of tasks queued again.
+        """
+        records = await asyncio.get_running_loop().run_in_executor(None, self._find_interrupted_tasks)
+        claimed = resumed = 0
+        for record in records:
+            task_id = record["task_id"]
+            lease = self._lease()
+            if self.task_store.claim(
+                task_id, record.get("worker_id"), lease["worker_id"], lease["lease_expires"],
+                status=TaskStatus.PENDING.value
+            ) is None:
+                continue
+            claimed += 1
+            try:
+                task_scheduler.submit(
+                    task_id, lambda task_id=task_id: self._run_task(task_id), priority=record.get("priority", 0)
+                )
+                resumed += 1
+            except asyncio.QueueFull:
+                self.task_store.update(
+                    task_id,
+                    status=TaskStatus.FAILED.value,
+                    error="Interrupted by a restart and the task queue is full",
+                    failure_reason="interrupted",
+                    completed_at=datetime.now().isoformat()
+                )
+        if claimed:
+            logger.info(f"Resumed {resumed} of {claimed} interrupted tasks")
+        return resumed
+    
+    async def _run_task(self, task_id: str):
+        """Plan a queued task, then run its steps until it finishes or needs confirmation.
+
+        Steps are checkpointed in the task store as they finish, so a task resumed after
+        a confirmation continues where it stopped without re-planning or re-running steps.
+        """
+        record = self.task_store.get(task_id)
+        record = self.task_store.update(
+            task_id,
+            status=TaskStatus.PROCESSING.value,
+            **self._lease(),
+            started_at=record.get("started_at") or datetime.now().isoformat()
         )
+        task_events.publish(task_id, "status", {"status": record["status"]})
         
+        token = current_task_id.set(task_id)
+        # Nobody is waiting on a response, so kickoffs queue for the executor rather than fail under load
+        waiting_token = wait_for_capacity.set(True)
         try:
-            result = crew.kickoff()
-            self.task_history[task_id] = {
-                "user_input": user_input,
-                "lane": lane,
-                "plan": result,
-                "status": "planned",
-                "created_at": datetime.now().isoformat()
-            }
-            return task_id
+            # The clock starts when a worker picks the task up, not while it waits in the queue
+            with deadline_scope(record.get("timeout")):
+                if record.get("steps") is None:
+                    record = await self._plan_task(task_id, record)
+                record = await self._run_steps(task_id, record)
+            if record["status"] == TaskStatus.WAITING_CONFIRMATION.value:
+                # Release the worker; confirm_step queues the task again
+                return
+            failed = self._failed_steps(record["steps"])
+            if failed:
+                record = self.task_store.update(
+                    task_id,
+                    status=TaskStatus.FAILED.value,
+                    error=f"Steps failed: {', '.join(failed)}",
+                    failure_reason="steps_failed",
+                    completed_at=datetime.now().isoformat()
+                )
+                task_events.publish(task_id, "failed", {
+                    "status": record["status"], "error": record["error"], "steps": record["steps"]
+                })
+                return
+            record = self.task_store.update(
+                task_id,
+                status=TaskStatus.COMPLETED.value,
+                completed_at=datetime.now().isoformat()
+            )
+            # Only plans whose every step ran are worth reusing; one with rejected steps is not
+            if all(step["status"] == TaskStatus.COMPLETED.value for step in record["steps"]):
+                plan_cache.put(record["user_input"], record["lane"], record["plan"] or "", record["steps"])
+            task_events.publish(task_id, "completed", {
+                "status": record["status"], "plan": record["plan"], "steps": record["steps"]
+            })
         except Exception as e:
             logger.error(f"Task processing error: {e}")
-            raise
+            record = self.task_store.update(
+                task_id,
+                status=TaskStatus.FAILED.value,
+                error=str(e),
+                failure_reason="timeout" if isinstance(e, DeadlineExceededError) else "error",
+                completed_at=datetime.now().isoformat()
+            )
+            task_events.publish(task_id, "failed", {"status": record["status"], "error": record["error"]})
+        finally:
+            wait_for_capacity.reset(waiting_token)
+            current_task_id.reset(token)
     
-    async def execute_research_task(self, query: str) -> Dict[str, Any]:
-        """Execute a research task"""
-        research_task = Task(
-            description=f"""
-            Research the following topic thoroughly:
-            "{query}"
-            
-            Provide comprehensive information including:
-            - Key facts and current status
-            - Recent developments or news
-            - Relevant resources or links
-            - Practical insights or recommendations
-            """,
-            agent=self.researcher_agent,
-            expected_output="Comprehensive research report with facts, developments, and recommendations"
+    async def _plan_task(self, task_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Ask the coordinator for a plan, or reuse a cached one, and checkpoint it as steps"""
+        cached = None if record.get("regenerate_plan") else plan_cache.get(record["user_input"], record["lane"])
+        if cached is not None:
+            plan, steps = cached
+            record = self.task_store.update(task_id, plan=plan, steps=steps, plan_source="cache")
+            task_events.publish(task_id, "plan_ready", {"steps": steps, "cached": True})
+            return record
+        
+        task_events.publish(task_id, "step_started", {"step": "planning", "agent": AgentType.TASK_COORDINATOR.value})
+        output = await self._kickoff(
+            "plan", {"user_input": record["user_input"], "lane": record["lane"] or "Not specified"}
         )
+        try:
+            steps = await output_parser.parse(
+                output, parse_plan, lambda raw: self._repair_output(raw, "a JSON plan with a steps list")
+            )
+        except OutputParseError as e:
+            # Keep the plan text as the result, as before plans were structured
+            logger.warning(f"Plan for task {task_id} has no usable steps: {e}")
+            steps = []
+        record = self.task_store.update(task_id, plan=output_text(output), steps=steps, plan_source="llm")
+        task_events.publish(task_id, "plan_ready", {"steps": steps, "cached": False})
+        return record
+    
+    async def _run_steps(self, task_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Run steps as soon as their dependencies finish, independent ones in parallel.
+
+        When only steps awaiting confirmation (or steps depending on them) are left, the
+        task pauses in WAITING_CONFIRMATION with those steps listed in pending_steps.
+        """
+        steps = record["steps"]
+        by_id = {step["step_id"]: step for step in steps}
+        for step in steps:
+            if step["status"] == TaskStatus.PROCESSING.value:
+                # Interrupted before its checkpoint, so it never finished
+                step["status"] = TaskStatus.PENDING.value
+        
+        running: Dict[asyncio.Future, Dict[str, Any]] = {}
+        try:
+            while True:
+                launched = True
+                while launched:
+                    launched = False
+                    for step in steps:
+                        if step["status"] != TaskStatus.PENDING.value:
+                            continue
+                        deps = [by_id[d] for d in step.get("depends_on", [])]
+                        if any(d["status"] not in FINISHED_STATUSES for d in deps):
+                            continue
+                        failed = [d["step_id"] for d in deps if d["status"] == TaskStatus.FAILED.value]
+                        if failed:
+                            step["status"] = TaskStatus.FAILED.value
+                            step["error"] = f"{SKIPPED_ERROR} depends on step {failed[0]}, which did not complete"
+                            task_events.publish(task_id, "step_finished", {"step_id": step["step_id"], "status": step["status"]})
+                            # A skipped step can unblock (and skip) its own dependents
+                            launched = True
+                        elif self._needs_confirmation(step):
+                            step["status"] = TaskStatus.WAITING_CONFIRMATION.value
+                        else:
+                            step["status"] = TaskStatus.PROCESSING.value
+                            running[asyncio.ensure_future(self._run_step(task_id, step, by_id, record))] = step
+                
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    # Step failures are recorded on the step; only an expired deadline is raised
+                    future.result()
+                    # Checkpoint after every step so nothing finished is ever run again
+                    record = self.task_store.update(task_id, steps=steps)
+                    task_events.publish(task_id, "step_finished", {"step_id": step["step_id"], "status": step["status"]})
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
         
-        crew = Crew(
-            agents=[self.researcher_agent],
-            tasks=[research_task],
-            verbose=True,
-            process=Process.sequential
+        waiting = [step for step in steps if step["status"] == TaskStatus.WAITING_CONFIRMATION.value]
+        record = self.task_store.update(
+            task_id,
+            steps=steps,
+            **({"status": TaskStatus.WAITING_CONFIRMATION.value} if waiting else {}),
+            pending_steps=[step["step_id"] for step in waiting]
         )
+        for step in waiting:
+            task_events.publish(task_id, "waiting_confirmation", {
+                "step_id": step["step_id"],
+                "description": step["description"],
+                "agent_actions": step["agent_actions"]
+            })
+        return record
+    
+    @staticmethod
+    def _failed_steps(steps: List[Dict[str, Any]]) -> List[str]:
+        """Ids of steps that failed on their own, leaving out rejected steps and steps skipped as a result"""
+        return [
+            step["step_id"] for step in steps
+            if step["status"] == TaskStatus.FAILED.value
+            and step.get("error") != REJECTED_ERROR
+            and not (step.get("error") or "").startswith(SKIPPED_ERROR)
+        ]
+    
+    @staticmethod
+    def _needs_confirmation(step: Dict[str, Any]) -> bool:
+        return "confirmation" not in step and any(a.get("requires_confirmation") for a in step["agent_actions"])
+    
+    async def _run_step(self, task_id: str, step: Dict[str, Any], by_id: Dict[str, Dict[str, Any]],
+                        record: Dict[str, Any]):
+        """Run one plan step on its specialist agent within the global step cap, recording the result on the step.
+
+        A failed step is marked failed, so its dependents are skipped while independent
+        steps carry on; only an expired deadline is raised. Steps may run tools with side
+        effects, so they are not hedged and only move to another provider on provider errors.
+        """
+        agent_type = step["agent_actions"][0]["agent_type"]
+        workflow = f"step:{agent_type}"
+        if workflow not in self.workflows:
+            workflow = f"step:{AgentType.TASK_COORDINATOR.value}"
+        
+        async with self._step_slots:
+            task_events.publish(task_id, "step_started", {"step": step["step_id"], "agent": agent_type})
+            try:
+                output = await self._kickoff(workflow, {
+                    "user_input": record["user_input"],
+                    "step": step["description"],
+                    "actions": json.dumps(step["agent_actions"]),
+                    "context": self._step_context([by_id[d] for d in step.get("depends_on", [])] + [step])
+                }, hedge=False, failover_exceptions=provider_errors())
+            except DeadlineExceededError as e:
+                step["status"] = TaskStatus.FAILED.value
+                step["error"] = str(e)
+                self.task_store.update(task_id, steps=list(by_id.values()))
+                raise
+            except Exception as e:
+                logger.warning(f"Step {step['step_id']} of task {task_id} failed: {e}")
+                step["status"] = TaskStatus.FAILED.value
+                step["error"] = str(e)
+                return
+        step["status"] = TaskStatus.COMPLETED.value
+        step["result"] = {"output": output_text(output)}
+    
+    @staticmethod
+    def _step_context(steps: List[Dict[str, Any]]) -> str:
+        """Summary of the given steps' results and confirmation notes for a step's prompt"""
+        lines = []
+        for step in steps:
+            confirmation = step.get("confirmation") or {}
+            if step["status"] == TaskStatus.COMPLETED.value:
+                lines.append(f"- Step {step['step_id']} ({step['description']}): {step['result']['output'][:1000]}")
+            elif step["status"] == TaskStatus.FAILED.value:
+                lines.append(f"- Step {step['step_id']} ({step['description']}) was not done: {step.get('error')}")
+            if confirmation.get("notes"):
+                lines.append(f"  User notes on step {step['step_id']}: {confirmation['notes']}")
+        return "\n".join(lines) or "None yet"
+    
+    def confirm_step(self, task_id: str, step_id: str, approved: bool, notes: Optional[str] = None) -> Dict[str, Any]:
+        """Record the user's decision on a paused step and queue the task to resume from its checkpoint.
+
+        Raises KeyError for an unknown task and ValueError if the task is not waiting on this step.
+        """
+        record = self.task_store.get(task_id)
+        if record is None:
+            raise KeyError(task_id)
+        pending_steps = record.get("pending_steps") or []
+        if record["status"] != TaskStatus.WAITING_CONFIRMATION.value or step_id not in pending_steps:
+            raise ValueError(f"Task {task_id} is not waiting for confirmation of step {step_id}")
+        
+        steps = record["steps"]
+        step = next(s for s in steps if s["step_id"] == step_id)
+        remaining = [s for s in pending_steps if s != step_id]
+        step["confirmation"] = {"approved": approved, "notes": notes, "at": datetime.now().isoformat()}
+        if approved:
+            step["status"] = TaskStatus.PENDING.value
+        else:
+            step["status"] = TaskStatus.FAILED.value
+            step["error"] = REJECTED_ERROR
+        record = self.task_store.update(
+            task_id, steps=steps, status=TaskStatus.PENDING.value, pending_steps=remaining, **self._lease()
+        )
+        task_events.publish(task_id, "confirmation_received", {"step_id": step_id, "approved": approved})
         
         try:
-            result = crew.kickoff()
+            task_scheduler.submit(task_id, lambda: self._run_task(task_id), priority=record.get("priority", 0))
+        except asyncio.QueueFull:
+            # Stay paused so the confirmation can be sent again
+            del step["confirmation"]
+            step["status"] = TaskStatus.WAITING_CONFIRMATION.value
+            step["error"] = None
+            self.task_store.update(
+                task_id, steps=steps, status=TaskStatus.WAITING_CONFIRMATION.value, pending_steps=pending_steps
+            )
+            raise
+        return record
+    
+    def _research_run(self, query: str, hedge: bool = True) -> Callable[[], Awaitable[Dict[str, Any]]]:
+        """Research run for the research cache to start, producing the result envelope"""
+        async def run() -> Dict[str, Any]:
+            result = await self._kickoff("research", {"query": query}, hedge=hedge)
             return {
                 "query": query,
-                "research_result": result,
+                "research_result": str(result),
                 "timestamp": datetime.now().isoformat()
             }
+        return run
+    
+    async def execute_research_task(self, query: str, refresh: bool = False) -> Dict[str, Any]:
+        """Execute a research task, answering repeated and concurrent identical queries from one run"""
+        try:
+            envelope, outcome = await research_cache.get_or_run(query, self._research_run(query), refresh=refresh)
+            return dict(envelope, query=query, cached=outcome != "miss")
         except Exception as e:
             logger.error(f"Research task error: {e}")
             raise
     
+    async def stream_research_task(self, query: str, refresh: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Yield research LLM tokens as they arrive, then the final result envelope.
+
+        Streams share the research cache's single flight: a stream for a query already
+        being researched follows that run, replaying its tokens so far. If a provider
+        fails mid-stream the router retries on another one, so the final "result" event,
+        not the concatenated tokens, is the authoritative report.
+        """
+        yield {"type": "started", "data": {"query": query}}
+        cached = None if refresh else research_cache.get(query)
+        if cached is not None:
+            yield {"type": "result", "data": dict(cached, query=query, cached=True)}
+            return
+        # No hedging when this stream starts the run, so only one provider writes tokens to it
+        flight, outcome = research_cache.join(query, self._research_run(query, hedge=False))
+        # Holds this stream's place among the run's waiters, for no longer than the request deadline
+        waiting = asyncio.ensure_future(run_with_deadline(research_cache.wait(flight)))
+        waiting.add_done_callback(lambda f: f.cancelled() or f.exception())
+        events = task_events.subscribe(flight.stream_id)
+        next_event = asyncio.ensure_future(events.__anext__())
+        try:
+            while True:
+                await asyncio.wait({next_event, waiting}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_event.done():
+                    if not flight.task.done():
+                        # This request's deadline passed while the shared run carries on for others
+                        yield {"type": "error", "data": {"error": str(waiting.exception())}}
+                        return
+                    # The run finished; its final event is on the way
+                    await asyncio.wait({next_event})
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    return
+                if event["type"] == "token":
+                    yield {"type": "token", "data": event["data"]}
+                elif event["type"] == "completed":
+                    yield {"type": "result", "data": dict(event["data"], query=query, cached=outcome != "miss")}
+                elif event["type"] == "failed":
+                    yield {"type": "error", "data": event["data"]}
+                next_event = asyncio.ensure_future(events.__anext__())
+        finally:
+            # The reader went away: the run is stopped once no other caller waits for it
+            waiting.cancel()
+            next_event.cancel()
+            try:
+                await next_event
+            except (asyncio.CancelledError, StopAsyncIteration):
+                pass
+            await events.aclose()
+    
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get the status of a specific task"""
-        return self.task_history.get(task_id)
+        return self.task_store.get(task_id)
     
-    def list_active_tasks(self) -> List[Dict[str, Any]]:
-        """List all active/recent tasks"""
-        return list(self.task_history.values())
+    def list_tasks(self, **filters) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List one page of tasks; see TaskStore.list for the supported filters"""
+        return self.task_store.list(**filters)
+    
+    def count_tasks(self) -> Dict[str, int]:
+        """Get task counts per status"""
+        return self.task_store.count_by_status()
+
+_orchestrator: Optional[AgentOrchestrator] = None
+_orchestrator_lock = threading.Lock()
+
+def get_orchestrator() -> AgentOrchestrator:
+    """Get the global orchestrator, creating it on first use"""
+    global _orchestrator
+    if _orchestrator is None:
+        with _orchestrator_lock:
+            if _orchestrator is None:
+                _orchestrator = AgentOrchestrator()
+    return _orchestrator
+
+def close_orchestrator():
+    """Release the orchestrator's resources if it was ever created"""
+    if _orchestrator is not None:
+        _orchestrator.close()
 
-# Global orchestrator instance
-orchestrator = AgentOrchestrator()
+def __getattr__(name: str):
+    # Keep `from agents.orchestrator import orchestrator` working without building it at import time
+    if name == "orchestrator":
+        return get_orchestrator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,212 @@
+"""Tolerant extraction and validation of structured crew outputs"""
+import json
+import logging
+import re
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from models.schemas import AgentType, ClassificationResult, TaskStep
+
+logger = logging.getLogger(__name__)
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_DECODER = json.JSONDecoder()
+
+class OutputParseError(ValueError):
+    """Raised when a crew output holds no usable structured data"""
+
+def output_text(output: Any) -> str:
+    """Raw text of a crew output (CrewOutput, TaskOutput or plain string)"""
+    raw = getattr(output, "raw", None)
+    return raw if isinstance(raw, str) else str(output)
+
+def extract_json(output: Any) -> Any:
+    """Pull the first JSON object or array out of a crew output, ignoring fences and surrounding prose"""
+    json_dict = getattr(output, "json_dict", None)
+    if isinstance(json_dict, dict):
+        return json_dict
+    if isinstance(output, (dict, list)):
+        return output
+
+    text = output_text(output).strip()
+    candidates = [m.group(1).strip() for m in _FENCE.finditer(text)] + [text]
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            pass
+        # Fall back to decoding from each opening bracket, skipping prose before and after the value
+        for match in re.finditer(r"[\[{]", candidate):
+            try:
+                value, _ = _DECODER.raw_decode(candidate, match.start())
+                return value
+            except ValueError:
+                continue
+    raise OutputParseError(f"No JSON found in output: {text[:200]!r}")
+
+def _normalize_classification(data: Any) -> Dict[str, Any]:
+    """Fix the small deviations models make before validating against ClassificationResult"""
+    if not isinstance(data, dict):
+        raise OutputParseError(f"Expected a JSON object, got {type(data).__name__}")
+    data = dict(data)
+    if isinstance(data.get("lane"), str):
+        data["lane"] = re.sub(r"[\s_]+", "-", data["lane"].strip().lower())
+    confidence = data.get("confidence")
+    if isinstance(confidence, str):
+        confidence = confidence.strip().rstrip("%")
+    try:
+        confidence = float(confidence)
+        # Percentages such as 95 or "95%" become 0.95
+        data["confidence"] = min(max(confidence / 100 if confidence > 1 else confidence, 0.0), 1.0)
+    except (TypeError, ValueError):
+        pass
+    data.setdefault("reasoning", "")
+    data.pop("tier", None)
+    try:
+        return ClassificationResult.model_validate(data).model_dump(mode="json", exclude_none=True)
+    except ValidationError as e:
+        raise OutputParseError(f"Invalid classification: {e.errors()[0]['msg']}") from e
+
+def parse_classification(output: Any) -> Dict[str, Any]:
+    """Validated classification dict from a classifier crew output"""
+    data = extract_json(output)
+    if isinstance(data, list) and len(data) == 1:
+        data = data[0]
+    return _normalize_classification(data)
+
+def parse_classification_batch(output: Any) -> Dict[int, Dict[str, Any]]:
+    """Validated classifications by input id from a batch crew output; invalid items are skipped"""
+    data = extract_json(output)
+    if isinstance(data, dict):
+        # Some models wrap the array, e.g. {"results": [...]}
+        data = next((v for v in data.values() if isinstance(v, list)), None)
+    if not isinstance(data, list):
+        raise OutputParseError("Expected a JSON array of classifications")
+
+    results: Dict[int, Dict[str, Any]] = {}
+    for item in data:
+        try:
+            index = int(item.pop("id"))
+            results[index] = _normalize_classification(item)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue
+    if data and not results:
+        raise OutputParseError("No valid classifications in batch output")
+    return results
+
+_AGENT_ALIASES = {
+    "research": AgentType.RESEARCHER.value,
+    "calendar": AgentType.CALENDAR_MANAGER.value,
+    "content": AgentType.CONTENT_CREATOR.value,
+    "coordinator": AgentType.TASK_COORDINATOR.value
+}
+
+def _normalize_step(data: Any, position: int) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        raise OutputParseError(f"Expected a JSON object for step {position}")
+    data = dict(data)
+    data["step_id"] = str(data.get("step_id") or data.get("id") or position)
+    data.setdefault("description", data.get("step_id"))
+    actions = []
+    for action in data.get("agent_actions") or []:
+        if not isinstance(action, dict):
+            continue
+        action = dict(action)
+        agent_type = re.sub(r"[\s-]+", "_", str(action.get("agent_type", "")).strip().lower())
+        action["agent_type"] = _AGENT_ALIASES.get(agent_type, agent_type)
+        action.setdefault("action", data["description"])
+        action["parameters"] = action.get("parameters") or {}
+        actions.append(action)
+    data["agent_actions"] = actions or [
+        {"agent_type": AgentType.TASK_COORDINATOR.value, "action": data["description"], "parameters": {}}
+    ]
+    depends_on = data.get("depends_on")
+    if depends_on is not None:
+        data["depends_on"] = [str(d) for d in (depends_on if isinstance(depends_on, list) else [depends_on])]
+    data["status"] = "pending"
+    try:
+        return TaskStep.model_validate(data).model_dump(mode="json")
+    except ValidationError as e:
+        raise OutputParseError(f"Invalid plan step {position}: {e.errors()[0]['msg']}") from e
+
+def parse_plan(output: Any) -> List[Dict[str, Any]]:
+    """Validated TaskStep dicts from a coordinator plan"""
+    data = extract_json(output)
+    if isinstance(data, dict):
+        data = data.get("steps")
+    if not isinstance(data, list) or not data:
+        raise OutputParseError("Expected a plan with a non-empty steps list")
+    explicit = any(isinstance(step, dict) and "depends_on" in step for step in data)
+    return _resolve_dependencies([_normalize_step(step, i + 1) for i, step in enumerate(data)], explicit)
+
+def _resolve_dependencies(steps: List[Dict[str, Any]], explicit: bool) -> List[Dict[str, Any]]:
+    """Make depends_on a valid DAG; plans without dependencies, or with a cycle, run in order"""
+    ids = [step["step_id"] for step in steps]
+    if explicit and len(set(ids)) == len(ids):
+        for step in steps:
+            step["depends_on"] = [d for d in dict.fromkeys(step["depends_on"]) if d in ids and d != step["step_id"]]
+        if not _has_cycle(steps):
+            return steps
+        logger.warning("Plan dependencies contain a cycle, running its steps in order")
+    for i, step in enumerate(steps):
+        step["step_id"] = str(i + 1)
+        step["depends_on"] = [str(i)] if i else []
+    return steps
+
+def _has_cycle(steps: List[Dict[str, Any]]) -> bool:
+    remaining = {step["step_id"]: set(step["depends_on"]) for step in steps}
+    while remaining:
+        ready = [step_id for step_id, deps in remaining.items() if not deps]
+        if not ready:
+            return True
+        for step_id in ready:
+            del remaining[step_id]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return False
+
+class StructuredOutputParser:
+    """Parses crew outputs, asking the LLM once to repair output that does not parse"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"parsed": 0, "parse_failures": 0, "repaired": 0, "repair_failures": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    async def parse(
+        self,
+        output: Any,
+        parse: Callable[[Any], Any],
+        repair: Optional[Callable[[str], Awaitable[Any]]] = None
+    ) -> Any:
+        """Parse output; on failure run repair(raw_text) once and parse its result instead"""
+        try:
+            result = parse(output)
+            self._count("parsed")
+            return result
+        except OutputParseError as e:
+            self._count("parse_failures")
+            if repair is None:
+                raise
+            logger.warning(f"Unparseable crew output, attempting repair: {e}")
+
+        try:
+            result = parse(await repair(output_text(output)))
+            self._count("repaired")
+            return result
+        except Exception:
+            self._count("repair_failures")
+            raise
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get parse and repair counts"""
+        with self._lock:
+            return dict(self._stats)
+
+# Global parser instance
+output_parser = StructuredOutputParser()
@@ -0,0 +1,174 @@
+"""Reuse of coordinator plans for recurring requests that differ only in names and dates"""
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.llm_config import llm_config
+from models.schemas import TaskStatus
+from .classification_cache import normalize_transcript
+
+_MONTHS = (
+    r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|"
+    r"Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+)
+_WEEKDAYS = r"(?:Mon|Tues|Wednes|Thurs|Fri|Satur|Sun)day"
+_DATE = re.compile(
+    r"\b(?:"
+    r"\d{4}-\d{2}-\d{2}"
+    r"|\d{1,2}/\d{1,2}(?:/\d{2,4})?"
+    rf"|{_MONTHS}\.? \d{{1,2}}(?:st|nd|rd|th)?(?:,? \d{{4}})?"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)? (?:of )?{_MONTHS}(?: \d{{4}})?"
+    rf"|(?:(?:next|this) )?{_WEEKDAYS}"
+    r"|today|tonight|tomorrow"
+    r"|(?:next|this) (?:week|month)"
+    r"|\d{1,2}(?::\d{2})? ?(?:am|pm)"
+    r")\b",
+    re.IGNORECASE
+)
+# Runs of capitalized words; the first word of a sentence is only a name if it is not a verb like "Schedule"
+_NAME = re.compile(r"(?<![.!?]\s)(?<!^)\b[A-Z][A-Za-z'\-]+(?: [A-Z][A-Za-z'\-]+)*")
+
+def extract_slots(text: str) -> Tuple[str, Dict[str, str]]:
+    """Replace dates and names with numbered slots.
+
+    Returns the normalized intent signature and the slot values, e.g.
+    "Prep episode with Jane Doe on Friday" -> ("prep episode with name0 on date0",
+    {"name0": "Jane Doe", "date0": "Friday"}).
+    """
+    slots: Dict[str, str] = {}
+
+    def slot(kind: str):
+        def replace(match: re.Match) -> str:
+            value = match.group(0)
+            for name, existing in slots.items():
+                if existing == value and name.startswith(kind):
+                    return f" {name} "
+            name = f"{kind}{sum(1 for s in slots if s.startswith(kind))}"
+            slots[name] = value
+            return f" {name} "
+        return replace
+
+    text = _DATE.sub(slot("date"), text.strip())
+    text = _NAME.sub(slot("name"), text)
+    return normalize_transcript(text), slots
+
+def _word(value: str) -> "re.Pattern":
+    """Pattern matching value as a whole word or phrase"""
+    return re.compile(rf"(?<!\w){re.escape(value)}(?!\w)")
+
+def _template_steps(steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Plan steps without the results and state of the run that produced them"""
+    return [
+        {
+            "step_id": step["step_id"],
+            "description": step["description"],
+            "agent_actions": step["agent_actions"],
+            "depends_on": step.get("depends_on", []),
+            "status": TaskStatus.PENDING.value,
+            "result": None,
+            "error": None
+        }
+        for step in steps
+    ]
+
+class PlanCache:
+    """LRU/TTL cache of parameterized plans keyed on lane and intent signature"""
+
+    def __init__(self, max_size: int = 500, ttl_seconds: float = 604800):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stored": 0, "unparameterizable": 0}
+
+    def get(self, user_input: str, lane: Optional[str]) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """Get (plan text, steps) from a cached plan, filled in with this request's names and dates"""
+        if self.max_size <= 0:
+            return None
+        signature, slots = extract_slots(user_input)
+        key = (lane or "", signature)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            plan, steps = entry["plan"], entry["steps"]
+
+        plan = self._fill(plan, slots)
+        steps = json.loads(self._fill(steps, {k: json.dumps(v)[1:-1] for k, v in slots.items()}))
+        return plan, steps
+
+    def put(self, user_input: str, lane: Optional[str], plan: str, steps: List[Dict[str, Any]]) -> bool:
+        """Cache a plan that completed, with this request's names and dates turned into slots.
+
+        Plans that still mention part of a name or date after slotting (e.g. only a first
+        name, or a date the LLM resolved to "2026-10-18") are not cached, since reusing
+        them would carry the old value into a new task.
+        """
+        if self.max_size <= 0 or not steps:
+            return False
+        if any(step.get("status") != TaskStatus.COMPLETED.value for step in steps):
+            # A plan with failed or rejected steps is not known to work
+            return False
+        signature, slots = extract_slots(user_input)
+        # Longest values first so "Jane Doe" is slotted before a bare "Jane" could be
+        ordered = sorted(slots.items(), key=lambda item: len(item[1]), reverse=True)
+        steps_json = json.dumps(_template_steps(steps))
+        for name, value in ordered:
+            # Whole words only, so slotting "Al" leaves "Also" alone
+            plan = _word(value).sub(f"{{{{{name}}}}}", plan)
+            steps_json = _word(json.dumps(value)[1:-1]).sub(f"{{{{{name}}}}}", steps_json)
+        text = plan + steps_json
+        leaked = any(
+            re.search(rf"\b(?:{'|'.join(re.escape(word) for word in value.split())})\b", text)
+            for name, value in slots.items() if name.startswith("name")
+        ) or _DATE.search(text) is not None
+        if leaked:
+            with self._lock:
+                self._stats["unparameterizable"] += 1
+            return False
+
+        key = (lane or "", signature)
+        with self._lock:
+            self._entries[key] = {
+                "plan": plan,
+                "steps": steps_json,
+                "expires_at": time.monotonic() + self.ttl_seconds
+            }
+            self._entries.move_to_end(key)
+            self._stats["stored"] += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return True
+
+    @staticmethod
+    def _fill(template: str, slots: Dict[str, str]) -> str:
+        for name, value in slots.items():
+            template = template.replace(f"{{{{{name}}}}}", value)
+        return template
+
+    def clear(self):
+        """Drop all cached plans"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0
+            }
+
+# Global cache instance
+plan_cache = PlanCache(max_size=llm_config.plan_cache_size, ttl_seconds=llm_config.plan_cache_ttl)
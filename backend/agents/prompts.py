@@ -0,0 +1,102 @@
+"""Task prompt templates, rendered from kickoff inputs before each crew run"""
+import re
+from typing import Any, Dict
+
+from config.lanes import LANE_DESCRIPTIONS
+
+# Same placeholder syntax crewai interpolates; JSON examples such as {"lane": ...} do not match
+_PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_\-]*)\}")
+
+# The one placeholder in crew task descriptions, filled with the rendered template
+PROMPT_INPUT = "{prompt}"
+
+def render(template: str, inputs: Dict[str, Any]) -> str:
+    """Fill in a template's placeholders in a single pass; raises KeyError for a missing input.
+
+    crewai replaces one placeholder at a time across the whole text, so a "{context}" in
+    user text filled in earlier would be replaced as well. Here inserted values are never rescanned.
+    """
+    return _PLACEHOLDER.sub(lambda match: str(inputs[match.group(1)]), template)
+
+LANE_LIST = "\n".join(f"            - {lane}: {description}" for lane, description in LANE_DESCRIPTIONS.items())
+
+# Templates put their fixed instructions first and the per-call inputs last, and the
+# lane definitions live in the classifier's backstory, so every call to a workflow
+# starts with the same prefix and providers with prompt caching can reuse it.
+CLASSIFIER_LANES = """
+
+            The lanes are:
+""" + LANE_LIST
+
+CLASSIFY_TEMPLATE = """
+            Classify the user input below into one of the lanes, with a confidence level (0-1)
+            and reasoning.
+            Return as JSON: {"lane": "lane_name", "confidence": 0.95, "reasoning": "explanation"}
+
+            User input: "{transcript}"
+            """
+
+CLASSIFY_BATCH_TEMPLATE = """
+            Classify each of the user inputs below into one of the lanes, with a confidence
+            level (0-1) and reasoning for every input.
+            Return a JSON array with one object per input, in any order:
+            [{"id": 0, "lane": "lane_name", "confidence": 0.95, "reasoning": "explanation"}]
+
+            User inputs:
+{transcripts}
+            """
+
+PLAN_TEMPLATE = """
+            Plan and coordinate the execution of the user request below.
+
+            Break it down into steps and determine which agents need to be involved.
+            Each step is carried out by one agent: researcher, calendar_manager,
+            content_creator or task_coordinator.
+            Consider if any actions require user confirmation before proceeding; anything that
+            sends messages, books time or publishes content does.
+
+            List in depends_on the step_ids whose results a step needs; steps that do not
+            depend on each other run at the same time.
+
+            Return the plan as JSON:
+            {"summary": "one-line overview", "steps": [{"step_id": "1", "description": "what to do",
+            "depends_on": [], "agent_actions": [{"agent_type": "researcher", "action": "short action name",
+            "parameters": {}, "requires_confirmation": false}]}]}
+
+            Lane context: {lane}
+            User request: "{user_input}"
+            """
+
+STEP_TEMPLATE = """
+            You are carrying out one step of a larger plan. Carry out the step described
+            below and report its result.
+
+            User request: "{user_input}"
+
+            Step: {step}
+            Actions: {actions}
+
+            Results of earlier steps:
+            {context}
+            """
+
+RESEARCH_TEMPLATE = """
+            Research the topic below thoroughly.
+
+            Provide comprehensive information including:
+            - Key facts and current status
+            - Recent developments or news
+            - Relevant resources or links
+            - Practical insights or recommendations
+
+            Topic: "{query}"
+            """
+
+REPAIR_TEMPLATE = """
+            The following output was supposed to be {expected} but could not be parsed:
+
+            {raw_output}
+
+            Rewrite it as valid JSON with the same content. Return only the JSON, with no
+            markdown fences or commentary.
+            """
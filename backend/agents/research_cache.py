@@ -0,0 +1,205 @@
+"""Research results cache with freshness windows and single-flight request coalescing"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config.llm_config import llm_config
+from .classification_cache import normalize_transcript
+from .deadlines import Deadline, current_deadline
+from .events import current_task_id, task_events
+
+logger = logging.getLogger(__name__)
+
+class _Flight:
+    """One in-flight research run shared by every caller asking the same query.
+
+    The run's events (LLM tokens, then "completed" or "failed") are published under
+    stream_id, so callers streaming the query can all follow the one run.
+    """
+
+    def __init__(self, task: asyncio.Task, deadline: Deadline, stream_id: str):
+        self.task = task
+        self.deadline = deadline
+        self.stream_id = stream_id
+        self.waiters = 0
+
+class ResearchCache:
+    """LRU of research envelopes keyed on normalized query, optionally persisted to a JSON file"""
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 900, path: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._stats = {"hits": 0, "coalesced": 0, "misses": 0, "evictions": 0}
+        if path:
+            self._load()
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Get a fresh cached envelope for the query"""
+        key = normalize_transcript(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry["cached_at"] > self.ttl_seconds:
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry["result"])
+
+    def put(self, query: str, result: Dict[str, Any]):
+        """Cache a research envelope and persist the cache when a path is configured"""
+        key = normalize_transcript(query)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = {"result": dict(result), "cached_at": time.time()}
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        if self.path:
+            self._schedule_save()
+
+    async def get_or_run(
+        self,
+        query: str,
+        run: Callable[[], Awaitable[Dict[str, Any]]],
+        refresh: bool = False
+    ) -> Tuple[Dict[str, Any], str]:
+        """Return a fresh envelope for the query, sharing one run among concurrent identical queries.
+
+        The second value says how the result was obtained: "hit", "coalesced" or "miss".
+        """
+        if not refresh:
+            cached = self.get(query)
+            if cached is not None:
+                self._stats["hits"] += 1
+                return cached, "hit"
+
+        flight, outcome = self.join(query, run)
+        return await self.wait(flight), outcome
+
+    def join(self, query: str, run: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[_Flight, str]:
+        """Get the in-flight run for the query, starting one with run if there is none.
+
+        The second value is "coalesced" or "miss". Callers must then await wait(flight).
+        """
+        key = normalize_transcript(query)
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self._stats["coalesced"] += 1
+            return flight, "coalesced"
+        self._stats["misses"] += 1
+        flight = self._inflight[key] = self._start(key, query, run)
+        return flight, "miss"
+
+    async def wait(self, flight: _Flight) -> Dict[str, Any]:
+        """Wait for a flight's envelope; the run is cancelled once no caller is waiting for it"""
+        flight.waiters += 1
+        try:
+            # Shielded so one caller timing out or disconnecting does not fail the others
+            return dict(await asyncio.shield(flight.task))
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is left to read the report: stop the crew
+                flight.deadline.cancel("cancelled: no clients waiting")
+                flight.task.cancel()
+
+    def _start(self, key: str, query: str, run: Callable[[], Awaitable[Dict[str, Any]]]) -> _Flight:
+        # The shared run gets its own deadline so it is not bound to whichever caller started it
+        deadline = Deadline(llm_config.agent_timeout)
+        stream_id = f"research-{uuid.uuid4()}"
+
+        async def fill() -> Dict[str, Any]:
+            current_deadline.set(deadline)
+            # Tokens from the crew are routed to the flight's stream
+            current_task_id.set(stream_id)
+            result = await run()
+            self.put(query, result)
+            return result
+
+        task = asyncio.ensure_future(fill())
+        task.add_done_callback(lambda t: self._finish(key, stream_id, t))
+        return _Flight(task, deadline, stream_id)
+
+    def _finish(self, key: str, stream_id: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if task.cancelled():
+            task_events.publish(stream_id, "failed", {"error": "Research cancelled"})
+        elif task.exception() is not None:
+            # Also marks the failure as seen; each waiter gets it re-raised through the shield
+            task_events.publish(stream_id, "failed", {"error": str(task.exception())})
+        else:
+            task_events.publish(stream_id, "completed", dict(task.result()))
+        # Subscribers already have the events; nobody can join a finished flight
+        task_events.discard(stream_id)
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            self._schedule_save()
+
+    def _schedule_save(self):
+        try:
+            asyncio.get_running_loop().run_in_executor(None, self.save)
+        except RuntimeError:
+            self.save()
+
+    def save(self):
+        """Write the cache to disk atomically"""
+        with self._lock:
+            snapshot = dict(self._entries)
+        with self._save_lock:
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.error(f"Failed to persist research cache to {self.path}: {e}")
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable research cache {self.path}: {e}")
+            return
+        now = time.time()
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]["cached_at"]):
+            if now - entry["cached_at"] <= self.ttl_seconds:
+                self._entries[key] = entry
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        logger.info(f"Loaded {len(self._entries)} research results from {self.path}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counts, in-flight runs and size"""
+        with self._lock:
+            size = len(self._entries)
+        return {
+            **self._stats,
+            "in_flight": len(self._inflight),
+            "size": size,
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": bool(self.path)
+        }
+
+# Global research cache instance
+research_cache = ResearchCache(
+    max_size=llm_config.research_cache_size,
+    ttl_seconds=llm_config.research_cache_ttl,
+    path=llm_config.research_cache_path or None
+)
@@ -0,0 +1,79 @@
+"""In-process background scheduler for long-running agent tasks"""
+import asyncio
+import itertools
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config.llm_config import llm_config
+
+logger = logging.getLogger(__name__)
+
+class TaskScheduler:
+    """Priority queue of agent jobs drained by a fixed pool of asyncio workers"""
+
+    def __init__(self, workers: int, max_queue_size: int = 0):
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._counter = itertools.count()
+        self._running: Dict[str, asyncio.Task] = {}
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._worker_tasks)
+
+    def start(self):
+        """Start the worker coroutines on the running event loop"""
+        if self.is_running:
+            return
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i), name=f"task-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Task scheduler started with {self.workers} workers")
+
+    async def stop(self):
+        """Cancel all workers and drop queued jobs"""
+        for worker in self._worker_tasks:
+            worker.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+        logger.info("Task scheduler stopped")
+
+    def submit(self, task_id: str, job: Callable[[], Awaitable[Any]], priority: int = 0):
+        """Queue a job; higher priority runs first. Raises asyncio.QueueFull when saturated."""
+        if not self.is_running:
+            self.start()
+        # PriorityQueue pops the smallest item, so negate priority and keep FIFO order within a level
+        self._queue.put_nowait((-priority, next(self._counter), task_id, job))
+
+    async def _worker(self, index: int):
+        while True:
+            _, _, task_id, job = await self._queue.get()
+            try:
+                self._running[task_id] = asyncio.current_task()
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Task worker {index} failed on {task_id}: {e}")
+            finally:
+                self._running.pop(task_id, None)
+                self._queue.task_done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and worker usage"""
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": len(self._running)
+        }
+
+# Global scheduler instance
+task_scheduler = TaskScheduler(
+    workers=llm_config.task_workers,
+    max_queue_size=llm_config.task_queue_limit
+)
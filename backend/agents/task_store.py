@@ -0,0 +1,482 @@
+"""Pluggable storage for task records"""
+import base64
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.llm_config import llm_config
+from models.schemas import TaskStatus
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = {TaskStatus.COMPLETED.value, TaskStatus.FAILED.value}
+# Statuses of tasks a worker holds a lease on, queued or running
+ACTIVE_STATUSES = (TaskStatus.PENDING.value, TaskStatus.PROCESSING.value)
+
+# Status and ownership fields, written straight through so workers never overwrite each other's changes
+DURABLE_FIELDS = frozenset({"status", "worker_id", "lease_expires"})
+
+# Large fields left out of listings unless explicitly requested
+HEAVY_FIELDS = ("plan", "steps")
+
+TaskPage = Tuple[List[Dict[str, Any]], Optional[str]]
+
+class TaskStore(ABC):
+    """Interface for task record storage shared by the orchestrator and routes"""
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of a task record, or None if unknown or expired"""
+
+    @abstractmethod
+    def put(self, task_id: str, record: Dict[str, Any]):
+        """Insert or replace a task record"""
+
+    @abstractmethod
+    def update(self, task_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Merge fields into an existing record and return the new record"""
+
+    @abstractmethod
+    def claim(self, task_id: str, stale_worker: Optional[str], worker_id: str, lease_expires: float,
+              **fields) -> Optional[Dict[str, Any]]:
+        """Take over a queued or running task from stale_worker once its lease has lapsed.
+
+        The ownership change and fields are applied in one conditional write, so only one
+        worker can win; returns the new record, or None if the task was not claimed.
+        """
+
+    @abstractmethod
+    def renew_leases(self, worker_id: str, lease_expires: float) -> int:
+        """Extend the lease on every queued or running task owned by worker_id; returns the count"""
+
+    @abstractmethod
+    def delete(self, task_id: str):
+        """Remove a task record"""
+
+    @abstractmethod
+    def list(
+        self,
+        status: Optional[str] = None,
+        lane: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> TaskPage:
+        """List records newest first, filtered by status, lane and created_at range.
+
+        Returns the page and a cursor for the next page (None on the last page).
+        Heavy fields such as the plan are only included when named in ``fields``.
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """Get the number of stored records"""
+
+    @abstractmethod
+    def count_by_status(self) -> Dict[str, int]:
+        """Get record counts per status without scanning the records"""
+
+    def flush(self):
+        """Write out any buffered changes"""
+
+    def close(self):
+        """Flush and release resources"""
+        self.flush()
+
+def encode_cursor(record: Dict[str, Any]) -> str:
+    """Encode the sort key of the last record on a page"""
+    key = json.dumps([record.get("created_at") or "", record["task_id"]])
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor into (created_at, task_id); raises ValueError if malformed"""
+    try:
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return created_at, task_id
+
+def project(record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the requested fields (task_id is always kept)"""
+    if fields:
+        return {k: record[k] for k in ["task_id", *fields] if k in record}
+    return {k: v for k, v in record.items() if k not in HEAVY_FIELDS}
+
+def _matches(record: Dict[str, Any], status, lane, since, until, after) -> bool:
+    if status and record.get("status") != status:
+        return False
+    if lane and record.get("lane") != lane:
+        return False
+    created_at = record.get("created_at") or ""
+    if since and created_at < since:
+        return False
+    if until and created_at >= until:
+        return False
+    if after and (created_at, record["task_id"]) >= after:
+        return False
+    return True
+
+class InMemoryTaskStore(TaskStore):
+    """Bounded in-process store; finished tasks are evicted by LRU order and TTL"""
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 86400):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._touched: Dict[str, float] = {}
+        self._status_counts: Counter = Counter()
+        self._lock = threading.RLock()
+
+    def _expired(self, task_id: str, now: float) -> bool:
+        record = self._records[task_id]
+        return (
+            record.get("status") in FINISHED_STATUSES
+            and now - self._touched[task_id] > self.ttl_seconds
+        )
+
+    def _evict(self):
+        now = time.monotonic()
+        for task_id in [t for t in self._records if self._expired(t, now)]:
+            self._remove(task_id)
+        # Only finished tasks are evicted for size so running work never loses its record
+        if len(self._records) > self.max_size:
+            for task_id in [t for t, r in self._records.items() if r.get("status") in FINISHED_STATUSES]:
+                self._remove(task_id)
+                if len(self._records) <= self.max_size:
+                    break
+
+    def _remove(self, task_id: str):
+        record = self._records.pop(task_id, None)
+        self._touched.pop(task_id, None)
+        if record is not None:
+            self._status_counts[record.get("status")] -= 1
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if task_id not in self._records:
+                return None
+            if self._expired(task_id, time.monotonic()):
+                self._remove(task_id)
+                return None
+            self._records.move_to_end(task_id)
+            return dict(self._records[task_id])
+
+    def put(self, task_id: str, record: Dict[str, Any]):
+        with self._lock:
+            self._remove(task_id)
+            self._records[task_id] = dict(record, task_id=task_id)
+            self._status_counts[record.get("status")] += 1
+            self._touched[task_id] = time.monotonic()
+            self._evict()
+
+    def update(self, task_id: str, **fields) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get(task_id)
+            if record is None:
+                return None
+            if "status" in fields:
+                self._status_counts[record.get("status")] -= 1
+                self._status_counts[fields["status"]] += 1
+            record.update(fields)
+            self._records.move_to_end(task_id)
+            self._touched[task_id] = time.monotonic()
+            return dict(record)
+
+    def claim(self, task_id: str, stale_worker: Optional[str], worker_id: str, lease_expires: float,
+              **fields) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get(task_id)
+            if (
+                record is None
+                or record.get("status") not in ACTIVE_STATUSES
+                or record.get("worker_id") != stale_worker
+                or (record.get("lease_expires") or 0) >= time.time()
+            ):
+                return None
+            return self.update(task_id, worker_id=worker_id, lease_expires=lease_expires, **fields)
+
+    def renew_leases(self, worker_id: str, lease_expires: float) -> int:
+        with self._lock:
+            owned = [
+                r for r in self._records.values()
+                if r.get("worker_id") == worker_id and r.get("status") in ACTIVE_STATUSES
+            ]
+            for record in owned:
+                record["lease_expires"] = lease_expires
+            return len(owned)
+
+    def delete(self, task_id: str):
+        with self._lock:
+            self._remove(task_id)
+
+    def list(self, status=None, lane=None, since=None, until=None, limit=None,
+             cursor=None, fields=None) -> TaskPage:
+        after = decode_cursor(cursor) if cursor else None
+        with self._lock:
+            self._evict()
+            records = [r for r in self._records.values() if _matches(r, status, lane, since, until, after)]
+            records.sort(key=lambda r: (r.get("created_at") or "", r["task_id"]), reverse=True)
+            page = records[:limit] if limit else records
+            next_cursor = encode_cursor(page[-1]) if limit and len(records) > limit else None
+            return [project(r, fields) for r in page], next_cursor
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            return {status: n for status, n in self._status_counts.items() if n > 0}
+
+class SQLiteTaskStore(TaskStore):
+    """SQLite store in WAL mode, shareable between uvicorn workers.
+
+    Status and ownership changes are written straight through as conditional updates; other
+    fields (plan, step progress) are buffered per task and merged into the stored JSON in batches.
+    """
+
+    # Fields mirrored in columns for filtering and conditional writes
+    COLUMNS = ("status", "lane", "created_at", "worker_id", "lease_expires")
+
+    def __init__(self, path: str, flush_interval: float = 0.05, batch_size: int = 100):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        # Buffered field changes per task, not yet written
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._stop = threading.Event()
+        self._init_schema()
+        self._flusher = threading.Thread(target=self._flush_loop, name="task-store-flush", daemon=True)
+        self._flusher.start()
+
+    def _init_schema(self):
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    status TEXT,
+                    lane TEXT,
+                    created_at TEXT,
+                    worker_id TEXT,
+                    lease_expires REAL,
+                    data TEXT NOT NULL,
+                    heavy TEXT
+                )"""
+            )
+            # Databases created before task leases lack the ownership columns
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+            for column, column_type in (("worker_id", "TEXT"), ("lease_expires", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {column_type}")
+            # Per-status counters kept current by triggers so status endpoints never scan the table
+            self._conn.execute("CREATE TABLE IF NOT EXISTS task_counts (status TEXT PRIMARY KEY, n INTEGER NOT NULL)")
+            self._conn.executescript(
+                """
+                CREATE TRIGGER IF NOT EXISTS tasks_count_insert AFTER INSERT ON tasks BEGIN
+                    INSERT INTO task_counts (status, n) VALUES (NEW.status, 1)
+                        ON CONFLICT(status) DO UPDATE SET n = n + 1;
+                END;
+                CREATE TRIGGER IF NOT EXISTS tasks_count_delete AFTER DELETE ON tasks BEGIN
+                    UPDATE task_counts SET n = n - 1 WHERE status = OLD.status;
+                END;
+                CREATE TRIGGER IF NOT EXISTS tasks_count_update AFTER UPDATE OF status ON tasks
+                WHEN OLD.status IS NOT NEW.status BEGIN
+                    UPDATE task_counts SET n = n - 1 WHERE status = OLD.status;
+                    INSERT INTO task_counts (status, n) VALUES (NEW.status, 1)
+                        ON CONFLICT(status) DO UPDATE SET n = n + 1;
+                END;
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_lane ON tasks (lane, created_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at, task_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_worker ON tasks (worker_id)")
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Task store flush failed: {e}")
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            self._conn.execute("BEGIN")
+            try:
+                for task_id, fields in pending.items():
+                    self._write(task_id, fields)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _write(self, task_id: str, fields: Dict[str, Any], condition: str = "", params: tuple = ()) -> bool:
+        """Merge fields into the stored record in one UPDATE; returns whether a row matched"""
+        sets, values = [], []
+        for column in self.COLUMNS:
+            if column in fields:
+                sets.append(f"{column} = ?")
+                values.append(fields[column])
+        # json_set only touches the named keys, so concurrent writers of other fields are kept
+        for column, keys in (("data", [k for k in fields if k not in HEAVY_FIELDS]),
+                             ("heavy", [k for k in fields if k in HEAVY_FIELDS])):
+            if keys:
+                sets.append(f"{column} = json_set(COALESCE({column}, '{{}}'), {', '.join(['?, json(?)'] * len(keys))})")
+                for key in keys:
+                    values.extend([f'$."{key}"', json.dumps(fields[key], default=str)])
+        cursor = self._conn.execute(
+            f"UPDATE tasks SET {', '.join(sets)} WHERE task_id = ?{condition}", (*values, task_id, *params)
+        )
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def _serialize(record: Dict[str, Any]) -> Tuple[str, str]:
+        light = {k: v for k, v in record.items() if k not in HEAVY_FIELDS}
+        heavy = {k: record[k] for k in HEAVY_FIELDS if k in record}
+        return json.dumps(light, default=str), json.dumps(heavy, default=str)
+
+    @staticmethod
+    def _deserialize(data: str, heavy: Optional[str]) -> Dict[str, Any]:
+        record = json.loads(data)
+        if heavy:
+            record.update(json.loads(heavy))
+        return record
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data, heavy FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None:
+                return None
+            record = self._deserialize(*row)
+            record.update(self._pending.get(task_id, {}))
+            return record
+
+    def put(self, task_id: str, record: Dict[str, Any]):
+        record = dict(record, task_id=task_id)
+        with self._lock:
+            self._pending.pop(task_id, None)
+            self._conn.execute(
+                """INSERT INTO tasks (task_id, status, lane, created_at, worker_id, lease_expires, data, heavy)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(task_id) DO UPDATE SET
+                       status = excluded.status, lane = excluded.lane, created_at = excluded.created_at,
+                       worker_id = excluded.worker_id, lease_expires = excluded.lease_expires,
+                       data = excluded.data, heavy = excluded.heavy""",
+                (task_id, *(record.get(c) for c in self.COLUMNS), *self._serialize(record))
+            )
+
+    def update(self, task_id: str, **fields) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if DURABLE_FIELDS.isdisjoint(fields):
+                # Progress only: buffer it, a lost batch is redone when the task resumes
+                record = self.get(task_id)
+                if record is None:
+                    return None
+                self._pending.setdefault(task_id, {}).update(fields)
+                if len(self._pending) >= self.batch_size:
+                    self.flush()
+                record.update(fields)
+                return record
+            fields = {**self._pending.pop(task_id, {}), **fields}
+            if not self._write(task_id, fields):
+                return None
+            return self.get(task_id)
+
+    def claim(self, task_id: str, stale_worker: Optional[str], worker_id: str, lease_expires: float,
+              **fields) -> Optional[Dict[str, Any]]:
+        fields = dict(fields, worker_id=worker_id, lease_expires=lease_expires)
+        with self._lock:
+            claimed = self._write(
+                task_id, fields,
+                " AND status IN (?, ?) AND worker_id IS ? AND COALESCE(lease_expires, 0) < ?",
+                (*ACTIVE_STATUSES, stale_worker, time.time())
+            )
+            return self.get(task_id) if claimed else None
+
+    def renew_leases(self, worker_id: str, lease_expires: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                """UPDATE tasks SET lease_expires = ?, data = json_set(data, '$.lease_expires', ?)
+                   WHERE worker_id = ? AND status IN (?, ?)""",
+                (lease_expires, lease_expires, worker_id, *ACTIVE_STATUSES)
+            )
+            return cursor.rowcount
+
+    def delete(self, task_id: str):
+        with self._lock:
+            self._pending.pop(task_id, None)
+            self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+    def list(self, status=None, lane=None, since=None, until=None, limit=None,
+             cursor=None, fields=None) -> TaskPage:
+        clauses, params = [], []
+        for column, op, value in (("status", "=", status), ("lane", "=", lane),
+                                  ("created_at", ">=", since), ("created_at", "<", until)):
+            if value:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        if cursor:
+            clauses.append("(created_at, task_id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        want_heavy = bool(fields) and any(f in HEAVY_FIELDS for f in fields)
+        query = f"SELECT data, {'heavy' if want_heavy else 'NULL'} FROM tasks"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created_at DESC, task_id DESC"
+        if limit:
+            # Fetch one extra row to know whether another page exists
+            query += " LIMIT ?"
+            params.append(limit + 1)
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(query, params).fetchall()
+        records = [self._deserialize(*row) for row in rows]
+        next_cursor = None
+        if limit and len(records) > limit:
+            records = records[:limit]
+            next_cursor = encode_cursor(records[-1])
+        return [project(r, fields) for r in records], next_cursor
+
+    def count(self) -> int:
+        with self._lock:
+            self.flush()
+            return self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute("SELECT status, n FROM task_counts WHERE n > 0").fetchall()
+        return dict(rows)
+
+    def close(self):
+        self._stop.set()
+        self._flusher.join(timeout=1)
+        self.flush()
+        self._conn.close()
+
+def create_task_store() -> TaskStore:
+    """Build the task store selected by TASK_STORE"""
+    backend = llm_config.task_store_backend
+    if backend == "sqlite":
+        logger.info(f"Using SQLite task store at {llm_config.task_store_path}")
+        return SQLiteTaskStore(llm_config.task_store_path)
+    if backend != "memory":
+        logger.error(f"Unsupported task store: {backend}, falling back to memory")
+    return InMemoryTaskStore(
+        max_size=llm_config.task_store_max_size,
+        ttl_seconds=llm_config.task_store_ttl
+    )
@@ -0,0 +1,53 @@
+"""Per-workflow token counters, split into cached and uncached prompt tokens"""
+import logging
+import threading
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+_FIELDS = ("prompt_tokens", "cached_prompt_tokens", "completion_tokens", "successful_requests")
+
+def usage_snapshot(crew: Any) -> Dict[str, int]:
+    """Cumulative token usage of a crew's agents, or zeros if crewai does not report it"""
+    calculate = getattr(crew, "calculate_usage_metrics", None)
+    metrics = calculate() if calculate is not None else None
+    return {field: int(getattr(metrics, field, 0) or 0) for field in _FIELDS}
+
+class TokenUsageTracker:
+    """Token totals per crew pool, so prompt-cache hit rates can be watched per workflow and provider"""
+
+    def __init__(self):
+        self._totals: Dict[str, Dict[str, int]] = {}
+        self._last: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, before: Dict[str, int], after: Dict[str, int]):
+        """Add the usage of one kickoff, given the crew's cumulative usage before and after it"""
+        call = {field: max(after[field] - before[field], 0) for field in _FIELDS}
+        call["uncached_prompt_tokens"] = call["prompt_tokens"] - call["cached_prompt_tokens"]
+        logger.debug(
+            f"{name}: {call['prompt_tokens']} prompt tokens ({call['cached_prompt_tokens']} cached), "
+            f"{call['completion_tokens']} completion tokens"
+        )
+        with self._lock:
+            totals = self._totals.setdefault(name, {"calls": 0})
+            totals["calls"] += 1
+            for field, value in call.items():
+                totals[field] = totals.get(field, 0) + value
+            self._last[name] = call
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get token totals, prompt-cache hit ratio and the last call's usage per crew pool"""
+        with self._lock:
+            return {
+                name: dict(
+                    totals,
+                    cache_hit_ratio=round(totals["cached_prompt_tokens"] / totals["prompt_tokens"], 3)
+                    if totals["prompt_tokens"] else 0.0,
+                    last_call=dict(self._last[name])
+                )
+                for name, totals in self._totals.items()
+            }
+
+# Global tracker instance
+token_usage = TokenUsageTracker()
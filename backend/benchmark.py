@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the agent API
+Runs the FastAPI app in-process against a deterministic fake LLM, drives the
+classify, process and research endpoints at each concurrency level and prints
+latency percentiles, throughput and event-loop lag as JSON. No network or API
+keys needed:
+
+    python benchmark.py --concurrency 1,8,32 --requests 200 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Keep the run self-contained whatever the local .env says
+os.environ.setdefault("TASK_STORE", "memory")
+os.environ.setdefault("WARMUP_AGENTS", "false")
+os.environ.setdefault("RESEARCH_CACHE_PATH", "")
+
+import httpx
+
+SCENARIOS = ("classify", "process", "research")
+FINISHED = {"completed", "failed", "waiting_confirmation"}
+
+class FakeLLMError(RuntimeError):
+    """Injected provider failure"""
+
+class FakeLLM:
+    """Stands in for a provider: lognormal latency, fixed token rate and random failures, all seeded"""
+
+    def __init__(self, latency_ms: float = 300, jitter: float = 0.5, tokens_per_sec: float = 80,
+                 failure_rate: float = 0.0, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.tokens_per_sec = tokens_per_sec
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0}
+
+    def complete(self, text: str) -> str:
+        """Block like a provider call producing text, or raise FakeLLMError"""
+        with self._lock:
+            self.stats["calls"] += 1
+            delay = self._random.lognormvariate(math.log(self.latency_ms / 1000), self.jitter)
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.stats["failures"] += 1
+        if failed:
+            time.sleep(delay)
+            raise FakeLLMError("Injected provider failure")
+        # Time to first token, then the completion streamed at the token rate
+        time.sleep(delay + _tokens(text) / self.tokens_per_sec)
+        return text
+
+class FakeCrew:
+    """Crew with one fake LLM call per kickoff, returning well-formed output for its workflow"""
+
+    def __init__(self, workflow: str, llm: FakeLLM):
+        self.workflow = workflow
+        self.llm = llm
+        self.usage = {"prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0, "successful_requests": 0}
+
+    def kickoff(self, inputs: Dict[str, Any]) -> str:
+        prompt_tokens = _tokens(json.dumps(inputs)) + 400
+        text = self.llm.complete(_fake_output(self.workflow, inputs))
+        self.usage["prompt_tokens"] += prompt_tokens
+        # The static agent prefix is what a provider would serve from its prompt cache
+        self.usage["cached_prompt_tokens"] += 400
+        self.usage["completion_tokens"] += _tokens(text)
+        self.usage["successful_requests"] += 1
+        return text
+
+    def calculate_usage_metrics(self) -> SimpleNamespace:
+        return SimpleNamespace(**self.usage)
+
+def _tokens(text: str) -> int:
+    return max(len(text) // 4, 1)
+
+def _fake_output(workflow: str, inputs: Dict[str, Any]) -> str:
+    from config.lanes import LANE_DESCRIPTIONS
+
+    lanes = list(LANE_DESCRIPTIONS)
+    if workflow == "classify":
+        lane = lanes[sum(map(ord, inputs["transcript"])) % len(lanes)]
+        return json.dumps({"lane": lane, "confidence": 0.9, "reasoning": "Fake classification"})
+    if workflow == "classify_batch":
+        ids = [int(i) for i in re.findall(r"^\s*(\d+)\.", inputs["transcripts"], re.MULTILINE)]
+        return json.dumps([
+            {"id": i, "lane": lanes[i % len(lanes)], "confidence": 0.9, "reasoning": "Fake classification"}
+            for i in ids
+        ])
+    if workflow == "plan":
+        # Two independent steps feeding a third, so the DAG runner has something to overlap
+        return json.dumps({"summary": "Fake plan", "steps": [
+            {"step_id": "1", "description": "Research the request", "depends_on": [],
+             "agent_actions": [{"agent_type": "researcher", "action": "research", "parameters": {}}]},
+            {"step_id": "2", "description": "Check the calendar", "depends_on": [],
+             "agent_actions": [{"agent_type": "calendar_manager", "action": "check", "parameters": {}}]},
+            {"step_id": "3", "description": "Draft the result", "depends_on": ["1", "2"],
+             "agent_actions": [{"agent_type": "content_creator", "action": "draft", "parameters": {}}]}
+        ]})
+    if workflow == "research":
+        return f"Research on {inputs['query']}: " + "fact " * 150
+    if workflow == "repair_json":
+        return "{}"
+    return f"Done: {inputs.get('step', '')} " + "detail " * 40
+
+def install_fake_llm(llm: FakeLLM):
+    """Route every orchestrator workflow to fake crews instead of crewai"""
+    from agents.orchestrator import get_orchestrator
+
+    get_orchestrator().set_crew_factory(lambda workflow, provider: FakeCrew(workflow, llm))
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max/mean of samples in seconds, reported in milliseconds"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def rank(p: float) -> float:
+        return ordered[min(len(ordered) - 1, math.ceil(p * len(ordered)) - 1)]
+
+    return {
+        "p50": round(rank(0.50) * 1000, 2),
+        "p95": round(rank(0.95) * 1000, 2),
+        "p99": round(rank(0.99) * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2)
+    }
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping coroutine"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(time.perf_counter() - started - self.interval, 0.0))
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> Dict[str, float]:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return percentiles(self.samples)
+
+async def _classify(client: httpx.AsyncClient, i: int, result: Dict[str, Any]) -> httpx.Response:
+    return await client.post("/api/agents/classify", json={
+        "transcript": f"Plan the next podcast episode and research guest number {i}"
+    })
+
+async def _research(client: httpx.AsyncClient, i: int, result: Dict[str, Any]) -> httpx.Response:
+    return await client.post("/api/tasks/research", json={"query": f"Podcast monetization trends, angle {i}"})
+
+async def _process(client: httpx.AsyncClient, i: int, result: Dict[str, Any]) -> httpx.Response:
+    started = time.perf_counter()
+    response = await client.post("/api/tasks/process", json={
+        "user_input": f"Prep episode outline number {i} with show notes", "context": {"lane": "podcasting"}
+    })
+    result["enqueue"] = time.perf_counter() - started
+    if response.status_code != 200:
+        return response
+    task_id = response.json()["task_id"]
+    # Completion time covers queueing, planning and every step, polled like the frontend does
+    while True:
+        status = (await client.get(f"/api/tasks/{task_id}")).json()["status"]
+        if status in FINISHED:
+            result["completion"] = time.perf_counter() - started
+            result["task_status"] = status
+            return response
+        await asyncio.sleep(0.01)
+
+async def run_scenario(client: httpx.AsyncClient, name: str, concurrency: int, requests: int,
+                       offset: int) -> Dict[str, Any]:
+    """Send requests from concurrency workers and summarize latency, throughput and status codes"""
+    call: Callable = {"classify": _classify, "process": _process, "research": _research}[name]
+    latencies: List[float] = []
+    enqueues: List[float] = []
+    completions: List[float] = []
+    status_codes: Dict[str, int] = {}
+    task_statuses: Dict[str, int] = {}
+    next_index = iter(range(offset, offset + requests))
+
+    async def worker():
+        for i in next_index:
+            result: Dict[str, Any] = {}
+            started = time.perf_counter()
+            try:
+                response = await call(client, i, result)
+                code = str(response.status_code)
+            except Exception as e:
+                code = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            status_codes[code] = status_codes.get(code, 0) + 1
+            if "enqueue" in result:
+                enqueues.append(result["enqueue"])
+            if "completion" in result:
+                completions.append(result["completion"])
+                task_statuses[result["task_status"]] = task_statuses.get(result["task_status"], 0) + 1
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    lag = await monitor.stop()
+
+    report = {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(n for code, n in status_codes.items() if not code.startswith("2")),
+        "status_codes": status_codes,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": percentiles(latencies),
+        "event_loop_lag_ms": lag
+    }
+    if name == "process":
+        # latency_ms covers the whole task; enqueue_ms is the POST alone
+        report["enqueue_ms"] = percentiles(enqueues)
+        report["completion_ms"] = percentiles(completions)
+        report["task_statuses"] = task_statuses
+    return report
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    # Imported here so the environment set from the arguments is what the app's config reads
+    from main import app
+
+    llm = FakeLLM(args.latency_ms, args.jitter, args.tokens_per_sec, args.failure_rate, args.seed)
+    install_fake_llm(llm)
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            results: Dict[str, List[Dict[str, Any]]] = {}
+            offset = 0
+            for name in args.scenarios:
+                results[name] = []
+                for concurrency in args.concurrency:
+                    results[name].append(await run_scenario(client, name, concurrency, args.requests, offset))
+                    # Fresh inputs per run so result caches don't answer a later run
+                    offset += args.requests
+            status = (await client.get("/api/agents/status")).json()
+    finally:
+        await app.router.shutdown()
+
+    return {
+        "config": {
+            "latency_ms": args.latency_ms,
+            "jitter": args.jitter,
+            "tokens_per_sec": args.tokens_per_sec,
+            "failure_rate": args.failure_rate,
+            "seed": args.seed,
+            "fast_path": args.fast_path
+        },
+        "scenarios": results,
+        "fake_llm": llm.stats,
+        "executor": status.get("executor"),
+        "token_usage": status.get("token_usage")
+    }
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline load test for the agent API with a fake LLM")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="Comma-separated endpoints to drive: classify, process, research")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per scenario and concurrency level")
+    parser.add_argument("--latency-ms", type=float, default=300, help="Median fake LLM time to first token")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Lognormal sigma of the fake LLM latency")
+    parser.add_argument("--tokens-per-sec", type=float, default=80, help="Fake LLM output token rate")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of fake LLM calls that fail")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for latencies and failures")
+    parser.add_argument("--fast-path", action="store_true",
+                        help="Let the local classifier answer confident inputs instead of sending all to the LLM")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+    return args
+
+def main():
+    args = parse_args()
+    if not args.fast_path:
+        os.environ["FAST_CLASSIFIER_THRESHOLD"] = "1.1"
+    report = asyncio.run(run_benchmark(args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 """Configuration module"""
 from .llm_config import llm_config, LLMConfig
+from .llm_router import llm_router, LLMRouter
 
-__all__ = ["llm_config", "LLMConfig"]
+__all__ = ["llm_config", "LLMConfig", "llm_router", "LLMRouter"]
@@ -0,0 +1,61 @@
+"""Project lane definitions shared by the classifier, agents and lane routes"""
+
+# Lane configurations
+LANE_CONFIGS = {
+    "podcasting": {
+        "name": "Podcasting",
+        "description": "Podcast content, interviews, episode planning",
+        "tools": ["calendar", "research", "content_creation"],
+        "keywords": ["podcast", "episode", "interview", "guest", "host", "recording", "listeners", "show notes", "audio"],
+        "default_actions": [
+            "Research guest background",
+            "Schedule interview",
+            "Prepare questions",
+            "Create episode outline"
+        ]
+    },
+    "podcast-bots-ai": {
+        "name": "Podcast Bots AI",
+        "description": "AI startup development and product work",
+        "tools": ["research", "content_creation", "task_management"],
+        "keywords": ["ai", "startup", "product", "model", "bot", "llm", "api", "feature", "launch", "code"],
+        "default_actions": [
+            "Research market trends",
+            "Create product documentation",
+            "Plan development tasks",
+            "Generate marketing content"
+        ]
+    },
+    "accelerator-work": {
+        "name": "Accelerator Work", 
+        "description": "Business development and accelerator activities",
+        "tools": ["calendar", "research", "networking"],
+        "keywords": ["accelerator", "investor", "pitch", "founder", "mentor", "cohort", "networking", "partner", "demo day", "fundraising"],
+        "default_actions": [
+            "Research potential partners",
+            "Schedule meetings",
+            "Prepare pitch materials",
+            "Track progress metrics"
+        ]
+    },
+    "miscellaneous": {
+        "name": "Miscellaneous",
+        "description": "General tasks and personal activities",
+        "tools": ["calendar", "research", "content_creation"],
+        "keywords": ["personal", "errand", "groceries", "reminder", "appointment", "family", "home"],
+        "default_actions": [
+            "Research topic",
+            "Schedule task",
+            "Create reminder",
+            "Generate summary"
+        ]
+    }
+}
+
+# One-line lane descriptions used in classification prompts
+LANE_DESCRIPTIONS = {
+    "podcasting": "Podcast content, interviews, episode ideas, guest research",
+    "podcast-bots-ai": "AI startup work, product development, technical discussions",
+    "accelerator-work": "Business activities, networking, accelerator program tasks",
+    "miscellaneous": "General tasks, personal items, other activities"
+}
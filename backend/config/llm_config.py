@@ -1,7 +1,6 @@
 """LLM Configuration for CrewAI Agents"""
 import os
 from typing import Optional
-from crewai_tools.tools.base_tool import BaseTool
 from dotenv import load_dotenv
 import logging
 
@@ -10,6 +9,24 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Models per provider for each tier
+PROVIDER_MODELS = {
+    "openai": {"large": "gpt-4o", "small": "gpt-4o-mini"},
+    "anthropic": {"large": "claude-3-5-sonnet-20241022", "small": "claude-3-5-haiku-20241022"}
+}
+
+# Per-agent LLM profiles keyed by AgentType value; timeouts are per LLM call in seconds
+AGENT_PROFILES = {
+    "default": {"tier": "large", "max_tokens": 2000, "temperature": 0.7, "timeout": 120},
+    "classifier": {"tier": "small", "max_tokens": 300, "temperature": 0.0, "timeout": 30},
+    # Batch classification shares the classifier model but returns one object per input
+    "classifier_batch": {"tier": "small", "max_tokens": 2000, "temperature": 0.0, "timeout": 60},
+    "researcher": {"tier": "large", "max_tokens": 2000, "temperature": 0.7, "timeout": 120},
+    "calendar_manager": {"tier": "small", "max_tokens": 800, "temperature": 0.2, "timeout": 60},
+    "content_creator": {"tier": "large", "max_tokens": 2000, "temperature": 0.7, "timeout": 120},
+    "task_coordinator": {"tier": "large", "max_tokens": 2000, "temperature": 0.7, "timeout": 120}
+}
+
 class LLMConfig:
     """Centralized LLM configuration for all agents"""
     
@@ -19,47 +36,116 @@ class LLMConfig:
         self.default_provider = os.getenv("DEFAULT_LLM_PROVIDER", "openai")
         self.agent_timeout = int(os.getenv("AGENT_TIMEOUT", "300"))
         self.max_iterations = int(os.getenv("MAX_ITERATIONS", "5"))
+        self.stream_tokens = os.getenv("LLM_STREAMING", "true").lower() == "true"
+        self.agent_verbose = os.getenv("AGENT_VERBOSE", "false").lower() == "true"
+        self.warmup_agents = os.getenv("WARMUP_AGENTS", "false").lower() == "true"
+        self.crew_workers = int(os.getenv("CREW_WORKERS", "8"))
+        self.crew_queue_limit = int(os.getenv("CREW_QUEUE_LIMIT", "32"))
+        self.provider_concurrency = int(os.getenv("PROVIDER_CONCURRENCY", "4"))
+        self.circuit_failure_threshold = int(os.getenv("LLM_CIRCUIT_FAILURES", "3"))
+        self.circuit_cooldown = int(os.getenv("LLM_CIRCUIT_COOLDOWN", "30"))
+        self.hedge_requests = os.getenv("LLM_HEDGING", "false").lower() == "true"
+        self.hedge_min_samples = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        self.task_workers = int(os.getenv("TASK_WORKERS", "4"))
+        self.task_queue_limit = int(os.getenv("TASK_QUEUE_LIMIT", "100"))
+        self.step_concurrency = int(os.getenv("STEP_CONCURRENCY", "4"))
+        self.task_store_backend = os.getenv("TASK_STORE", "memory")
+        self.task_store_path = os.getenv("TASK_STORE_PATH", "tasks.db")
+        self.task_store_max_size = int(os.getenv("TASK_STORE_MAX_SIZE", "1000"))
+        self.task_store_ttl = int(os.getenv("TASK_STORE_TTL", "86400"))
+        self.task_lease = float(os.getenv("TASK_LEASE_SECONDS", "30"))
+        self.task_stream_poll_interval = float(os.getenv("TASK_STREAM_POLL_INTERVAL", "2"))
+        self.task_event_queue_size = int(os.getenv("TASK_EVENT_QUEUE_SIZE", "1000"))
+        self.classify_cache_size = int(os.getenv("CLASSIFY_CACHE_SIZE", "1000"))
+        self.classify_cache_ttl = int(os.getenv("CLASSIFY_CACHE_TTL", "3600"))
+        self.classify_cache_similarity = float(os.getenv("CLASSIFY_CACHE_SIMILARITY", "0.9"))
+        self.fast_classifier_threshold = float(os.getenv("FAST_CLASSIFIER_THRESHOLD", "0.85"))
+        self.classify_batch_token_budget = int(os.getenv("CLASSIFY_BATCH_TOKEN_BUDGET", "3000"))
+        self.classify_batch_max_items = int(os.getenv("CLASSIFY_BATCH_MAX_ITEMS", "25"))
+        self.prompt_cache = os.getenv("PROMPT_CACHE", "true").lower() == "true"
+        self.plan_cache_size = int(os.getenv("PLAN_CACHE_SIZE", "500"))
+        self.plan_cache_ttl = int(os.getenv("PLAN_CACHE_TTL", "604800"))
+        self.research_cache_size = int(os.getenv("RESEARCH_CACHE_SIZE", "256"))
+        self.research_cache_ttl = int(os.getenv("RESEARCH_CACHE_TTL", "900"))
+        self.research_cache_path = os.getenv("RESEARCH_CACHE_PATH", "")
+        self.http_max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+        self.http_max_keepalive = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+        self.http_max_per_host = int(os.getenv("HTTP_MAX_PER_HOST", "10"))
+        self.http_timeout = float(os.getenv("HTTP_TIMEOUT", "10"))
+        self.http_connect_timeout = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+        self.http_retries = int(os.getenv("HTTP_RETRIES", "2"))
+        self.http2 = os.getenv("HTTP2", "true").lower() == "true"
+        self.tool_workers = int(os.getenv("TOOL_WORKERS", "16"))
+        self.tool_concurrency = int(os.getenv("TOOL_CONCURRENCY", "4"))
+        self.tool_cache_size = int(os.getenv("TOOL_CACHE_SIZE", "2000"))
+        self.side_effect_dedup_ttl = int(os.getenv("SIDE_EFFECT_DEDUP_TTL", "3600"))
+        self.idempotency_ttl = int(os.getenv("IDEMPOTENCY_TTL", "86400"))
         
-    def get_llm_config(self, provider: Optional[str] = None) -> dict:
-        """Get LLM configuration for CrewAI agents"""
+    def get_llm_config(self, provider: Optional[str] = None, agent_type: Optional[str] = None) -> dict:
+        """Get LLM configuration for CrewAI agents, tuned to the agent's profile when given"""
         provider = provider or self.default_provider
         
-        if provider == "openai":
-            if not self.openai_api_key:
-                logger.warning("OpenAI API key not found, agents may not work properly")
-                return {}
-            
-            return {
-                "llm": {
-                    "model": "gpt-4o",
-                    "api_key": self.openai_api_key,
-                    "temperature": 0.7,
-                    "max_tokens": 2000
-                }
-            }
-            
-        elif provider == "anthropic":
-            if not self.anthropic_api_key:
-                logger.warning("Anthropic API key not found, agents may not work properly")
-                return {}
-                
-            return {
-                "llm": {
-                    "model": "claude-3-5-sonnet-20241022",
-                    "api_key": self.anthropic_api_key,
-                    "temperature": 0.7,
-                    "max_tokens": 2000
-                }
-            }
-        
-        else:
+        if provider not in PROVIDER_MODELS:
             logger.error(f"Unsupported LLM provider: {provider}")
             return {}
+        
+        api_key = self.get_api_key(provider)
+        if not api_key:
+            logger.warning(f"{provider.capitalize()} API key not found, agents may not work properly")
+            return {}
+        
+        profile = self.get_agent_profile(agent_type)
+        llm = {
+            "model": self.get_model(provider, profile["tier"]),
+            "api_key": api_key,
+            "temperature": profile["temperature"],
+            "max_tokens": profile["max_tokens"],
+            "timeout": profile["timeout"],
+            "stream": self.stream_tokens
+        }
+        if self.prompt_cache and provider == "anthropic":
+            # Anthropic only caches what is marked; OpenAI caches long repeated prefixes on its own
+            llm["cache_control_injection_points"] = [{"location": "message", "role": "system"}]
+        return {"llm": llm}
+    
+    def get_api_key(self, provider: str) -> Optional[str]:
+        """Get the API key for a provider"""
+        return {"openai": self.openai_api_key, "anthropic": self.anthropic_api_key}.get(provider)
+    
+    def get_agent_profile(self, agent_type: Optional[str] = None) -> dict:
+        """Get the model tier and limits for an agent type, with env overrides such as CLASSIFIER_TIER"""
+        profile = dict(AGENT_PROFILES.get(agent_type or "default", AGENT_PROFILES["default"]))
+        if agent_type:
+            prefix = agent_type.upper()
+            profile["tier"] = os.getenv(f"{prefix}_TIER", profile["tier"])
+            profile["max_tokens"] = int(os.getenv(f"{prefix}_MAX_TOKENS", profile["max_tokens"]))
+            profile["temperature"] = float(os.getenv(f"{prefix}_TEMPERATURE", profile["temperature"]))
+            profile["timeout"] = int(os.getenv(f"{prefix}_TIMEOUT", profile["timeout"]))
+        return profile
+    
+    def get_model(self, provider: str, tier: str) -> str:
+        """Get the model for a provider and tier, with env overrides such as OPENAI_SMALL_MODEL"""
+        return os.getenv(f"{provider.upper()}_{tier.upper()}_MODEL", PROVIDER_MODELS[provider][tier])
     
     def has_valid_api_keys(self) -> bool:
         """Check if we have at least one valid API key"""
         return bool(self.openai_api_key or self.anthropic_api_key)
     
+    def get_provider_concurrency(self, provider: Optional[str] = None) -> int:
+        """Get the max number of concurrent crew runs for a provider"""
+        provider = provider or self.default_provider
+        value = os.getenv(f"{provider.upper()}_CONCURRENCY")
+        return int(value) if value else self.provider_concurrency
+    
+    def get_tool_settings(self, variable: str) -> dict:
+        """Per-tool integer settings from a variable such as TOOL_LIMITS=research_person=2,search_web=6"""
+        settings = {}
+        for item in os.getenv(variable, "").split(","):
+            name, _, value = item.partition("=")
+            if name.strip() and value.strip().isdigit():
+                settings[name.strip()] = int(value)
+        return settings
+    
     def get_available_providers(self) -> list:
         """Get list of available LLM providers based on API keys"""
         providers = []
@@ -0,0 +1,258 @@
+"""Latency-aware routing of LLM work across providers with failover and hedging"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Type
+
+from .llm_config import llm_config
+
+def provider_errors() -> Tuple[Type[BaseException], ...]:
+    """Exceptions that mean the provider failed, as opposed to the work being run on it.
+
+    litellm's errors subclass openai's, so openai.APIError covers rate limits, timeouts,
+    connection and 5xx errors from every provider.
+    """
+    try:
+        import openai
+    except ImportError:
+        return (ConnectionError, TimeoutError)
+    return (openai.APIError, ConnectionError, TimeoutError)
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(ConnectionError):
+    """Raised without making a call when every provider's circuit is open"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"All LLM providers are unavailable, retry in {retry_after:.0f}s")
+
+class ProviderHealth:
+    """Circuit breaker state for one provider"""
+
+    def __init__(self):
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        # Set while the single trial call allowed after the cooldown is running
+        self.half_open_in_flight = False
+        self.successes = 0
+        self.failures = 0
+
+class LLMRouter:
+    """Picks the fastest healthy provider per workload and fails over when one is slow or down"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30,
+        hedging: bool = False,
+        hedge_min_samples: int = 20,
+        window: int = 100
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.hedging = hedging
+        self.hedge_min_samples = hedge_min_samples
+        self.window = window
+        self._health: Dict[str, ProviderHealth] = {}
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self._ewma: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self.hedges_started = 0
+        self.hedges_won = 0
+
+    def providers(self) -> List[str]:
+        """Providers with API keys, default provider first"""
+        available = llm_config.get_available_providers() or [llm_config.default_provider]
+        return sorted(available, key=lambda p: p != llm_config.default_provider)
+
+    def _get_health(self, provider: str) -> ProviderHealth:
+        return self._health.setdefault(provider, ProviderHealth())
+
+    def is_available(self, provider: str) -> bool:
+        """Closed circuit, or open past its cooldown with no trial call running yet"""
+        health = self._get_health(provider)
+        if health.opened_at is None:
+            return True
+        return not health.half_open_in_flight and time.monotonic() - health.opened_at >= self.cooldown_seconds
+
+    def _acquire(self, provider: str) -> Optional[bool]:
+        """Claim a call on a provider: None if its circuit is closed, True if the call is the
+        half-open trial, False if the circuit is open or another caller holds the trial"""
+        with self._lock:
+            health = self._get_health(provider)
+            if health.opened_at is None:
+                return None
+            if not self.is_available(provider):
+                return False
+            health.half_open_in_flight = True
+            return True
+
+    def _release_trial(self, provider: str):
+        """End a trial call that neither succeeded nor failed on the provider, leaving the circuit open"""
+        with self._lock:
+            self._get_health(provider).half_open_in_flight = False
+
+    def rank(self, workload: str) -> List[str]:
+        """Available providers ordered by observed latency for this workload"""
+        candidates = [p for p in self.providers() if self.is_available(p)]
+        order = {p: i for i, p in enumerate(self.providers())}
+        # Providers without samples keep their configured order ahead of measured ones so they get explored
+        return sorted(candidates, key=lambda p: (self._ewma.get((p, workload), 0.0), order[p]))
+
+    def retry_after(self) -> float:
+        """Seconds until the first open circuit allows a trial call"""
+        now = time.monotonic()
+        remaining = [
+            self.cooldown_seconds - (now - h.opened_at)
+            for h in (self._get_health(p) for p in self.providers()) if h.opened_at is not None
+        ]
+        return max(1.0, min(remaining, default=0.0))
+
+    def p95(self, provider: str, workload: str) -> Optional[float]:
+        """95th percentile latency, or None until enough samples exist"""
+        samples = self._latencies.get((provider, workload))
+        if not samples or len(samples) < self.hedge_min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def record_success(self, provider: str, workload: str, latency: float):
+        key = (provider, workload)
+        self._latencies.setdefault(key, deque(maxlen=self.window)).append(latency)
+        previous = self._ewma.get(key)
+        self._ewma[key] = latency if previous is None else 0.8 * previous + 0.2 * latency
+        with self._lock:
+            health = self._get_health(provider)
+            if health.opened_at is not None:
+                logger.info(f"Closing circuit for LLM provider '{provider}'")
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.opened_at = None
+            health.half_open_in_flight = False
+
+    def record_failure(self, provider: str):
+        with self._lock:
+            health = self._get_health(provider)
+            health.failures += 1
+            health.consecutive_failures += 1
+            # A failed trial re-opens the circuit for another cooldown
+            if health.consecutive_failures >= self.failure_threshold or health.half_open_in_flight:
+                if health.opened_at is None:
+                    logger.warning(f"Opening circuit for LLM provider '{provider}'")
+                health.opened_at = time.monotonic()
+                health.half_open_in_flight = False
+
+    async def run(
+        self,
+        workload: str,
+        call: Callable[[str], Awaitable[Any]],
+        neutral_exceptions: Tuple[Type[BaseException], ...] = (),
+        abort_exceptions: Tuple[Type[BaseException], ...] = (),
+        hedge: bool = True,
+        failover_exceptions: Optional[Tuple[Type[BaseException], ...]] = None
+    ) -> Any:
+        """Run call(provider) on the best provider, hedging and failing over to the others.
+
+        Exceptions listed in neutral_exceptions (such as local backpressure) move on to
+        the next provider without counting against the provider's health. Exceptions in
+        abort_exceptions (such as an expired deadline) are raised straight to the caller.
+        Pass hedge=False when two concurrent runs would be visible, e.g. when streaming tokens.
+        When failover_exceptions is given, any other exception is raised straight to the
+        caller too, without counting against the provider.
+
+        After a circuit's cooldown only one call at a time goes to that provider as a trial;
+        CircuitOpenError is raised without a call when no provider can take the work.
+        """
+        order = self.rank(workload)
+        running: Dict[asyncio.Task, Tuple[str, float]] = {}
+        # Calls running as a provider's half-open trial
+        trials: Dict[asyncio.Task, str] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            # Another caller may have taken a provider's trial since the ranking
+            while order:
+                provider = order.pop(0)
+                claim = self._acquire(provider)
+                if claim is False:
+                    continue
+                future = asyncio.ensure_future(call(provider))
+                running[future] = (provider, time.monotonic())
+                if claim:
+                    trials[future] = provider
+                return True
+            return False
+
+        if not launch():
+            raise CircuitOpenError(self.retry_after())
+        try:
+            while running:
+                timeout = None
+                if self.hedging and hedge and order and len(running) == 1:
+                    provider, started = next(iter(running.values()))
+                    deadline = self.p95(provider, workload)
+                    if deadline is not None:
+                        timeout = max(0.0, started + deadline - time.monotonic())
+
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Primary is past its p95: race a second provider against it
+                    if launch():
+                        self.hedges_started += 1
+                    continue
+
+                for future in done:
+                    provider, started = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        trials.pop(future, None)
+                        self.record_success(provider, workload, time.monotonic() - started)
+                        if running:
+                            self.hedges_won += 1
+                        return future.result()
+                    if isinstance(error, abort_exceptions):
+                        raise error
+                    if failover_exceptions is not None and not isinstance(
+                        error, failover_exceptions + neutral_exceptions
+                    ):
+                        raise error
+                    last_error = error
+                    if not isinstance(error, neutral_exceptions):
+                        trials.pop(future, None)
+                        self.record_failure(provider)
+                    logger.warning(f"LLM provider '{provider}' failed for {workload}: {error}")
+
+                if not running:
+                    launch()
+        finally:
+            for future in running:
+                future.cancel()
+            # Trials that ended without a verdict on the provider free the slot for the next caller
+            for provider in trials.values():
+                self._release_trial(provider)
+        raise last_error
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-provider health and latency"""
+        stats: Dict[str, Any] = {"hedges_started": self.hedges_started, "hedges_won": self.hedges_won, "providers": {}}
+        for provider in self.providers():
+            health = self._get_health(provider)
+            stats["providers"][provider] = {
+                "available": self.is_available(provider),
+                "circuit_open": health.opened_at is not None,
+                "successes": health.successes,
+                "failures": health.failures,
+                "latency_ewma": {w: round(v, 3) for (p, w), v in self._ewma.items() if p == provider}
+            }
+        return stats
+
+# Global router instance
+llm_router = LLMRouter(
+    failure_threshold=llm_config.circuit_failure_threshold,
+    cooldown_seconds=llm_config.circuit_cooldown,
+    hedging=llm_config.hedge_requests,
+    hedge_min_samples=llm_config.hedge_min_samples
+)
@@ -3,12 +3,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+import asyncio
 import os
-from dotenv import load_dotenv
 import logging
 
-# Load environment variables
-load_dotenv()
+# Load environment variables (config loads .env once for the whole app)
+from config.llm_config import llm_config
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,12 +31,35 @@ app.add_middleware(
 
 # Import route modules (we'll create these)
 from routes import agents, tasks, lanes
+from agents.executor import crew_executor
+from agents.scheduler import task_scheduler
+from agents.orchestrator import get_orchestrator, close_orchestrator
+from tools.http_client import http_client
+from tools.parallel import tool_runner
 
 # Include routers
 app.include_router(agents.router, prefix="/api/agents", tags=["agents"])
 app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
 app.include_router(lanes.router, prefix="/api/lanes", tags=["lanes"])
 
+@app.on_event("startup")
+async def start_scheduler():
+    task_scheduler.start()
+    await http_client.start()
+    # Pick up tasks a previous run left queued or half done
+    await get_orchestrator().resume_interrupted_tasks()
+    if llm_config.warmup_agents:
+        # Warm agents in the background so /health answers immediately
+        asyncio.get_running_loop().run_in_executor(None, get_orchestrator().warm_up)
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    await task_scheduler.stop()
+    crew_executor.shutdown()
+    tool_runner.shutdown()
+    await http_client.aclose()
+    close_orchestrator()
+
 @app.get("/")
 async def root():
     return {"message": "TISB World Agent API is running"}
@@ -45,6 +68,10 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/agents")
+async def agents_health_check():
+    return {"agents": get_orchestrator().warm_state}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
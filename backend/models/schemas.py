@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from enum import Enum
 
@@ -27,14 +27,32 @@ class ProcessUpdateRequest(BaseModel):
     transcript: str
     lane: Optional[LaneType] = None
 
+class ClassificationTier(str, Enum):
+    CACHE = "cache"
+    LOCAL = "local"
+    LLM = "llm"
+    FALLBACK = "fallback"
+
 class ClassificationResult(BaseModel):
     lane: LaneType
     confidence: float
     reasoning: str
+    tier: Optional[ClassificationTier] = None
+    # Fallback given because the LLM was overloaded or out of time; sending the item again may classify it
+    retryable: bool = False
+
+class BatchClassificationRequest(BaseModel):
+    transcripts: List[str] = Field(..., min_length=1, max_length=500)
+
+class BatchClassificationResponse(BaseModel):
+    results: List[ClassificationResult]
 
 class TaskRequest(BaseModel):
     user_input: str
     context: Optional[Dict[str, Any]] = None
+    priority: int = 0
+    timeout: Optional[float] = Field(None, gt=0, description="Seconds the crew may run; capped at AGENT_TIMEOUT")
+    regenerate_plan: bool = Field(False, description="Ask the coordinator for a fresh plan even if a cached one matches")
 
 class AgentAction(BaseModel):
     agent_type: AgentType
@@ -46,6 +64,7 @@ class TaskStep(BaseModel):
     step_id: str
     description: str
     agent_actions: List[AgentAction]
+    depends_on: List[str] = []
     status: TaskStatus
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
@@ -1,31 +1,96 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Request
+from typing import List, Optional
 import logging
 
-from models.schemas import ProcessUpdateRequest, ClassificationResult
-from agents.orchestrator import orchestrator
+from models.schemas import (
+    ProcessUpdateRequest, ClassificationResult, LaneType,
+    BatchClassificationRequest, BatchClassificationResponse
+)
+from agents.orchestrator import get_orchestrator
+from config.llm_router import llm_router, CircuitOpenError
+from agents.executor import crew_executor, ExecutorSaturatedError
+from agents.deadlines import DeadlineExceededError, run_request
+from agents.task_store import FINISHED_STATUSES
+from agents.classification_cache import classification_cache
+from agents.fast_classifier import fast_classifier
+from agents.research_cache import research_cache
+from agents.plan_cache import plan_cache
+from agents.token_usage import token_usage
+from agents.output_parser import output_parser
+from tools.http_client import http_client
+from tools.parallel import tool_runner
+from tools.memo import tool_cache
+from tools.ledger import side_effect_ledger
+from agents.idempotency import idempotency_store
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/classify", response_model=ClassificationResult)
-async def classify_update(request: ProcessUpdateRequest):
+async def classify_update(request: ProcessUpdateRequest, http_request: Request):
     """Classify a user update into the appropriate lane"""
     try:
-        result = await orchestrator.classify_update(request.transcript)
+        result = await run_request(http_request, get_orchestrator().classify_update(request.transcript))
         
         return ClassificationResult(
             lane=result["lane"],
             confidence=result["confidence"],
-            reasoning=result["reasoning"]
+            reasoning=result["reasoning"],
+            tier=result.get("tier")
         )
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": f"{e.retry_after:.0f}"})
+    except DeadlineExceededError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         logger.error(f"Classification error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/classify/batch", response_model=BatchClassificationResponse)
+async def classify_batch(request: BatchClassificationRequest, http_request: Request):
+    """Classify many updates at once, sharing LLM calls between them"""
+    try:
+        results = await run_request(http_request, get_orchestrator().classify_batch(request.transcripts))
+        
+        return BatchClassificationResponse(results=[
+            ClassificationResult(
+                lane=result["lane"],
+                confidence=result["confidence"],
+                reasoning=result["reasoning"],
+                tier=result.get("tier"),
+                retryable=result.get("retryable", False)
+            )
+            for result in results
+        ])
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": f"{e.retry_after:.0f}"})
+    except DeadlineExceededError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch classification error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/classify/cache")
+async def get_classification_cache_stats():
+    """Get hit/miss statistics for the classification cache"""
+    return classification_cache.get_stats()
+
+@router.delete("/classify/cache")
+async def invalidate_classification_cache(lane: Optional[LaneType] = None):
+    """Drop cached classifications for one lane, or all of them"""
+    if lane:
+        return {"invalidated": classification_cache.invalidate_lane(lane.value)}
+    classification_cache.clear()
+    return {"invalidated": "all"}
+
 @router.get("/status")
 async def get_agent_status():
     """Get the current status of all agents"""
+    task_counts = get_orchestrator().count_tasks()
     return {
         "agents": {
             "classifier": "active",
@@ -34,5 +99,20 @@ async def get_agent_status():
             "content_creator": "active",
             "coordinator": "active"
         },
-        "active_tasks": len(orchestrator.list_active_tasks())
+        "active_tasks": sum(n for status, n in task_counts.items() if status not in FINISHED_STATUSES),
+        "task_counts": task_counts,
+        "executor": crew_executor.get_stats(),
+        "crew_pools": {pool.name: pool.get_stats() for pool in get_orchestrator().crew_pools.values()},
+        "llm_router": llm_router.get_stats(),
+        "classification_cache": classification_cache.get_stats(),
+        "research_cache": research_cache.get_stats(),
+        "plan_cache": plan_cache.get_stats(),
+        "token_usage": token_usage.get_stats(),
+        "output_parser": output_parser.get_stats(),
+        "http_client": http_client.get_stats(),
+        "tool_runner": tool_runner.get_stats(),
+        "tool_cache": tool_cache.get_stats(),
+        "side_effect_ledger": side_effect_ledger.get_stats(),
+        "idempotency": idempotency_store.get_stats(),
+        "fast_classifier": fast_classifier.get_stats()
     }
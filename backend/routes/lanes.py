@@ -1,55 +1,9 @@
 from fastapi import APIRouter
 from typing import List, Dict, Any
 
-router = APIRouter()
+from config.lanes import LANE_CONFIGS
 
-# Lane configurations
-LANE_CONFIGS = {
-    "podcasting": {
-        "name": "Podcasting",
-        "description": "Podcast content, interviews, episode planning",
-        "tools": ["calendar", "research", "content_creation"],
-        "default_actions": [
-            "Research guest background",
-            "Schedule interview",
-            "Prepare questions",
-            "Create episode outline"
-        ]
-    },
-    "podcast-bots-ai": {
-        "name": "Podcast Bots AI",
-        "description": "AI startup development and product work",
-        "tools": ["research", "content_creation", "task_management"],
-        "default_actions": [
-            "Research market trends",
-            "Create product documentation",
-            "Plan development tasks",
-            "Generate marketing content"
-        ]
-    },
-    "accelerator-work": {
-        "name": "Accelerator Work", 
-        "description": "Business development and accelerator activities",
-        "tools": ["calendar", "research", "networking"],
-        "default_actions": [
-            "Research potential partners",
-            "Schedule meetings",
-            "Prepare pitch materials",
-            "Track progress metrics"
-        ]
-    },
-    "miscellaneous": {
-        "name": "Miscellaneous",
-        "description": "General tasks and personal activities",
-        "tools": ["calendar", "research", "content_creation"],
-        "default_actions": [
-            "Research topic",
-            "Schedule task",
-            "Create reminder",
-            "Generate summary"
-        ]
-    }
-}
+router = APIRouter()
 
 @router.get("/")
 async def list_lanes():
@@ -1,32 +1,64 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from datetime import date, datetime
+from typing import Optional, Union
+import asyncio
+import json
 import logging
 
-from models.schemas import TaskRequest, TaskResponse, ConfirmationRequest
-from agents.orchestrator import orchestrator
+from config.llm_config import llm_config
+from config.llm_router import CircuitOpenError
+from models.schemas import TaskRequest, TaskResponse, TaskStep, ConfirmationRequest, TaskStatus, LaneType
+from agents.orchestrator import get_orchestrator
+from agents.executor import ExecutorSaturatedError
+from agents.deadlines import DeadlineExceededError, run_request, deadline_scope, request_timeout
+from agents.idempotency import IdempotencyConflictError, idempotent
+from agents.events import task_events, TERMINAL_EVENTS
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+def _created_at_bound(value: Optional[Union[datetime, date]]) -> Optional[str]:
+    """Turn a since/until bound into the naive local ISO format tasks are stamped with"""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat()
+
+def _task_response(task_id: str, task_status: dict) -> TaskResponse:
+    """Build a TaskResponse with the task's checkpointed steps"""
+    steps = [TaskStep(**step) for step in task_status.get("steps") or []]
+    return TaskResponse(
+        task_id=task_id,
+        status=task_status.get("status", "unknown"),
+        current_step=next((step for step in steps if step.status not in (TaskStatus.COMPLETED, TaskStatus.FAILED)), None),
+        all_steps=steps,
+        final_result=task_status
+    )
+
 @router.post("/process", response_model=TaskResponse)
-async def process_task(request: TaskRequest):
-    """Process a complex task using the agent crew"""
+async def process_task(request: TaskRequest, http_request: Request):
+    """Queue a complex task for the agent crew and return immediately; retries with the same Idempotency-Key get the same task"""
     try:
-        task_id = await orchestrator.process_task(
+        task_id = await idempotent(http_request, request.model_dump(), lambda: get_orchestrator().process_task(
             user_input=request.user_input,
-            lane=request.context.get("lane") if request.context else None
-        )
+            lane=request.context.get("lane") if request.context else None,
+            priority=request.priority,
+            timeout=request.timeout,
+            regenerate_plan=request.regenerate_plan
+        ))
         
         # Get the initial task status
-        task_status = orchestrator.get_task_status(task_id)
+        task_status = get_orchestrator().get_task_status(task_id)
         
-        return TaskResponse(
-            task_id=task_id,
-            status="processing",
-            current_step=None,  # Will be populated as task progresses
-            all_steps=[],
-            final_result=task_status
-        )
+        return _task_response(task_id, task_status)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Task queue is full", headers={"Retry-After": "5"})
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"Task processing error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -34,46 +66,186 @@ async def process_task(request: TaskRequest):
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task_status(task_id: str):
     """Get the status of a specific task"""
-    task_status = orchestrator.get_task_status(task_id)
+    task_status = get_orchestrator().get_task_status(task_id)
     
     if not task_status:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    return TaskResponse(
-        task_id=task_id,
-        status=task_status.get("status", "unknown"),
-        current_step=None,
-        all_steps=[],
-        final_result=task_status
+    return _task_response(task_id, task_status)
+
+def _final_event(task_id: str, task_status: dict):
+    """Synthesize the terminal event for a task whose live events are no longer buffered"""
+    event_type = task_status["status"] if task_status["status"] in TERMINAL_EVENTS else "status"
+    return {"task_id": task_id, "type": event_type, "data": task_status}
+
+async def _task_event_stream(task_id: str):
+    task_status = get_orchestrator().get_task_status(task_id)
+    if task_status["status"] in TERMINAL_EVENTS:
+        yield _final_event(task_id, task_status)
+        return
+    
+    # The event bus only sees tasks run by this worker, so the store is polled too: a task
+    # running in another uvicorn worker still reports status changes and its final event
+    status = task_status["status"]
+    events = task_events.subscribe(task_id)
+    next_event = asyncio.ensure_future(events.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({next_event}, timeout=llm_config.task_stream_poll_interval)
+            if done:
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    return
+                if event["type"] == "status":
+                    status = event["data"]["status"]
+                yield event
+                next_event = asyncio.ensure_future(events.__anext__())
+                continue
+            
+            task_status = get_orchestrator().get_task_status(task_id)
+            if not task_status or task_status["status"] in TERMINAL_EVENTS:
+                if task_status:
+                    yield _final_event(task_id, task_status)
+                return
+            if task_status["status"] != status:
+                status = task_status["status"]
+                yield {"task_id": task_id, "type": "status", "data": {"status": status}}
+    finally:
+        # Cancelling the pending read closes the subscription
+        next_event.cancel()
+        try:
+            await next_event
+        except (asyncio.CancelledError, StopAsyncIteration):
+            pass
+        await events.aclose()
+
+@router.get("/{task_id}/stream")
+async def stream_task_sse(task_id: str):
+    """Stream task progress as server-sent events"""
+    if not get_orchestrator().get_task_status(task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    async def generate_stream():
+        async for event in _task_event_stream(task_id):
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        generate_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
+@router.websocket("/{task_id}/stream")
+async def stream_task_ws(websocket: WebSocket, task_id: str):
+    """Stream task progress over a WebSocket"""
+    await websocket.accept()
+    if not get_orchestrator().get_task_status(task_id):
+        await websocket.close(code=4404, reason="Task not found")
+        return
+    
+    try:
+        async for event in _task_event_stream(task_id):
+            await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Stream client for task {task_id} disconnected")
+
 @router.get("/")
-async def list_tasks():
-    """List all active tasks"""
+async def list_tasks(
+    status: Optional[TaskStatus] = None,
+    lane: Optional[LaneType] = None,
+    since: Optional[Union[datetime, date]] = None,
+    until: Optional[Union[datetime, date]] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return; 'plan' and 'steps' are only included when listed")
+):
+    """List tasks newest first with cursor pagination"""
+    try:
+        tasks, next_cursor = get_orchestrator().list_tasks(
+            status=status.value if status else None,
+            lane=lane.value if lane else None,
+            since=_created_at_bound(since),
+            until=_created_at_bound(until),
+            limit=limit,
+            cursor=cursor,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     return {
-        "tasks": orchestrator.list_active_tasks()
+        "tasks": tasks,
+        "next_cursor": next_cursor
     }
 
-@router.post("/confirm")
-async def confirm_action(request: ConfirmationRequest):
-    """Confirm or reject an agent action that requires user approval"""
-    # TODO: Implement confirmation logic
-    return {
-        "message": "Confirmation received",
-        "task_id": request.task_id,
-        "action_approved": request.action_approved
-    }
+@router.post("/confirm", response_model=TaskResponse)
+async def confirm_action(request: ConfirmationRequest, http_request: Request):
+    """Confirm or reject an agent action that requires user approval; the task resumes from its checkpoint"""
+    async def confirm():
+        return get_orchestrator().confirm_step(
+            request.task_id, request.step_id, request.action_approved, request.user_notes
+        )
+    
+    try:
+        task_status = await idempotent(http_request, request.model_dump(), confirm)
+        return _task_response(request.task_id, task_status)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Task not found")
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Task queue is full", headers={"Retry-After": "5"})
 
 @router.post("/research")
-async def research_topic(request: dict):
+async def research_topic(request: dict, http_request: Request):
     """Execute a research task"""
     try:
         query = request.get("query")
         if not query:
             raise HTTPException(status_code=400, detail="Query is required")
         
-        result = await orchestrator.execute_research_task(query)
+        result = await run_request(http_request, idempotent(
+            http_request, request,
+            lambda: get_orchestrator().execute_research_task(query, refresh=bool(request.get("refresh")))
+        ))
         return result
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": f"{e.retry_after:.0f}"})
+    except DeadlineExceededError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"Research error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/research/stream")
+async def stream_research_topic(request: dict, http_request: Request):
+    """Stream a research task's LLM tokens as JSON lines (or SSE), ending with the result envelope"""
+    query = request.get("query")
+    if not query:
+        raise HTTPException(status_code=400, detail="Query is required")
+    
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+    
+    async def generate_stream():
+        with deadline_scope(request_timeout(http_request)):
+            async for event in get_orchestrator().stream_research_task(query, refresh=bool(request.get("refresh"))):
+                if use_sse:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                else:
+                    yield json.dumps(event) + "\n"
+    
+    return StreamingResponse(
+        generate_stream(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,81 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Tests import the app modules the way main.py does, from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class ScriptedCrew:
+    """Crew answering each kickoff from a script keyed on the plan step description"""
+
+    def __init__(self, script, calls):
+        self.script = script
+        self.calls = calls
+
+    def kickoff(self, inputs):
+        key = inputs.get("step", inputs.get("query"))
+        self.calls.append(key)
+        outcome = self.script.get(key, f"did {key}")
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+class RecordingScheduler:
+    """Stands in for the task scheduler, recording the jobs queued on it"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, task_id, job, priority=0):
+        self.submitted.append(task_id)
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    from agents import orchestrator as orchestrator_module
+
+    scheduler = RecordingScheduler()
+    monkeypatch.setattr(orchestrator_module, "task_scheduler", scheduler)
+    return scheduler
+
+@pytest.fixture
+def harness():
+    """An orchestrator whose crews are scripted, with the script and the list of kickoffs"""
+    from agents.orchestrator import AgentOrchestrator
+
+    calls, script = [], {}
+    orchestrator = AgentOrchestrator(crew_factory=lambda workflow, provider: ScriptedCrew(script, calls))
+    yield orchestrator, script, calls
+    orchestrator.close()
+
+def make_step(step_id, description, depends_on=(), requires_confirmation=False, agent_type="calendar_manager"):
+    return {
+        "step_id": step_id,
+        "description": description,
+        "agent_actions": [{
+            "agent_type": agent_type,
+            "action": description,
+            "parameters": {},
+            "requires_confirmation": requires_confirmation
+        }],
+        "depends_on": list(depends_on),
+        "status": "pending",
+        "result": None,
+        "error": None
+    }
+
+def add_task(orchestrator, steps, task_id="task", user_input="plan the week"):
+    orchestrator.task_store.put(task_id, {
+        "user_input": user_input,
+        "lane": "accelerator-work",
+        "plan": "a plan",
+        "steps": steps,
+        "status": "pending",
+        "priority": 0,
+        "timeout": 30,
+        "created_at": datetime.now().isoformat()
+    })
+
+def steps_by_id(orchestrator, task_id="task"):
+    return {s["step_id"]: s for s in orchestrator.task_store.get(task_id)["steps"]}
@@ -0,0 +1,61 @@
+from agents import classification_cache as cache_module
+from agents.classification_cache import ClassificationCache, normalize_transcript
+
+RESULT = {"lane": "podcast", "confidence": 0.9, "reasoning": "episode prep"}
+
+def test_rephrased_punctuation_and_case_share_an_entry():
+    cache = ClassificationCache()
+    cache.put("Record the episode intro!", RESULT)
+
+    assert normalize_transcript("  RECORD the episode, intro ") == "record the episode intro"
+    assert cache.get("record   the Episode intro") == RESULT
+    assert cache.get_stats()["hits"] == 1
+
+def test_near_duplicates_hit_above_the_threshold_only():
+    cache = ClassificationCache(similarity_threshold=0.6)
+    cache.put("record the episode intro with jane tomorrow", RESULT)
+
+    assert cache.get("record the episode intro with jane today") == RESULT
+    assert cache.get("email the sponsor about the invoice") is None
+    stats = cache.get_stats()
+    assert (stats["near_hits"], stats["misses"]) == (1, 1)
+
+def test_near_duplicate_matching_can_be_disabled():
+    cache = ClassificationCache(similarity_threshold=0)
+    cache.put("record the episode intro with jane tomorrow", RESULT)
+
+    assert cache.get("record the episode intro with jane today") is None
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = ClassificationCache(ttl_seconds=60)
+    cache.put("record the intro", RESULT)
+
+    now[0] += 59
+    assert cache.get("record the intro") == RESULT
+    now[0] += 2
+    assert cache.get("record the intro") is None
+    assert cache.get_stats()["size"] == 0
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ClassificationCache(max_size=2, similarity_threshold=0)
+    cache.put("first", RESULT)
+    cache.put("second", RESULT)
+    cache.get("first")
+    cache.put("third", RESULT)
+
+    assert cache.get("second") is None
+    assert cache.get("first") == RESULT
+    assert cache.get_stats()["evictions"] == 1
+
+def test_invalidate_lane_and_returned_results_are_copies():
+    cache = ClassificationCache()
+    cache.put("record the intro", RESULT)
+    cache.put("pay the invoice", dict(RESULT, lane="business"))
+
+    cache.get("record the intro")["lane"] = "changed"
+    assert cache.get("record the intro")["lane"] == "podcast"
+    assert cache.invalidate_lane("podcast") == 1
+    assert cache.get("record the intro") is None
+    assert cache.get("pay the invoice")["lane"] == "business"
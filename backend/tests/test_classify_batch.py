@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+
+from agents import orchestrator as orchestrator_module
+from agents.classification_cache import ClassificationCache
+from agents.executor import ExecutorSaturatedError
+from agents.fast_classifier import FastClassifier
+from agents.orchestrator import AgentOrchestrator
+
+class BatchCrew:
+    """Classifier crew filing every numbered transcript under podcasting"""
+
+    def __init__(self, prompts):
+        self.prompts = prompts
+
+    def kickoff(self, inputs):
+        lines = [line for line in inputs["transcripts"].splitlines() if line.strip()]
+        self.prompts.append(len(lines))
+        return json.dumps([
+            {"id": i, "lane": "podcasting", "confidence": 0.9, "reasoning": "mentions an episode"}
+            for i in range(len(lines))
+        ])
+
+@pytest.fixture
+def classifier(monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "classification_cache", ClassificationCache())
+    # Confidence never exceeds 1, so every transcript goes to the LLM
+    monkeypatch.setattr(orchestrator_module, "fast_classifier", FastClassifier(threshold=1.1))
+    prompts = []
+    orchestrator = AgentOrchestrator(crew_factory=lambda workflow, provider: BatchCrew(prompts))
+    yield orchestrator, prompts
+    orchestrator.close()
+
+def test_duplicates_share_a_prompt_slot(classifier):
+    orchestrator, prompts = classifier
+    transcripts = ["Record the episode intro", "record the  episode intro", "Edit the trailer"]
+
+    results = asyncio.run(orchestrator.classify_batch(transcripts))
+
+    assert prompts == [2]
+    assert [r["tier"] for r in results] == ["llm"] * 3
+    # Classified transcripts are answered from the cache next time
+    assert asyncio.run(orchestrator.classify_batch(["Edit the trailer"]))[0]["tier"] == "cache"
+
+def test_a_saturated_chunk_only_falls_back_for_its_own_items(classifier, monkeypatch):
+    orchestrator, prompts = classifier
+    monkeypatch.setattr(orchestrator_module.llm_config, "classify_batch_max_items", 1)
+    original = orchestrator._classify_chunk
+
+    async def classify_chunk(transcripts):
+        if transcripts == ["Edit the trailer"]:
+            raise ExecutorSaturatedError("openai", 8)
+        return await original(transcripts)
+
+    orchestrator._classify_chunk = classify_chunk
+    results = asyncio.run(orchestrator.classify_batch(["Record the episode intro", "Edit the trailer"]))
+
+    assert [(r["tier"], r.get("retryable", False)) for r in results] == [("llm", False), ("fallback", True)]
+
+def test_saturation_is_raised_when_nothing_was_classified(classifier):
+    orchestrator, prompts = classifier
+
+    async def classify_chunk(transcripts):
+        raise ExecutorSaturatedError("openai", 8)
+
+    orchestrator._classify_chunk = classify_chunk
+    with pytest.raises(ExecutorSaturatedError):
+        asyncio.run(orchestrator.classify_batch(["Record the episode intro", "Edit the trailer"]))
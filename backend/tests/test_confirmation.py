@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from conftest import add_task, make_step, steps_by_id
+
+def test_pause_confirm_and_resume(harness, scheduler):
+    orchestrator, script, calls = harness
+    add_task(orchestrator, [
+        make_step("1", "find a slot"),
+        make_step("2", "book the meeting", depends_on=["1"], requires_confirmation=True),
+        make_step("3", "send the invite", depends_on=["2"]),
+        make_step("4", "draft notes")
+    ])
+
+    asyncio.run(orchestrator._run_task("task"))
+    record = orchestrator.task_store.get("task")
+    assert record["status"] == "waiting_confirmation"
+    assert record["pending_steps"] == ["2"]
+    assert sorted(calls) == ["draft notes", "find a slot"]
+
+    orchestrator.confirm_step("task", "2", approved=True, notes="Tuesday works")
+    assert scheduler.submitted == ["task"]
+    assert orchestrator.task_store.get("task")["status"] == "pending"
+
+    asyncio.run(orchestrator._run_task("task"))
+    assert orchestrator.task_store.get("task")["status"] == "completed"
+    # Finished steps are not run again after the pause
+    assert sorted(calls) == ["book the meeting", "draft notes", "find a slot", "send the invite"]
+    assert steps_by_id(orchestrator)["2"]["confirmation"]["notes"] == "Tuesday works"
+
+def test_confirmation_notes_reach_the_dependent_steps(harness, scheduler):
+    orchestrator, script, calls = harness
+    seen = []
+    add_task(orchestrator, [
+        make_step("1", "book the meeting", requires_confirmation=True),
+        make_step("2", "send the invite", depends_on=["1"])
+    ])
+    original = orchestrator._kickoff
+
+    async def kickoff(workflow, inputs, **kwargs):
+        seen.append(inputs["context"])
+        return await original(workflow, inputs, **kwargs)
+
+    orchestrator._kickoff = kickoff
+    asyncio.run(orchestrator._run_task("task"))
+    orchestrator.confirm_step("task", "1", approved=True, notes="Use the Zoom link")
+    asyncio.run(orchestrator._run_task("task"))
+
+    assert "Use the Zoom link" in seen[-1]
+
+def test_reject_fails_the_step_and_skips_its_dependents(harness, scheduler):
+    orchestrator, script, calls = harness
+    add_task(orchestrator, [
+        make_step("1", "book the meeting", requires_confirmation=True),
+        make_step("2", "send the invite", depends_on=["1"])
+    ])
+
+    asyncio.run(orchestrator._run_task("task"))
+    orchestrator.confirm_step("task", "1", approved=False)
+    asyncio.run(orchestrator._run_task("task"))
+
+    steps = steps_by_id(orchestrator)
+    assert steps["1"]["status"] == "failed" and steps["1"]["error"] == "Rejected by user"
+    assert steps["2"]["status"] == "failed" and steps["2"]["error"].startswith("Skipped")
+    assert calls == []
+
+def test_confirm_checks_the_task_is_waiting_on_the_step(harness, scheduler):
+    orchestrator, script, calls = harness
+    add_task(orchestrator, [make_step("1", "book the meeting", requires_confirmation=True), make_step("2", "draft notes")])
+
+    with pytest.raises(KeyError):
+        orchestrator.confirm_step("unknown", "1", approved=True)
+    with pytest.raises(ValueError):
+        orchestrator.confirm_step("task", "1", approved=True)
+
+    asyncio.run(orchestrator._run_task("task"))
+    with pytest.raises(ValueError):
+        orchestrator.confirm_step("task", "2", approved=True)
+    assert scheduler.submitted == []
+
+def test_interrupted_step_is_run_again_on_resume(harness, scheduler):
+    orchestrator, script, calls = harness
+    steps = [make_step("1", "research"), make_step("2", "draft", depends_on=["1"])]
+    steps[0].update(status="completed", result={"output": "earlier research"})
+    steps[1]["status"] = "processing"
+    add_task(orchestrator, steps)
+
+    asyncio.run(orchestrator._run_task("task"))
+
+    assert calls == ["draft"]
+    assert steps_by_id(orchestrator)["2"]["status"] == "completed"
@@ -0,0 +1,88 @@
+import asyncio
+import contextvars
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agents.deadlines import (
+    DeadlineExceededError, check_deadline, current_deadline, deadline_scope, request_timeout,
+    run_request, run_with_deadline
+)
+from config.llm_config import llm_config
+
+class FakeRequest:
+    """Request with a timeout header whose client disconnects after a number of polls"""
+
+    def __init__(self, timeout=None, disconnect_after=None):
+        self.headers = {"x-request-timeout": timeout} if timeout is not None else {}
+        self.url = SimpleNamespace(path="/api/tasks/create")
+        self.disconnect_after = disconnect_after
+        self.polls = 0
+
+    async def is_disconnected(self):
+        self.polls += 1
+        return self.disconnect_after is not None and self.polls >= self.disconnect_after
+
+def test_nested_scopes_only_shorten_and_inherit_cancellation():
+    with deadline_scope(0.5) as outer:
+        with deadline_scope(60) as inner:
+            assert inner.remaining() <= 0.5
+            outer.cancel("cancelled: client disconnected")
+            with pytest.raises(DeadlineExceededError, match="client disconnected"):
+                check_deadline()
+    assert current_deadline.get() is None
+
+def test_timing_out_cancels_threads_still_running():
+    stopped = threading.Event()
+
+    def crew_steps():
+        for _ in range(50):
+            time.sleep(0.01)
+            try:
+                check_deadline()
+            except DeadlineExceededError:
+                stopped.set()
+                return
+
+    async def scenario():
+        with deadline_scope(0.05):
+            loop = asyncio.get_running_loop()
+            # Crew threads see the deadline through the copied context, as with the crew executor
+            ctx = contextvars.copy_context()
+            with pytest.raises(DeadlineExceededError, match="timed out"):
+                await run_with_deadline(loop.run_in_executor(None, ctx.run, crew_steps))
+
+    asyncio.run(scenario())
+    assert stopped.wait(1)
+
+def test_request_timeout_header_is_capped_at_the_agent_timeout():
+    assert request_timeout(FakeRequest("5")) == 5
+    assert request_timeout(FakeRequest(str(llm_config.agent_timeout * 10))) == llm_config.agent_timeout
+    assert request_timeout(FakeRequest("soon")) == llm_config.agent_timeout
+    assert request_timeout(FakeRequest()) == llm_config.agent_timeout
+
+def test_client_disconnect_cancels_the_request_work():
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        with pytest.raises(DeadlineExceededError, match="client disconnected"):
+            await run_request(FakeRequest(disconnect_after=2), work(), poll_interval=0.01)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert cancelled == [True]
+
+def test_request_returns_the_work_result_in_time():
+    async def work():
+        return "done"
+
+    assert asyncio.run(run_request(FakeRequest("1"), work(), poll_interval=0.01)) == "done"
@@ -0,0 +1,57 @@
+import asyncio
+
+from agents.events import TaskEventBus
+
+async def collect(bus, task_id, publish):
+    """Subscribe, publish while the subscriber is not reading, then drain what it receives"""
+    events = bus.subscribe(task_id)
+    first = asyncio.ensure_future(events.__anext__())
+    await asyncio.sleep(0)
+    publish()
+    try:
+        received = [await first]
+    except StopAsyncIteration:
+        return []
+    async for event in events:
+        received.append(event)
+    return received
+
+def test_a_slow_subscriber_loses_tokens_but_not_progress_events():
+    bus = TaskEventBus(history_limit=2, queue_size=4)
+
+    def publish():
+        bus.publish("task", "status", {"status": "processing"})
+        for i in range(10):
+            bus.publish("task", "token", str(i))
+        bus.publish("task", "completed", {"status": "completed"})
+
+    received = asyncio.run(collect(bus, "task", publish))
+
+    assert received[0]["type"] == "status"
+    assert received[-1]["type"] == "completed"
+    assert len(received) <= 4
+
+def test_a_subscriber_behind_on_progress_events_is_disconnected():
+    bus = TaskEventBus(history_limit=2, queue_size=3)
+
+    def publish():
+        for i in range(5):
+            bus.publish("task", "agent_action", {"i": i})
+
+    received = asyncio.run(collect(bus, "task", publish))
+
+    # The stream ends without a terminal event; reconnecting replays the history
+    assert received == []
+    assert bus.subscriber_count() == 0
+    assert [e["data"]["i"] for e in bus._history["task"]] == [3, 4]
+
+def test_history_is_replayed_even_when_longer_than_the_queue_size():
+    bus = TaskEventBus(history_limit=5, queue_size=1)
+
+    async def replay():
+        for i in range(4):
+            bus.publish("task", "agent_action", {"i": i})
+        bus.publish("task", "completed", {})
+        return [event async for event in bus.subscribe("task")]
+
+    assert len(asyncio.run(replay())) == 5
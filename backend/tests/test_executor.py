@@ -0,0 +1,131 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from agents import orchestrator as orchestrator_module
+from agents.deadlines import DeadlineExceededError, deadline_scope, run_with_deadline
+from agents.executor import CrewExecutor, ExecutorSaturatedError, wait_for_capacity
+from conftest import add_task, make_step
+
+@pytest.fixture
+def executor(monkeypatch):
+    # One slot and no queue: a single kickoff fills it
+    monkeypatch.setenv("OPENAI_CONCURRENCY", "1")
+    executor = CrewExecutor(max_workers=1, max_queue_depth=0)
+    yield executor
+    executor.shutdown()
+
+async def occupy(executor, release):
+    """Start a kickoff that holds the executor's only slot until release is set"""
+    busy = asyncio.ensure_future(executor.run(release.wait, provider="openai"))
+    while not executor.get_stats()["pending"].get("openai"):
+        await asyncio.sleep(0.01)
+    return busy
+
+def test_kickoffs_past_the_queue_limit_are_rejected(monkeypatch):
+    monkeypatch.setenv("OPENAI_CONCURRENCY", "2")
+    executor = CrewExecutor(max_workers=4, max_queue_depth=1)
+    active, peak, lock = [0], [0], threading.Lock()
+    release = threading.Event()
+
+    def kickoff():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        release.wait()
+        with lock:
+            active[0] -= 1
+
+    async def scenario():
+        # Two running at the provider limit and one queued fill the capacity
+        running = [asyncio.ensure_future(executor.run(kickoff, provider="openai")) for _ in range(3)]
+        while executor.get_stats()["pending"].get("openai") != 3:
+            await asyncio.sleep(0.01)
+        with pytest.raises(ExecutorSaturatedError) as error:
+            await executor.run(kickoff, provider="openai")
+        assert error.value.pending == 3
+        # Other providers have their own limit
+        assert await executor.run(lambda: "ok", provider="anthropic") == "ok"
+        release.set()
+        await asyncio.gather(*running)
+
+    asyncio.run(scenario())
+    executor.shutdown()
+    assert peak[0] == 2
+    assert executor.get_stats()["pending"] == {"openai": 0, "anthropic": 0}
+
+def test_saturation_is_reported_as_503_with_retry_after(monkeypatch):
+    from routes import agents as agents_routes
+
+    class SaturatedOrchestrator:
+        async def classify_update(self, transcript):
+            raise ExecutorSaturatedError("openai", 12)
+
+    monkeypatch.setattr(agents_routes, "get_orchestrator", lambda: SaturatedOrchestrator())
+    app = FastAPI()
+    app.include_router(agents_routes.router, prefix="/api/agents")
+
+    response = TestClient(app).post("/api/agents/classify", json={"transcript": "record the intro"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert "saturated" in response.json()["detail"]
+
+def test_background_work_waits_for_a_slot(executor):
+    async def scenario():
+        release = threading.Event()
+        busy = await occupy(executor, release)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(lambda: "rejected", provider="openai")
+
+        token = wait_for_capacity.set(True)
+        try:
+            queued = asyncio.ensure_future(executor.run(lambda: "queued", provider="openai"))
+            await asyncio.sleep(0.05)
+            assert not queued.done()
+            release.set()
+            assert await queued == "queued"
+        finally:
+            wait_for_capacity.reset(token)
+        await busy
+
+    asyncio.run(scenario())
+    assert executor.get_stats()["pending"] == {"openai": 0}
+
+def test_waiting_for_a_slot_ends_at_the_deadline(executor):
+    async def scenario():
+        release = threading.Event()
+        busy = await occupy(executor, release)
+        token = wait_for_capacity.set(True)
+        try:
+            with deadline_scope(0.05), pytest.raises(DeadlineExceededError):
+                await run_with_deadline(executor.run(lambda: "late", provider="openai"))
+        finally:
+            wait_for_capacity.reset(token)
+            release.set()
+        await busy
+
+    asyncio.run(scenario())
+    assert executor.get_stats()["pending"] == {"openai": 0}
+
+def test_queued_task_runs_once_the_executor_frees_up(harness, scheduler, executor, monkeypatch):
+    orchestrator, script, calls = harness
+    monkeypatch.setattr(orchestrator_module, "crew_executor", executor)
+    monkeypatch.setattr(orchestrator_module.llm_config, "default_provider", "openai")
+    add_task(orchestrator, [make_step("1", "research")])
+
+    async def scenario():
+        release = threading.Event()
+        busy = await occupy(executor, release)
+        run = asyncio.ensure_future(orchestrator._run_task("task"))
+        await asyncio.sleep(0.05)
+        release.set()
+        await run
+        await busy
+
+    asyncio.run(scenario())
+    assert orchestrator.task_store.get("task")["status"] == "completed"
+    assert calls == ["research"]
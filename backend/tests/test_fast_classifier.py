@@ -0,0 +1,46 @@
+import pytest
+
+from agents.fast_classifier import FastClassifier
+
+def test_confident_lane_vocabulary_is_answered_locally():
+    classifier = FastClassifier(threshold=0.85)
+
+    result = classifier.classify("record the podcast episode with the guest")
+
+    assert result["lane"] == "podcasting" and result["tier"] == "local"
+    assert result["confidence"] >= 0.85
+    assert classifier.get_stats()["answered"] == 1
+
+def test_unknown_or_unconfident_input_is_deferred_to_the_llm():
+    classifier = FastClassifier(threshold=0.85)
+
+    assert classifier.classify("zorblax quux") is None
+    assert FastClassifier(threshold=1.1).classify("record the podcast episode") is None
+    assert classifier.get_stats()["deferred"] == 1
+
+def test_confident_llm_results_teach_new_vocabulary():
+    classifier = FastClassifier(threshold=0.85)
+    assert classifier.classify("zorblax quux") is None
+
+    classifier.learn("zorblax quux", "accelerator-work", confidence=0.5)
+    assert classifier.classify("zorblax quux") is None
+    classifier.learn("zorblax quux", "no-such-lane", confidence=0.95)
+    assert classifier.get_stats()["examples"] == 0
+    for _ in range(2):
+        classifier.learn("zorblax quux", "accelerator-work", confidence=0.95)
+
+    assert classifier.classify("zorblax quux")["lane"] == "accelerator-work"
+
+def test_incremental_learning_matches_a_full_refit():
+    learned = FastClassifier(refit_every=1000, max_examples=2)
+    for text, lane in [("zorblax quux", "podcasting"), ("flimflam deal", "accelerator-work"),
+                       ("grocery zorblax", "miscellaneous")]:
+        learned.learn(text, lane)
+    learned._refresh_norms()
+    refit = FastClassifier(max_examples=2)
+    refit.fit([("flimflam deal", "accelerator-work"), ("grocery zorblax", "miscellaneous")])
+
+    # The oldest example fell out of the window in both
+    assert learned.get_stats()["examples"] == refit.get_stats()["examples"] == 2
+    for text in ("zorblax quux", "flimflam deal", "pitch the investor"):
+        assert learned.predict(text)["confidence"] == pytest.approx(refit.predict(text)["confidence"])
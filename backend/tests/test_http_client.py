@@ -0,0 +1,75 @@
+import asyncio
+
+import httpx
+import pytest
+
+from tools.http_client import ToolHTTPClient
+
+def make_client(handler, **kwargs):
+    return ToolHTTPClient(http2=False, backoff=0, transport=httpx.MockTransport(handler), **kwargs)
+
+def run(client, coro_fn):
+    async def main():
+        try:
+            return await coro_fn()
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+def test_get_returns_the_response():
+    client = make_client(lambda request: httpx.Response(200, json={"path": request.url.path}))
+    response = run(client, lambda: client.get("https://api.example.com/search"))
+    assert response.json() == {"path": "/search"}
+    assert client.get_stats()["requests"] == 1
+
+def test_idempotent_requests_retry_on_5xx_and_429():
+    statuses = iter([503, 429, 200])
+    client = make_client(lambda request: httpx.Response(next(statuses)))
+    response = run(client, lambda: client.get("https://api.example.com/"))
+    assert response.status_code == 200
+    assert client.get_stats()["retries"] == 2
+
+def test_last_retryable_response_is_returned_when_retries_run_out():
+    client = make_client(lambda request: httpx.Response(503), retries=1)
+    response = run(client, lambda: client.get("https://api.example.com/"))
+    assert response.status_code == 503
+    assert client.get_stats()["requests"] == 2
+
+def test_post_is_not_retried_unless_marked_safe():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(503 if len(calls) == 1 else 200)
+
+    client = make_client(handler)
+    assert run(client, lambda: client.post("https://api.example.com/", json={})).status_code == 503
+    calls.clear()
+    client = make_client(handler)
+    assert run(client, lambda: client.post("https://api.example.com/", json={}, retry_unsafe=True)).status_code == 200
+    assert calls == ["POST", "POST"]
+
+def test_connection_errors_are_retried_then_raised():
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    client = make_client(handler, retries=2)
+    with pytest.raises(httpx.ConnectError):
+        run(client, lambda: client.get("https://api.example.com/"))
+    assert client.get_stats() == {"requests": 3, "retries": 2, "failures": 1, "http2": False, "open": False}
+
+def test_request_sync_outside_the_app_uses_a_private_loop():
+    client = make_client(lambda request: httpx.Response(200, text="ok"))
+    assert client.request_sync("GET", "https://api.example.com/").text == "ok"
+
+def test_request_sync_from_a_worker_thread_uses_the_app_loop():
+    client = make_client(lambda request: httpx.Response(200, text="shared"))
+
+    async def main():
+        await client.start()
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: client.request_sync("GET", "https://api.example.com/")
+        )
+
+    assert run(client, main).text == "shared"
+    assert client.get_stats()["requests"] == 1
@@ -0,0 +1,126 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agents.idempotency import IdempotencyConflictError, IdempotencyStore, current_idempotency_key, idempotent
+
+class Handler:
+    """Counts runs; each run waits on an event so tests control when it finishes"""
+
+    def __init__(self, result="done", error=None):
+        self.result = result
+        self.error = error
+        self.runs = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+def test_completed_result_is_replayed():
+    async def main():
+        store, handler = IdempotencyStore(), Handler()
+        handler.release.set()
+        assert await store.run("/tasks", "key", {"a": 1}, handler) == "done"
+        assert await store.run("/tasks", "key", {"a": 1}, handler) == "done"
+        assert handler.runs == 1
+        assert store.get_stats()["replayed"] == 1
+    asyncio.run(main())
+
+def test_concurrent_duplicates_share_one_run():
+    async def main():
+        store, handler = IdempotencyStore(), Handler()
+        calls = [asyncio.ensure_future(store.run("/tasks", "key", {}, handler)) for _ in range(3)]
+        await asyncio.sleep(0)
+        handler.release.set()
+        assert await asyncio.gather(*calls) == ["done"] * 3
+        assert handler.runs == 1
+        assert store.get_stats()["coalesced"] == 2
+    asyncio.run(main())
+
+def test_reused_key_with_a_different_body_conflicts():
+    async def main():
+        store, handler = IdempotencyStore(), Handler()
+        handler.release.set()
+        await store.run("/tasks", "key", {"a": 1}, handler)
+        with pytest.raises(IdempotencyConflictError):
+            await store.run("/tasks", "key", {"a": 2}, handler)
+        # Keys are scoped per route
+        assert await store.run("/research", "key", {"a": 2}, handler) == "done"
+    asyncio.run(main())
+
+def test_failed_runs_are_not_remembered():
+    async def main():
+        store, handler = IdempotencyStore(), Handler(error=RuntimeError("boom"))
+        handler.release.set()
+        with pytest.raises(RuntimeError):
+            await store.run("/tasks", "key", {}, handler)
+        handler.error = None
+        assert await store.run("/tasks", "key", {}, handler) == "done"
+        assert handler.runs == 2
+    asyncio.run(main())
+
+def test_run_keeps_going_while_any_caller_waits():
+    async def main():
+        store, handler = IdempotencyStore(), Handler()
+        first = asyncio.ensure_future(store.run("/research", "key", {}, handler))
+        second = asyncio.ensure_future(store.run("/research", "key", {}, handler))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        handler.release.set()
+        assert await second == "done"
+        assert handler.cancelled == 0
+    asyncio.run(main())
+
+def test_run_is_cancelled_once_every_caller_has_gone():
+    async def main():
+        store, handler = IdempotencyStore(), Handler()
+        calls = [asyncio.ensure_future(store.run("/research", "key", {}, handler)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert handler.cancelled == 1
+        assert store.get_stats()["size"] == 0
+
+        # A retry with the same key runs again
+        handler.release.set()
+        assert await store.run("/research", "key", {}, handler) == "done"
+        assert handler.runs == 2
+    asyncio.run(main())
+
+def test_eviction_keeps_runs_that_are_still_in_flight():
+    async def main():
+        store, handler, other = IdempotencyStore(max_size=1), Handler(), Handler()
+        first = asyncio.ensure_future(store.run("/tasks", "a", {}, handler))
+        await asyncio.sleep(0)
+        other.release.set()
+        await store.run("/tasks", "b", {}, other)
+        duplicate = asyncio.ensure_future(store.run("/tasks", "a", {}, handler))
+        await asyncio.sleep(0)
+        handler.release.set()
+        assert await asyncio.gather(first, duplicate) == ["done", "done"]
+        assert handler.runs == 1
+    asyncio.run(main())
+
+def test_work_runs_under_the_request_key():
+    async def main():
+        request = SimpleNamespace(headers={"idempotency-key": "abc"}, url=SimpleNamespace(path="/research"))
+
+        async def handler():
+            return current_idempotency_key.get()
+
+        assert await idempotent(request, {}, handler) == "/research:abc"
+        assert current_idempotency_key.get() is None
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+from agents.events import current_task_id
+from agents.idempotency import current_idempotency_key
+from tools.ledger import SideEffectLedger, normalize_arguments, side_effecting, side_effect_ledger
+
+def run_under(variable, value, ledger, calls):
+    token = variable.set(value)
+    try:
+        return ledger.run("send_email", {"to": "jane@example.com"}, lambda: calls.append(value))
+    finally:
+        variable.reset(token)
+
+def test_arguments_are_normalized():
+    assert normalize_arguments({"to": " Jane@Example.com ", "n": 1}) == normalize_arguments({"n": 1, "to": "jane@example.com"})
+    # Free text is compared as written
+    assert normalize_arguments({"subject": "Call me, Bill"}) != normalize_arguments({"subject": "call me, bill"})
+
+def test_duplicate_calls_return_the_original_result():
+    ledger, calls = SideEffectLedger(), []
+
+    def send():
+        calls.append(1)
+        return {"message_id": len(calls)}
+
+    assert ledger.run("send_email", {"to": "jane@example.com"}, send) == {"message_id": 1}
+    assert ledger.run("send_email", {"to": "JANE@example.com "}, send) == {"message_id": 1}
+    assert ledger.run("send_email", {"to": "john@example.com"}, send) == {"message_id": 2}
+    assert ledger.get_stats()["executed"] == 2
+    assert ledger.get_stats()["deduplicated"] == 1
+
+def test_results_are_copies():
+    ledger = SideEffectLedger()
+    first = ledger.run("save_note", {"content": "x"}, lambda: {"tags": []})
+    first["tags"].append("changed")
+    assert ledger.run("save_note", {"content": "x"}, lambda: {"tags": []}) == {"tags": []}
+
+def test_failed_calls_are_forgotten():
+    ledger = SideEffectLedger()
+
+    def fail():
+        raise RuntimeError("provider down")
+
+    with pytest.raises(RuntimeError):
+        ledger.run("send_email", {"to": "jane@example.com"}, fail)
+    assert ledger.run("send_email", {"to": "jane@example.com"}, lambda: "sent") == "sent"
+
+def test_entries_expire_after_the_ttl():
+    ledger, calls = SideEffectLedger(ttl_seconds=0.01), []
+    ledger.run("send_email", {"to": "jane@example.com"}, lambda: calls.append(1))
+    time.sleep(0.02)
+    ledger.run("send_email", {"to": "jane@example.com"}, lambda: calls.append(1))
+    assert len(calls) == 2
+
+def test_concurrent_duplicates_run_once():
+    ledger, calls = SideEffectLedger(), []
+    started = threading.Event()
+
+    def create_event():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return "event_1"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(ledger.run("create_calendar_event", {"title": "Sync"}, create_event)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["event_1"] * 4
+    assert len(calls) == 1
+
+def test_side_effecting_tools_dedupe_on_bound_arguments():
+    calls = []
+
+    @side_effecting
+    def notify(channel: str, text: str, urgent: bool = False):
+        calls.append((channel, text, urgent))
+        return len(calls)
+
+    assert notify.side_effecting
+    first = notify("#ops", "deploy done")
+    assert notify(channel="#ops", text="deploy done ", urgent=False) == first
+    assert notify("#ops", "deploy done", urgent=True) != first
+    assert len(calls) == 2
+    assert side_effect_ledger.get_stats()["deduplicated"] >= 1
+
+def test_calls_are_deduplicated_per_task():
+    ledger, calls = SideEffectLedger(), []
+    for task_id in ("task-1", "task-1", "task-2"):
+        run_under(current_task_id, task_id, ledger, calls)
+    assert calls == ["task-1", "task-2"]
+
+def test_calls_are_deduplicated_per_idempotency_key():
+    ledger, calls = SideEffectLedger(), []
+    for key in ("/research:a", "/research:a", "/research:b"):
+        run_under(current_idempotency_key, key, ledger, calls)
+    assert calls == ["/research:a", "/research:b"]
+
+def test_eviction_keeps_calls_that_are_still_running():
+    ledger, calls = SideEffectLedger(max_size=1), []
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        calls.append("slow")
+        started.set()
+        release.wait()
+        return "sent"
+
+    results = []
+    call = lambda: results.append(ledger.run("send_email", {"to": "jane@example.com"}, slow))
+    first = threading.Thread(target=call)
+    first.start()
+    started.wait()
+    ledger.run("send_email", {"to": "john@example.com"}, lambda: "other")
+    duplicate = threading.Thread(target=call)
+    duplicate.start()
+    time.sleep(0.05)
+    release.set()
+    first.join()
+    duplicate.join()
+    assert results == ["sent", "sent"]
+    assert calls == ["slow"]
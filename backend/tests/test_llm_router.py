@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from config.llm_router import CircuitOpenError, LLMRouter
+
+def make_router(*providers, cooldown=30):
+    router = LLMRouter(failure_threshold=2, cooldown_seconds=cooldown)
+    router.providers = lambda: list(providers)
+    return router
+
+def open_circuit(router, provider):
+    for _ in range(router.failure_threshold):
+        router.record_failure(provider)
+
+async def answer(provider):
+    return provider
+
+async def fail(provider):
+    raise ConnectionError(f"{provider} is down")
+
+def test_failover_skips_a_provider_with_an_open_circuit():
+    router = make_router("openai", "anthropic")
+    open_circuit(router, "openai")
+
+    assert asyncio.run(router.run("classify", answer)) == "anthropic"
+
+def test_failures_open_the_circuit_and_calls_then_fail_fast():
+    router = make_router("openai")
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            asyncio.run(router.run("classify", fail))
+
+    calls = []
+
+    async def call(provider):
+        calls.append(provider)
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(router.run("classify", call))
+    assert calls == []
+
+def test_only_one_trial_call_runs_after_the_cooldown():
+    router = make_router("openai", cooldown=0)
+    open_circuit(router, "openai")
+    release = asyncio.Event()
+    calls = []
+
+    async def call(provider):
+        calls.append(provider)
+        await release.wait()
+        return "ok"
+
+    async def scenario():
+        trial = asyncio.ensure_future(router.run("classify", call))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await router.run("classify", call)
+        release.set()
+        assert await trial == "ok"
+        # The trial closed the circuit, so calls flow again
+        assert await router.run("classify", call) == "ok"
+
+    asyncio.run(scenario())
+    assert calls == ["openai", "openai"]
+    assert router.get_stats()["providers"]["openai"]["circuit_open"] is False
+
+def test_a_failed_trial_reopens_the_circuit():
+    router = make_router("openai", cooldown=30)
+    open_circuit(router, "openai")
+    router._get_health("openai").opened_at -= 30
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(router.run("classify", fail))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(router.run("classify", answer))
+
+def test_a_trial_without_a_verdict_frees_the_slot():
+    router = make_router("openai", cooldown=0)
+    open_circuit(router, "openai")
+
+    async def saturated(provider):
+        raise BlockingIOError("executor full")
+
+    with pytest.raises(BlockingIOError):
+        asyncio.run(router.run("classify", saturated, neutral_exceptions=(BlockingIOError,)))
+    assert asyncio.run(router.run("classify", answer)) == "openai"
@@ -0,0 +1,75 @@
+import pytest
+
+from tools import memo as memo_module
+from tools.ledger import side_effecting
+from tools.memo import ToolCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(memo_module.time, "monotonic", lambda: now[0])
+    return now
+
+def test_results_are_reused_until_their_ttl_passes(clock):
+    cache, calls = ToolCache(), []
+
+    @cache.memoize(ttl=60)
+    def search_web(query, limit=5):
+        calls.append(query)
+        return {"results": [query]}
+
+    search_web("jane doe")
+    search_web(query="jane doe", limit=5)
+    clock[0] += 61
+    search_web("jane doe")
+
+    assert calls == ["jane doe", "jane doe"]
+    assert cache.get_stats()["tools"]["search_web"] == {"hits": 1, "misses": 2, "ttl": 60, "hit_rate": 0.333}
+
+def test_ttl_overrides_and_zero_ttl_disable_caching(clock):
+    cache, calls = ToolCache(ttl_overrides={"get_calendar_events": 0}), []
+
+    @cache.memoize(ttl=60)
+    def get_calendar_events(day):
+        calls.append(day)
+        return [day]
+
+    get_calendar_events("monday")
+    get_calendar_events("monday")
+
+    assert calls == ["monday", "monday"]
+    assert cache.get_stats()["tools"]["get_calendar_events"]["ttl"] == 0
+
+def test_cached_values_are_copies_and_invalidate_drops_them(clock):
+    cache, calls = ToolCache(), []
+
+    @cache.memoize(ttl=60)
+    def get_events(day):
+        calls.append(day)
+        return [day]
+
+    get_events("monday").append("mutated")
+    assert get_events("monday") == ["monday"]
+    assert cache.invalidate("get_events") == 1
+    get_events("monday")
+    assert calls == ["monday", "monday"]
+
+def test_least_recently_used_results_are_evicted(clock):
+    cache = ToolCache(max_size=2)
+    lookup = cache.memoize(ttl=60, name="lookup")(lambda key: key)
+
+    for key in ("a", "b", "a", "c"):
+        lookup(key)
+
+    assert cache.get_stats()["size"] == 2
+    assert cache.get_stats()["tools"]["lookup"]["misses"] == 3
+    lookup("b")
+    assert cache.get_stats()["tools"]["lookup"]["misses"] == 4
+
+def test_side_effecting_tools_cannot_be_memoized():
+    @side_effecting
+    def send_email(to, subject, body):
+        return "sent"
+
+    with pytest.raises(ValueError, match="side-effecting"):
+        ToolCache().memoize(ttl=60)(send_email)
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from agents import orchestrator as orchestrator_module
+from agents.plan_cache import PlanCache
+from conftest import add_task, make_step, steps_by_id
+
+@pytest.fixture
+def plans(monkeypatch):
+    plans = PlanCache()
+    monkeypatch.setattr(orchestrator_module, "plan_cache", plans)
+    return plans
+
+def test_steps_run_in_dependency_order(harness, scheduler, plans):
+    orchestrator, script, calls = harness
+    add_task(orchestrator, [make_step("1", "research"), make_step("2", "draft", depends_on=["1"]), make_step("3", "schedule")])
+
+    asyncio.run(orchestrator._run_task("task"))
+
+    record = orchestrator.task_store.get("task")
+    assert record["status"] == "completed"
+    assert calls.index("research") < calls.index("draft")
+    assert {s["step_id"]: s["result"]["output"] for s in record["steps"]} == {
+        "1": "did research", "2": "did draft", "3": "did schedule"
+    }
+    assert plans.get("plan the week", "accelerator-work") is not None
+
+def test_failed_step_skips_its_dependents_and_fails_the_task(harness, scheduler, plans):
+    orchestrator, script, calls = harness
+    script["research"] = ValueError("search tool failed")
+    add_task(orchestrator, [make_step("1", "research"), make_step("2", "draft", depends_on=["1"]), make_step("3", "schedule")])
+
+    asyncio.run(orchestrator._run_task("task"))
+
+    steps = steps_by_id(orchestrator)
+    assert steps["1"]["status"] == "failed" and "search tool failed" in steps["1"]["error"]
+    assert steps["2"]["status"] == "failed" and steps["2"]["error"].startswith("Skipped")
+    assert steps["3"]["status"] == "completed"
+    assert "draft" not in calls
+    record = orchestrator.task_store.get("task")
+    assert record["status"] == "failed" and record["failure_reason"] == "steps_failed"
+    assert record["error"] == "Steps failed: 1"
+    assert plans.get("plan the week", "accelerator-work") is None
+
+def test_rejected_step_completes_the_task_without_caching_the_plan(harness, scheduler, plans):
+    orchestrator, script, calls = harness
+    add_task(orchestrator, [
+        make_step("1", "book the meeting", requires_confirmation=True),
+        make_step("2", "send the invite", depends_on=["1"])
+    ])
+
+    asyncio.run(orchestrator._run_task("task"))
+    orchestrator.confirm_step("task", "1", approved=False)
+    asyncio.run(orchestrator._run_task("task"))
+
+    assert orchestrator.task_store.get("task")["status"] == "completed"
+    assert plans.get("plan the week", "accelerator-work") is None
+
+def test_warm_up_skips_plans_with_steps_that_did_not_complete(harness, plans):
+    orchestrator, script, calls = harness
+    rejected = make_step("1", "book the meeting")
+    rejected.update(status="failed", error="Rejected by user")
+    add_task(orchestrator, [rejected])
+    orchestrator.task_store.update("task", status="completed")
+
+    orchestrator._warm_plan_cache()
+
+    assert plans.get("plan the week", "accelerator-work") is None
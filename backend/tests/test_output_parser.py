@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agents.output_parser import (
+    OutputParseError, StructuredOutputParser, extract_json, parse_classification, parse_classification_batch,
+    parse_plan
+)
+
+def test_json_is_found_in_fences_prose_and_crew_outputs():
+    assert extract_json('```json\n{"lane": "podcasting"}\n```') == {"lane": "podcasting"}
+    assert extract_json('Sure! Here you go: {"a": [1, 2]} Hope that helps.') == {"a": [1, 2]}
+    assert extract_json(SimpleNamespace(raw='[{"id": 0}]', json_dict=None)) == [{"id": 0}]
+    assert extract_json(SimpleNamespace(raw="ignored", json_dict={"b": 1})) == {"b": 1}
+    with pytest.raises(OutputParseError):
+        extract_json("I could not decide on a lane.")
+
+def test_classification_deviations_are_normalized():
+    result = parse_classification('{"lane": "Accelerator Work", "confidence": "85%", "tier": "llm"}')
+
+    assert result == {"lane": "accelerator-work", "confidence": 0.85, "reasoning": "", "retryable": False}
+
+def test_unknown_lanes_are_rejected():
+    with pytest.raises(OutputParseError, match="Invalid classification"):
+        parse_classification('{"lane": "cooking", "confidence": 0.9, "reasoning": "recipes"}')
+
+def test_batch_skips_invalid_items_and_unwraps_objects():
+    output = '{"results": [{"id": 0, "lane": "podcasting", "confidence": 0.9, "reasoning": "guest"},' \
+             ' {"id": 1, "lane": "cooking", "confidence": 0.9}, {"lane": "podcasting"}]}'
+
+    assert list(parse_classification_batch(output)) == [0]
+    with pytest.raises(OutputParseError):
+        parse_classification_batch('[{"id": 0, "lane": "cooking"}]')
+
+def test_plan_steps_get_ids_agent_types_and_valid_dependencies():
+    steps = parse_plan({"steps": [
+        {"id": "a", "description": "research the guest", "agent_actions": [{"agent_type": "Research"}],
+         "depends_on": ["missing", "a"]},
+        {"id": "b", "description": "draft questions", "depends_on": "a"}
+    ]})
+
+    assert [s["step_id"] for s in steps] == ["a", "b"]
+    assert steps[0]["agent_actions"][0] == {
+        "agent_type": "researcher", "action": "research the guest", "parameters": {}, "requires_confirmation": False
+    }
+    assert steps[0]["depends_on"] == [] and steps[1]["depends_on"] == ["a"]
+    assert steps[1]["agent_actions"][0]["agent_type"] == "task_coordinator"
+
+def test_cyclic_or_implicit_plans_run_in_order():
+    cyclic = parse_plan([
+        {"step_id": "1", "description": "one", "depends_on": ["2"]},
+        {"step_id": "2", "description": "two", "depends_on": ["1"]}
+    ])
+    implicit = parse_plan([{"description": "one"}, {"description": "two"}, {"description": "three"}])
+
+    assert [s["depends_on"] for s in cyclic] == [[], ["1"]]
+    assert [s["depends_on"] for s in implicit] == [[], ["1"], ["2"]]
+
+def test_repair_runs_once_and_its_failure_propagates():
+    parser = StructuredOutputParser()
+    repairs = []
+
+    async def repair(raw):
+        repairs.append(raw)
+        return '{"lane": "podcasting", "confidence": 0.9, "reasoning": "fixed"}'
+
+    async def broken_repair(raw):
+        repairs.append(raw)
+        return "still not json"
+
+    result = asyncio.run(parser.parse("lane: podcasting", parse_classification, repair))
+    assert result["reasoning"] == "fixed"
+    with pytest.raises(OutputParseError):
+        asyncio.run(parser.parse("lane: podcasting", parse_classification, broken_repair))
+    with pytest.raises(OutputParseError):
+        asyncio.run(parser.parse("lane: podcasting", parse_classification))
+
+    assert repairs == ["lane: podcasting", "lane: podcasting"]
+    assert parser.get_stats() == {"parsed": 0, "parse_failures": 3, "repaired": 1, "repair_failures": 1}
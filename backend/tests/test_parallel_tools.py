@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+
+import pytest
+
+from agents.deadlines import deadline_scope
+from tools.parallel import ToolRunner
+
+@pytest.fixture
+def runner():
+    runner = ToolRunner(max_workers=8, default_limit=4)
+    yield runner
+    runner.shutdown()
+
+def test_calls_run_concurrently_and_keep_their_order(runner):
+    def slow(value):
+        time.sleep(0.1)
+        return value
+
+    started = time.monotonic()
+    results = runner.run_many([{"tool": "slow", "args": {"value": i}} for i in range(4)], {"slow": slow})
+    assert [r["result"] for r in results] == [0, 1, 2, 3]
+    assert time.monotonic() - started < 0.3
+
+def test_one_failing_call_does_not_discard_the_others(runner):
+    def fail():
+        raise RuntimeError("search failed")
+
+    results = runner.run_many([{"tool": "fail"}, {"tool": "ok"}], {"fail": fail, "ok": lambda: "fine"})
+    assert results == [{"tool": "fail", "error": "search failed"}, {"tool": "ok", "result": "fine"}]
+
+def test_per_tool_limit_caps_concurrency():
+    runner = ToolRunner(max_workers=8, limits={"capped": 2})
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def capped():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    runner.run_many([{"tool": "capped"}] * 6, {"capped": capped})
+    runner.shutdown()
+    assert peak[0] == 2
+
+def test_calls_past_the_deadline_time_out(runner):
+    with deadline_scope(0.05):
+        results = runner.run_many([{"tool": "slow"}], {"slow": lambda: time.sleep(0.5)})
+    assert results == [{"tool": "slow", "error": "Timed out"}]
+
+def test_run_json_only_dispatches_registered_tools(runner):
+    registry = {"research_person": lambda name: f"about {name}"}
+
+    results = json.loads(runner.run_json(json.dumps([
+        {"tool": "research_person", "args": {"name": "Jane Doe"}},
+        {"tool": "send_email", "args": {"to": "jane@example.com", "subject": "hi", "body": "hi"}}
+    ]), registry))
+
+    assert results == [
+        {"tool": "research_person", "result": "about Jane Doe"},
+        {"tool": "send_email", "error": "Unknown tool 'send_email'"}
+    ]
+
+def test_run_json_rejects_malformed_calls(runner):
+    assert "error" in json.loads(runner.run_json("not json", {}))
+    assert json.loads(runner.run_json('{"tool": "x"}', {})) == {"error": "calls must be a JSON list"}
+
+def test_researcher_cannot_dispatch_send_email():
+    pytest.importorskip("crewai")
+    from tools import basic_tools
+    from tools.ledger import side_effect_ledger
+
+    runner = next(t for t in basic_tools.RESEARCH_TOOLS if t.name == "run_tools_in_parallel")
+    executed = side_effect_ledger.get_stats()["executed"]
+    results = json.loads(runner.run(calls=json.dumps([
+        {"tool": "send_email", "args": {"to": "jane@example.com", "subject": "hi", "body": "hi"}},
+        {"tool": "save_note", "args": {"content": "note"}}
+    ])))
+
+    assert [r.get("error") for r in results] == ["Unknown tool 'send_email'", "Unknown tool 'save_note'"]
+    assert side_effect_ledger.get_stats()["executed"] == executed
@@ -0,0 +1,79 @@
+from agents.plan_cache import PlanCache, extract_slots
+
+LANE = "podcasting"
+
+def make_steps(*descriptions):
+    return [
+        {
+            "step_id": str(i),
+            "description": description,
+            "agent_actions": [{"agent_type": "researcher", "action": "research", "parameters": {}}],
+            "depends_on": [],
+            "status": "completed",
+            "result": {"output": "old result"},
+            "error": None
+        }
+        for i, description in enumerate(descriptions, 1)
+    ]
+
+def test_extract_slots_numbers_names_and_dates():
+    signature, slots = extract_slots("Prep episode with Jane Doe on Friday")
+    assert signature == "prep episode with name0 on date0"
+    assert slots == {"name0": "Jane Doe", "date0": "Friday"}
+
+def test_round_trip_fills_in_the_new_names_and_dates():
+    cache = PlanCache()
+    steps = make_steps("Research Jane Doe", "Book a call with Jane Doe on Friday")
+    assert cache.put("Prep episode with Jane Doe on Friday", LANE, "Plan for Jane Doe, due Friday", steps)
+
+    plan, new_steps = cache.get("Prep episode with John Smith on Monday", LANE)
+    assert plan == "Plan for John Smith, due Monday"
+    assert [s["description"] for s in new_steps] == ["Research John Smith", "Book a call with John Smith on Monday"]
+    # Results of the run that produced the plan are not carried over
+    assert all(s["status"] == "pending" and s["result"] is None for s in new_steps)
+
+def test_only_whole_words_are_slotted():
+    cache = PlanCache()
+    steps = make_steps("Call Bob about the Bobsled segment")
+    assert cache.put("Call Bob tomorrow", LANE, "Ask Bob, mention Bobsled", steps)
+
+    plan, new_steps = cache.get("Call Alice tomorrow", LANE)
+    assert plan == "Ask Alice, mention Bobsled"
+    assert new_steps[0]["description"] == "Call Alice about the Bobsled segment"
+
+def test_values_needing_json_escapes_round_trip():
+    cache = PlanCache()
+    assert cache.put("Interview Sinead O'Brien today", LANE, "Brief on Sinead O'Brien", make_steps('Quote "Sinead O\'Brien"'))
+
+    plan, new_steps = cache.get("Interview Mary O'Neil today", LANE)
+    assert plan == "Brief on Mary O'Neil"
+    assert new_steps[0]["description"] == 'Quote "Mary O\'Neil"'
+
+def test_plans_mentioning_part_of_a_name_are_not_cached():
+    cache = PlanCache()
+    assert not cache.put("Prep episode with Jane Doe on Friday", LANE, "Ask Jane about her book", make_steps("Research"))
+    assert cache.get_stats()["unparameterizable"] == 1
+    assert cache.get("Prep episode with John Smith on Monday", LANE) is None
+
+def test_plans_with_resolved_dates_are_not_cached():
+    cache = PlanCache()
+    assert not cache.put("Prep episode with Jane Doe on Friday", LANE, "Record on 2026-10-23", make_steps("Research"))
+    assert cache.get_stats()["stored"] == 0
+
+def test_entries_are_kept_per_lane():
+    cache = PlanCache()
+    cache.put("Prep episode with Jane Doe on Friday", LANE, "Plan", make_steps("Research"))
+    assert cache.get("Prep episode with John Smith on Monday", "accelerator-work") is None
+    assert cache.get("Prep episode with John Smith on Monday", LANE) is not None
+
+def test_least_recently_used_plan_is_evicted():
+    cache = PlanCache(max_size=1)
+    cache.put("Prep episode with Jane Doe on Friday", LANE, "Plan", make_steps("Research"))
+    cache.put("Schedule a call with Jane Doe", LANE, "Plan", make_steps("Schedule"))
+    assert cache.get("Prep episode with John Smith on Monday", LANE) is None
+    assert cache.get("Schedule a call with John Smith", LANE) is not None
+
+def test_size_zero_disables_the_cache():
+    cache = PlanCache(max_size=0)
+    assert not cache.put("Prep episode with Jane Doe on Friday", LANE, "Plan", make_steps("Research"))
+    assert cache.get("Prep episode with Jane Doe on Friday", LANE) is None
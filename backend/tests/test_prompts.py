@@ -0,0 +1,43 @@
+import pytest
+
+from agents.crew_pool import CrewPool
+from agents.prompts import PROMPT_INPUT, STEP_TEMPLATE, render
+
+STEP_INPUTS = {
+    "user_input": "Reply with {context} and {step} verbatim",
+    "step": "Draft the reply",
+    "actions": "[]",
+    "context": "Step 1 found the guest's email"
+}
+
+def test_render_fills_placeholders_in_one_pass():
+    prompt = render(STEP_TEMPLATE, STEP_INPUTS)
+    # Placeholders inside user text are left alone
+    assert 'User request: "Reply with {context} and {step} verbatim"' in prompt
+    assert "Step: Draft the reply" in prompt
+    assert prompt.count("Step 1 found the guest's email") == 1
+
+def test_render_leaves_json_examples_alone_and_requires_every_input():
+    assert render('Return {"lane": "x"} for {query}', {"query": "q"}) == 'Return {"lane": "x"} for q'
+    with pytest.raises(KeyError):
+        render("{query}", {})
+
+def test_pool_prepares_inputs_before_kickoff():
+    seen = []
+
+    class Crew:
+        def kickoff(self, inputs):
+            seen.append(inputs)
+
+    pool = CrewPool("step", Crew, prepare_inputs=lambda inputs: {"prompt": render(STEP_TEMPLATE, inputs)})
+    pool.kickoff(STEP_INPUTS)
+    assert seen == [{"prompt": render(STEP_TEMPLATE, STEP_INPUTS)}]
+
+def test_crewai_leaves_the_rendered_prompt_as_is():
+    pytest.importorskip("crewai")
+    from crewai import Task
+
+    prompt = render(STEP_TEMPLATE, STEP_INPUTS)
+    task = Task(description=PROMPT_INPUT, expected_output="Result of the step")
+    task.interpolate_inputs_and_add_conversation_history({"prompt": prompt})
+    assert task.description == prompt
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+
+import pytest
+
+from agents import orchestrator as orchestrator_module
+from agents.deadlines import deadline_scope
+from agents.events import current_task_id, task_events
+from agents.orchestrator import AgentOrchestrator
+from agents.research_cache import ResearchCache
+
+class StreamingCrew:
+    """Research crew that streams two tokens, pausing between them until released"""
+
+    def __init__(self, release, calls):
+        self.release = release
+        self.calls = calls
+
+    def kickoff(self, inputs):
+        self.calls.append(inputs["query"])
+        task_events.publish(current_task_id.get(), "token", "Jane ")
+        if not self.release.wait(5):
+            raise TimeoutError("never released")
+        task_events.publish(current_task_id.get(), "token", "Doe")
+        return "Jane Doe hosts a podcast"
+
+@pytest.fixture
+def research(monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "research_cache", ResearchCache())
+    release, calls = threading.Event(), []
+    orchestrator = AgentOrchestrator(crew_factory=lambda workflow, provider: StreamingCrew(release, calls))
+    yield orchestrator, release, calls
+    release.set()
+    orchestrator.close()
+
+async def collect(stream):
+    return [event async for event in stream]
+
+async def first_token(events, timeout=2):
+    for _ in range(int(timeout / 0.01)):
+        if any(e["type"] == "token" for e in events):
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("no token streamed")
+
+def test_streams_and_plain_requests_share_one_run(research):
+    orchestrator, release, calls = research
+
+    async def scenario():
+        first = []
+
+        async def read_first():
+            async for event in orchestrator.stream_research_task("Jane Doe"):
+                first.append(event)
+
+        reader = asyncio.ensure_future(read_first())
+        await first_token(first)
+        # Joins mid-run: earlier tokens are replayed
+        second = asyncio.ensure_future(collect(orchestrator.stream_research_task("jane doe")))
+        plain = asyncio.ensure_future(orchestrator.execute_research_task("Jane Doe"))
+        await asyncio.sleep(0.05)
+        release.set()
+        await reader
+        return first, await second, await plain
+
+    first, second, plain = asyncio.run(scenario())
+    assert calls == ["Jane Doe"]
+    for events, cached in ((first, False), (second, True)):
+        assert [e["data"] for e in events if e["type"] == "token"] == ["Jane ", "Doe"]
+        assert events[-1]["type"] == "result"
+        assert events[-1]["data"]["research_result"] == "Jane Doe hosts a podcast"
+        assert events[-1]["data"]["cached"] is cached
+    assert plain["research_result"] == "Jane Doe hosts a podcast" and plain["cached"] is True
+
+def test_run_keeps_going_for_the_remaining_caller(research):
+    orchestrator, release, calls = research
+
+    async def scenario():
+        events = []
+
+        async def read():
+            async for event in orchestrator.stream_research_task("Jane Doe"):
+                events.append(event)
+
+        reader = asyncio.ensure_future(read())
+        await first_token(events)
+        plain = asyncio.ensure_future(orchestrator.execute_research_task("Jane Doe"))
+        await asyncio.sleep(0.01)
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
+        release.set()
+        return await plain
+
+    assert asyncio.run(scenario())["research_result"] == "Jane Doe hosts a podcast"
+    assert calls == ["Jane Doe"]
+
+def test_cached_result_is_streamed_without_a_run(research):
+    orchestrator, release, calls = research
+    release.set()
+
+    asyncio.run(orchestrator.execute_research_task("Jane Doe"))
+    events = asyncio.run(collect(orchestrator.stream_research_task("Jane Doe")))
+
+    assert [e["type"] for e in events] == ["started", "result"]
+    assert events[-1]["data"]["cached"] is True
+    assert calls == ["Jane Doe"]
+
+def test_stream_ends_at_its_request_deadline(research):
+    orchestrator, release, calls = research
+
+    async def scenario():
+        plain = asyncio.ensure_future(orchestrator.execute_research_task("Jane Doe"))
+        await asyncio.sleep(0.01)
+        with deadline_scope(0.1):
+            events = await collect(orchestrator.stream_research_task("Jane Doe"))
+        release.set()
+        return events, await plain
+
+    events, plain = asyncio.run(scenario())
+    assert events[-1]["type"] == "error"
+    # The shared run was not stopped by the stream giving up
+    assert plain["research_result"] == "Jane Doe hosts a podcast"
@@ -0,0 +1,25 @@
+import asyncio
+import time
+
+from conftest import add_task, make_step
+
+def test_resume_claims_only_tasks_whose_lease_lapsed(harness, scheduler):
+    orchestrator, script, calls = harness
+    add_task(orchestrator, [make_step("1", "research")], task_id="stale")
+    add_task(orchestrator, [make_step("1", "research")], task_id="live")
+    orchestrator.task_store.update("stale", status="processing", worker_id="dead", lease_expires=time.time() - 1)
+    orchestrator.task_store.update("live", status="processing", worker_id="other", lease_expires=time.time() + 30)
+
+    assert asyncio.run(orchestrator.resume_interrupted_tasks()) == 1
+    assert scheduler.submitted == ["stale"]
+    assert orchestrator.task_store.get("stale")["status"] == "pending"
+    # The claim renewed the lease, so a second pass finds nothing to resume
+    assert asyncio.run(orchestrator.resume_interrupted_tasks()) == 0
+
+def test_resume_picks_up_records_without_a_lease(harness, scheduler):
+    orchestrator, script, calls = harness
+    add_task(orchestrator, [make_step("1", "research")])
+
+    assert asyncio.run(orchestrator.resume_interrupted_tasks()) == 1
+    asyncio.run(orchestrator._run_task("task"))
+    assert orchestrator.task_store.get("task")["status"] == "completed"
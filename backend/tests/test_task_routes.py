@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from routes import tasks as tasks_routes
+
+class ListingOrchestrator:
+    """Records the filters list_tasks is called with"""
+
+    def __init__(self):
+        self.calls = []
+
+    def list_tasks(self, **filters):
+        self.calls.append(filters)
+        return [], None
+
+@pytest.fixture
+def client(monkeypatch):
+    orchestrator = ListingOrchestrator()
+    monkeypatch.setattr(tasks_routes, "get_orchestrator", lambda: orchestrator)
+    app = FastAPI()
+    app.include_router(tasks_routes.router, prefix="/api/tasks")
+    return TestClient(app), orchestrator
+
+def test_since_and_until_are_normalized_to_the_created_at_format(client):
+    client, orchestrator = client
+
+    response = client.get("/api/tasks/", params={"since": "2026-10-01", "until": "2026-10-02T09:30:00"})
+
+    assert response.status_code == 200
+    assert orchestrator.calls[0]["since"] == "2026-10-01T00:00:00"
+    assert orchestrator.calls[0]["until"] == "2026-10-02T09:30:00"
+
+def test_aware_bounds_are_converted_to_local_time(client):
+    client, orchestrator = client
+
+    client.get("/api/tasks/", params={"since": "2026-10-01T12:00:00Z"})
+
+    expected = datetime(2026, 10, 1, 12, tzinfo=timezone.utc).astimezone().replace(tzinfo=None).isoformat()
+    assert orchestrator.calls[0]["since"] == expected
+
+def test_malformed_bounds_are_rejected(client):
+    client, orchestrator = client
+
+    assert client.get("/api/tasks/", params={"since": "last tuesday"}).status_code == 422
+    assert orchestrator.calls == []
@@ -0,0 +1,143 @@
+import time
+
+import pytest
+
+from agents.task_store import InMemoryTaskStore, SQLiteTaskStore
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        store = InMemoryTaskStore()
+    else:
+        store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    yield store
+    store.close()
+
+def add(store, task_id, status="pending", lane="podcasting", created_at="2026-01-01T00:00:00"):
+    store.put(task_id, {
+        "user_input": f"input {task_id}",
+        "lane": lane,
+        "status": status,
+        "plan": f"plan {task_id}",
+        "steps": [],
+        "created_at": created_at
+    })
+
+def test_get_update_delete(store):
+    add(store, "a")
+    assert store.update("a", status="completed")["status"] == "completed"
+    assert store.get("a")["status"] == "completed"
+    assert store.update("missing", status="failed") is None
+    store.delete("a")
+    assert store.get("a") is None
+
+def test_list_is_newest_first_and_filtered(store):
+    add(store, "a", status="completed", created_at="2026-01-01T00:00:00")
+    add(store, "b", status="pending", lane="accelerator-work", created_at="2026-01-02T00:00:00")
+    add(store, "c", status="completed", created_at="2026-01-03T00:00:00")
+
+    records, cursor = store.list()
+    assert [r["task_id"] for r in records] == ["c", "b", "a"]
+    assert cursor is None
+    assert [r["task_id"] for r in store.list(status="completed")[0]] == ["c", "a"]
+    assert [r["task_id"] for r in store.list(lane="accelerator-work")[0]] == ["b"]
+    assert [r["task_id"] for r in store.list(since="2026-01-02", until="2026-01-03")[0]] == ["b"]
+
+def test_list_pages_with_a_cursor(store):
+    for i in range(5):
+        add(store, f"t{i}", created_at=f"2026-01-0{i + 1}T00:00:00")
+
+    seen, cursor = [], None
+    while True:
+        records, cursor = store.list(limit=2, cursor=cursor)
+        seen.extend(r["task_id"] for r in records)
+        if cursor is None:
+            break
+    assert seen == ["t4", "t3", "t2", "t1", "t0"]
+
+def test_list_leaves_out_heavy_fields_unless_asked(store):
+    add(store, "a")
+    record = store.list()[0][0]
+    assert "plan" not in record and "steps" not in record
+    assert store.list(fields=["status", "plan"])[0][0] == {"task_id": "a", "status": "pending", "plan": "plan a"}
+
+def test_list_rejects_a_malformed_cursor(store):
+    with pytest.raises(ValueError):
+        store.list(cursor="not-a-cursor")
+
+def test_count_by_status_follows_status_changes(store):
+    add(store, "a")
+    add(store, "b")
+    add(store, "c", status="completed")
+    assert store.count_by_status() == {"pending": 2, "completed": 1}
+
+    store.update("a", status="processing")
+    store.update("b", status="completed")
+    store.delete("c")
+    assert store.count_by_status() == {"processing": 1, "completed": 1}
+    assert store.count() == 2
+
+def test_sqlite_records_survive_reopening(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    store = SQLiteTaskStore(path)
+    add(store, "a", status="completed")
+    store.close()
+
+    reopened = SQLiteTaskStore(path)
+    assert reopened.get("a")["plan"] == "plan a"
+    assert reopened.count_by_status() == {"completed": 1}
+    reopened.close()
+
+def test_only_one_worker_claims_a_lapsed_task(store):
+    add(store, "a", status="processing")
+    store.update("a", worker_id="dead", lease_expires=time.time() - 1)
+
+    claimed = store.claim("a", "dead", "w1", time.time() + 30, status="pending")
+    assert claimed["worker_id"] == "w1" and claimed["status"] == "pending"
+    assert store.claim("a", "dead", "w2", time.time() + 30) is None
+    assert store.get("a")["worker_id"] == "w1"
+
+def test_a_live_lease_or_finished_task_is_not_claimed(store):
+    add(store, "a", status="processing")
+    store.update("a", worker_id="w1", lease_expires=time.time() + 30)
+    add(store, "b", status="completed")
+
+    assert store.claim("a", "w1", "w2", time.time() + 30) is None
+    assert store.claim("b", None, "w2", time.time() + 30) is None
+
+def test_renew_leases_extends_only_the_workers_active_tasks(store):
+    add(store, "a")
+    add(store, "b", status="completed")
+    add(store, "c")
+    for task_id in ("a", "b"):
+        store.update(task_id, worker_id="w1", lease_expires=1)
+    store.update("c", worker_id="w2", lease_expires=1)
+
+    assert store.renew_leases("w1", 100) == 1
+    assert [store.get(t)["lease_expires"] for t in ("a", "b", "c")] == [100, 1, 1]
+
+def test_sqlite_buffered_progress_does_not_overwrite_another_workers_status(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    first, second = SQLiteTaskStore(path, flush_interval=60), SQLiteTaskStore(path, flush_interval=60)
+    add(first, "a", status="processing")
+
+    first.update("a", steps=[{"step_id": "1"}])
+    second.update("a", status="failed", error="cancelled")
+    first.flush()
+
+    record = second.get("a")
+    assert record["status"] == "failed" and record["error"] == "cancelled"
+    assert record["steps"] == [{"step_id": "1"}]
+    assert second.count_by_status() == {"failed": 1}
+    first.close()
+    second.close()
+
+def test_sqlite_claim_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    first, second = SQLiteTaskStore(path), SQLiteTaskStore(path)
+    add(first, "a", status="processing")
+
+    assert first.claim("a", None, "w1", time.time() + 30) is not None
+    assert second.claim("a", None, "w2", time.time() + 30) is None
+    first.close()
+    second.close()
@@ -1,17 +1,33 @@
-from crewai_tools import tool
+from crewai.tools import tool
 from typing import Dict, Any, List
 import httpx
 import os
 from datetime import datetime, timedelta
-import json
+
+from .http_client import http_client
+from .parallel import tool_runner
+from .memo import memoize, tool_cache
+from .ledger import side_effecting
 
 @tool("search_web")
+@memoize(ttl=900)
 def search_web(query: str) -> str:
     """Search the web for information on a given topic."""
-    # This will use SerperDevTool in the actual agent
-    return f"Web search results for: {query}"
+    api_key = os.getenv("SERPER_API_KEY")
+    if not api_key:
+        return f"Web search results for: {query}"
+    
+    # Search is read-only, so it is safe to retry the POST
+    response = http_client.request_sync(
+        "POST", "https://google.serper.dev/search",
+        json={"q": query}, headers={"X-API-KEY": api_key}, retry_unsafe=True
+    )
+    response.raise_for_status()
+    results = response.json().get("organic", [])[:5]
+    return "\n".join(f"{r.get('title')}: {r.get('snippet')} ({r.get('link')})" for r in results)
 
 @tool("get_calendar_events")  
+@memoize(ttl=60)
 def get_calendar_events(days_ahead: int = 7) -> List[Dict[str, Any]]:
     """Get calendar events for the next N days."""
     # Placeholder - would integrate with Google Calendar API
@@ -25,6 +41,7 @@ def get_calendar_events(days_ahead: int = 7) -> List[Dict[str, Any]]:
     ]
 
 @tool("create_calendar_event")
+@side_effecting
 def create_calendar_event(
     title: str, 
     start_time: str, 
@@ -33,6 +50,8 @@ def create_calendar_event(
 ) -> Dict[str, Any]:
     """Create a new calendar event."""
     # Placeholder - would integrate with Google Calendar API
+    # The new event makes cached event listings stale
+    tool_cache.invalidate("get_calendar_events")
     return {
         "event_id": "sample_event_123",
         "title": title,
@@ -43,6 +62,7 @@ def create_calendar_event(
     }
 
 @tool("save_note")
+@side_effecting
 def save_note(content: str, category: str = "general") -> Dict[str, Any]:
     """Save a note or piece of content for later reference."""
     # Placeholder - would integrate with Notion or other note-taking service
@@ -55,6 +75,7 @@ def save_note(content: str, category: str = "general") -> Dict[str, Any]:
     }
 
 @tool("send_email")
+@side_effecting
 def send_email(
     to: str, 
     subject: str, 
@@ -72,6 +93,7 @@ def send_email(
     }
 
 @tool("research_person")
+@memoize(ttl=86400)
 def research_person(name: str, context: str = "") -> Dict[str, Any]:
     """Research information about a person, optionally with context."""
     # Placeholder - would use web search and social media APIs
@@ -101,10 +123,30 @@ def generate_content(
         "created_at": datetime.now().isoformat()
     }
 
-# Tool collections for different agent types
-RESEARCH_TOOLS = [search_web, research_person]
-CALENDAR_TOOLS = [get_calendar_events, create_calendar_event]
+def parallel_runner(tools: List[Any]) -> Any:
+    """run_tools_in_parallel tool that can only dispatch the given tools.
+
+    Each agent gets its own runner over its own tools, so a batch cannot reach a tool
+    (such as send_email) that the agent was never given.
+    """
+    # Underlying functions by tool name, for running several calls in one step
+    functions = {t.name: getattr(t, "func", t) for t in tools}
+
+    def run_tools_in_parallel(calls: str) -> str:
+        return tool_runner.run_json(calls, functions)
+
+    run_tools_in_parallel.__doc__ = f"""Run several independent tool calls at the same time instead of one after another.
+    `calls` is a JSON list such as [{{"tool": "{tools[0].name}", "args": {{...}}}}, ...], where
+    "tool" is one of: {", ".join(functions)}. Returns a JSON list with one
+    {{"tool", "result"}} or {{"tool", "error"}} entry per call, in the same order."""
+    return tool("run_tools_in_parallel")(run_tools_in_parallel)
+
+# Tool collections for different agent types, each with a parallel runner limited to its own tools
+_research_tools = [search_web, research_person]
+_calendar_tools = [get_calendar_events, create_calendar_event]
+RESEARCH_TOOLS = _research_tools + [parallel_runner(_research_tools)]
+CALENDAR_TOOLS = _calendar_tools + [parallel_runner(_calendar_tools)]
 CONTENT_TOOLS = [generate_content, save_note]
 COMMUNICATION_TOOLS = [send_email]
 
-ALL_TOOLS = RESEARCH_TOOLS + CALENDAR_TOOLS + CONTENT_TOOLS + COMMUNICATION_TOOLS
+ALL_TOOLS = _research_tools + _calendar_tools + CONTENT_TOOLS + COMMUNICATION_TOOLS
@@ -0,0 +1,160 @@
+"""Process-wide pooled HTTP client shared by all agent tools"""
+import asyncio
+import importlib.util
+import logging
+import random
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config.llm_config import llm_config
+from agents.deadlines import current_deadline
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+class ToolHTTPClient:
+    """One keep-alive httpx.AsyncClient for the app, with per-host limits and jittered retries.
+
+    Coroutines use request(); tools running in crew worker threads use request_sync(),
+    which runs the call on the app's event loop so every tool shares the same pool.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        max_per_host: int = 10,
+        timeout: float = 10.0,
+        connect_timeout: float = 3.0,
+        retries: int = 2,
+        backoff: float = 0.25,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff = backoff
+        # HTTP/2 needs the optional h2 package
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        if http2 and not self.http2:
+            logger.info("h2 is not installed, tool HTTP client will use HTTP/1.1")
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=30
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            transport=self.transport,
+            follow_redirects=True
+        )
+
+    async def start(self):
+        """Open the connection pool on the running event loop; called at app startup"""
+        if self._client is None:
+            self._client = self._build_client()
+            self._loop = asyncio.get_running_loop()
+            self._host_limits = {}
+
+    async def aclose(self):
+        """Close pooled connections; called at app shutdown"""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_limits[host]
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), 10.0)
+        # Full jitter keeps many tools retrying the same host from synchronizing
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    async def request(self, method: str, url: str, retry_unsafe: bool = False, **kwargs) -> httpx.Response:
+        """Send a request, retrying connection errors and 429/5xx for idempotent methods"""
+        if self._client is None:
+            await self.start()
+        method = method.upper()
+        attempts = self.retries + 1 if method in IDEMPOTENT_METHODS or retry_unsafe else 1
+
+        for attempt in range(attempts):
+            response = None
+            try:
+                async with self._host_limit(url):
+                    self._stats["requests"] += 1
+                    response = await self._client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == attempts - 1:
+                    return response
+            except httpx.TransportError as e:
+                if attempt == attempts - 1:
+                    self._stats["failures"] += 1
+                    raise
+                logger.warning(f"Tool request {method} {url} failed ({e!r}), retrying")
+            self._stats["retries"] += 1
+            await asyncio.sleep(self._retry_delay(attempt, response))
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def request_sync(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Blocking request for tools running in crew worker threads, bounded by the request deadline"""
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            # Outside the app (scripts, ad-hoc runs): use a throwaway client on a private loop
+            return asyncio.run(self._request_once(method, url, **kwargs))
+
+        deadline = current_deadline.get()
+        future = asyncio.run_coroutine_threadsafe(self.request(method, url, **kwargs), loop)
+        try:
+            return future.result(timeout=deadline.remaining() if deadline else None)
+        except TimeoutError:
+            future.cancel()
+            deadline.check()
+            raise
+
+    async def _request_once(self, method: str, url: str, **kwargs) -> httpx.Response:
+        kwargs.pop("retry_unsafe", None)
+        async with self._build_client() as client:
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+            return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request, retry and failure counts"""
+        return {**self._stats, "http2": self.http2, "open": self._client is not None}
+
+# Global client instance
+http_client = ToolHTTPClient(
+    max_connections=llm_config.http_max_connections,
+    max_keepalive=llm_config.http_max_keepalive,
+    max_per_host=llm_config.http_max_per_host,
+    timeout=llm_config.http_timeout,
+    connect_timeout=llm_config.http_connect_timeout,
+    retries=llm_config.http_retries,
+    http2=llm_config.http2
+)
@@ -0,0 +1,119 @@
+"""Dedup ledger so side-effecting tools run at most once per set of arguments"""
+import copy
+import functools
+import inspect
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.llm_config import llm_config
+from agents.events import current_task_id
+from agents.idempotency import current_idempotency_key
+
+logger = logging.getLogger(__name__)
+
+_EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+def _normalize_value(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    # Email addresses are case-insensitive; other text keeps its case, which can change its meaning
+    return value.casefold() if _EMAIL.fullmatch(value) else value
+
+def normalize_arguments(arguments: Dict[str, Any]) -> str:
+    """Canonical form of tool arguments: sorted keys, trimmed strings, case-folded email addresses"""
+    normalized = {k: _normalize_value(v) for k, v in arguments.items()}
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+LedgerKey = Tuple[Optional[str], Optional[str], str, str]
+
+class SideEffectLedger:
+    """Records side-effecting tool calls and answers duplicates with the original result.
+
+    Calls are deduplicated within the task or Idempotency-Key they run under, so two tasks
+    that happen to send the same email each send it.
+    """
+
+    def __init__(self, ttl_seconds: float = 86400, max_size: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[LedgerKey, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"executed": 0, "deduplicated": 0}
+
+    def run(self, tool_name: str, arguments: Dict[str, Any], call: Callable[[], Any]) -> Any:
+        """Run call unless the same tool already ran with equivalent arguments for this task inside the TTL"""
+        key = (current_task_id.get(), current_idempotency_key.get(), tool_name, normalize_arguments(arguments))
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry["expires_at"] < time.monotonic():
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    entry = self._entries[key] = {
+                        "done": threading.Event(),
+                        "result": None,
+                        "expires_at": time.monotonic() + self.ttl_seconds
+                    }
+                    self._evict()
+                    break
+            # Another thread is running or has run the same call: wait for its result
+            entry["done"].wait()
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    self._stats["deduplicated"] += 1
+                    logger.info(f"Skipping duplicate {tool_name} call, returning the original result")
+                    return copy.deepcopy(entry["result"])
+            # The original call failed and was forgotten; try again ourselves
+
+        try:
+            entry["result"] = call()
+        except BaseException:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            raise
+        finally:
+            entry["done"].set()
+        with self._lock:
+            self._stats["executed"] += 1
+        return copy.deepcopy(entry["result"])
+
+    def _evict(self):
+        # Oldest finished calls first; a call still running must stay so its duplicates wait for it
+        if len(self._entries) <= self.max_size:
+            return
+        for key in [k for k, e in self._entries.items() if e["done"].is_set()]:
+            del self._entries[key]
+            if len(self._entries) <= self.max_size:
+                break
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executed and deduplicated call counts"""
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "ttl_seconds": self.ttl_seconds}
+
+# Global ledger instance
+side_effect_ledger = SideEffectLedger(ttl_seconds=llm_config.side_effect_dedup_ttl)
+
+def side_effecting(fn: Optional[Callable[..., Any]] = None, *, name: Optional[str] = None):
+    """Mark a tool that changes the outside world: never memoized, and duplicate calls are deduplicated"""
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        tool_name = name or fn.__name__
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return side_effect_ledger.run(tool_name, bound.arguments, lambda: fn(*args, **kwargs))
+
+        wrapper.side_effecting = True
+        return wrapper
+    return decorator(fn) if fn is not None else decorator
@@ -0,0 +1,94 @@
+"""Memoization of tool results with per-tool TTLs"""
+import copy
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.llm_config import llm_config
+
+class ToolCache:
+    """Size-bounded LRU of tool results shared by all memoized tools"""
+
+    def __init__(self, max_size: int = 2000, ttl_overrides: Optional[Dict[str, int]] = None):
+        self.max_size = max_size
+        self.ttl_overrides = ttl_overrides or {}
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def memoize(self, ttl: float, name: Optional[str] = None):
+        """Decorator caching a tool function's result per normalized arguments for ttl seconds"""
+        def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+            if getattr(fn, "side_effecting", False):
+                raise ValueError(f"Refusing to memoize side-effecting tool {fn.__name__}")
+            tool_name = name or fn.__name__
+            signature = inspect.signature(fn)
+            tool_ttl = self.ttl_overrides.get(tool_name, ttl)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key = (tool_name, json.dumps(bound.arguments, sort_keys=True, default=str))
+                hit, value = self._get(key)
+                if hit:
+                    return value
+                value = fn(*args, **kwargs)
+                self._put(key, value, tool_ttl)
+                return value
+
+            with self._lock:
+                self._stats.setdefault(tool_name, {"hits": 0, "misses": 0, "ttl": tool_ttl})
+            return wrapper
+        return decorator
+
+    def _get(self, key: Tuple[str, str]) -> Tuple[bool, Any]:
+        with self._lock:
+            stats = self._stats[key[0]]
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                stats["hits"] += 1
+                # Copy so callers can't mutate the cached value
+                return True, copy.deepcopy(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            stats["misses"] += 1
+            return False, None
+
+    def _put(self, key: Tuple[str, str], value: Any, ttl: float):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tool_name: str) -> int:
+        """Drop every cached result of one tool, e.g. after a write makes them stale"""
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == tool_name]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-tool hits, misses and hit rate"""
+        with self._lock:
+            tools = {}
+            for tool_name, stats in self._stats.items():
+                total = stats["hits"] + stats["misses"]
+                tools[tool_name] = dict(stats, hit_rate=round(stats["hits"] / total, 3) if total else 0.0)
+            return {"size": len(self._entries), "max_size": self.max_size, "tools": tools}
+
+# Global tool cache instance
+tool_cache = ToolCache(
+    max_size=llm_config.tool_cache_size,
+    ttl_overrides=llm_config.get_tool_settings("TOOL_CACHE_TTLS")
+)
+memoize = tool_cache.memoize
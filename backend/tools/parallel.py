@@ -0,0 +1,106 @@
+"""Concurrent execution of independent tool calls with per-tool concurrency caps"""
+import contextvars
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from config.llm_config import llm_config
+from agents.deadlines import check_deadline, current_deadline
+
+logger = logging.getLogger(__name__)
+
+class ToolRunner:
+    """Runs batches of blocking tool calls side by side on a shared thread pool"""
+
+    def __init__(self, max_workers: int = 16, default_limit: int = 4, limits: Optional[Dict[str, int]] = None):
+        self.max_workers = max_workers
+        self.default_limit = default_limit
+        self.limits = limits or {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool-worker")
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "calls": 0, "errors": 0}
+
+    def _semaphore(self, name: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if name not in self._semaphores:
+                self._semaphores[name] = threading.BoundedSemaphore(self.limits.get(name, self.default_limit))
+            return self._semaphores[name]
+
+    def _call(self, name: str, fn: Callable[..., Any], args: Dict[str, Any]) -> Any:
+        with self._semaphore(name):
+            check_deadline()
+            return fn(**args)
+
+    def run_many(self, calls: List[Dict[str, Any]], registry: Dict[str, Callable[..., Any]]) -> List[Dict[str, Any]]:
+        """Run [{"tool": name, "args": {...}}, ...] concurrently; results keep the input order.
+
+        Each result is {"tool", "result"} or {"tool", "error"}, so one failing call
+        does not discard the others.
+        """
+        futures = []
+        results: List[Dict[str, Any]] = []
+        for call in calls:
+            name = call.get("tool")
+            fn = registry.get(name)
+            if fn is None:
+                results.append({"tool": name, "error": f"Unknown tool '{name}'"})
+                futures.append(None)
+                continue
+            results.append({"tool": name})
+            # Each call gets its own copy of the caller's context (task id, deadline)
+            ctx = contextvars.copy_context()
+            futures.append(self._pool.submit(ctx.run, self._call, name, fn, call.get("args") or {}))
+
+        deadline = current_deadline.get()
+        pending = [f for f in futures if f is not None]
+        wait(pending, timeout=deadline.remaining() if deadline else None)
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["calls"] += len(pending)
+        for result, future in zip(results, futures):
+            if future is None:
+                pass
+            elif not future.done():
+                future.cancel()
+                result["error"] = "Timed out"
+            elif future.exception() is not None:
+                result["error"] = str(future.exception())
+            else:
+                result["result"] = future.result()
+            if "error" in result:
+                with self._lock:
+                    self._stats["errors"] += 1
+        return results
+
+    def run_json(self, calls: str, registry: Dict[str, Callable[..., Any]]) -> str:
+        """run_many for a JSON list of calls written by an agent, returning the results as JSON.
+
+        Only tools in registry can be called; any other name gets an "Unknown tool" error entry.
+        """
+        try:
+            parsed = json.loads(calls)
+        except ValueError as e:
+            return json.dumps({"error": f"calls must be a JSON list: {e}"})
+        if not isinstance(parsed, list):
+            return json.dumps({"error": "calls must be a JSON list"})
+        return json.dumps(self.run_many(parsed, registry), default=str)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batch, call and error counts"""
+        with self._lock:
+            return {**self._stats, "max_workers": self.max_workers, "default_limit": self.default_limit}
+
+    def shutdown(self):
+        """Release the worker threads"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+# Global tool runner instance
+tool_runner = ToolRunner(
+    max_workers=llm_config.tool_workers,
+    default_limit=llm_config.tool_concurrency,
+    limits=llm_config.get_tool_settings("TOOL_LIMITS")
+)